@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,11 +43,62 @@ INSTALLED_APPS = [
 ]
 
 REST_FRAMEWORK = {
+    # orjson-backed when installed, DRF's JSON classes otherwise (users.renderers)
+    'DEFAULT_RENDERER_CLASSES': [
+        'users.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'users.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.RevocableJWTAuthentication',
     ),
+    # Login attempts per period (users.throttling), counted in a sliding window
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': os.environ.get('LOGIN_IP_RATE', '20/min'),
+        'login_account': os.environ.get('LOGIN_ACCOUNT_RATE', '5/min'),
+    },
+}
+
+# Cache alias holding the throttle counters; point it at a shared backend
+# (Redis, Memcached) so limits hold across processes.
+THROTTLE_CACHE = 'default'
+
+# Per-process bloom filter of revoked token ids (users.revocation). Memory is
+# about 1.44 * CAPACITY * log2(1 / FALSE_POSITIVE_RATE) bits.
+TOKEN_REVOCATION = {
+    'CAPACITY': 100_000,
+    'FALSE_POSITIVE_RATE': 0.001,
+    'SYNC_INTERVAL': 5,
 }
 
+# Expose in-process counters at /api/v1/metrics/
+METRICS_ENABLED = DEBUG
+
+# Password hashing. New hashes use the first hasher; older ones are
+# rehashed on login. PASSWORD_HASHER=argon2 needs argon2-cffi installed.
+PASSWORD_POLICY = {
+    # None uses Django's PBKDF2PasswordHasher.iterations. Hashes stored at
+    # a higher count than this are kept, never downgraded.
+    'PBKDF2_ITERATIONS': int(os.environ.get('PBKDF2_ITERATIONS', 0)) or None,
+    # 'thread' or 'process'; hashing calls beyond POOL_MAX_PENDING get a 503.
+    'POOL': os.environ.get('PASSWORD_HASH_POOL', 'thread'),
+    'POOL_WORKERS': None,
+    'POOL_MAX_PENDING': None,
+}
+
+PASSWORD_HASHERS = [
+    'users.hashers.TunedPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+if os.environ.get('PASSWORD_HASHER') == 'argon2':
+    PASSWORD_HASHERS.insert(0, PASSWORD_HASHERS.pop(1))
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -16,11 +16,17 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path
-from users.views import SignUpView, LoginView
+from users.views import (
+    SignUpView, LoginView, TokenRefreshView, TokenVerifyView, LogoutView, MetricsView,
+)
 
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/v1/auth/signup/', SignUpView.as_view()),
     path('api/v1/auth/login/', LoginView.as_view()),
+    path('api/v1/auth/token/refresh/', TokenRefreshView.as_view()),
+    path('api/v1/auth/token/verify/', TokenVerifyView.as_view()),
+    path('api/v1/auth/logout/', LogoutView.as_view()),
+    path('api/v1/metrics/', MetricsView.as_view()),
 ]
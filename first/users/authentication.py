@@ -0,0 +1,19 @@
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .revocation import revocation_list
+
+
+class RevocableJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    Stateless access-token authentication: request.user is a TokenUser
+    built from the claims, so no user query runs. Tokens whose `jti` or
+    login session (`sid`) has been revoked are rejected.
+    """
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if revocation_list.is_revoked(token.get(api_settings.JTI_CLAIM), token.get('sid')):
+            raise InvalidToken('Token has been revoked.')
+        return token
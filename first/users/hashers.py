@@ -0,0 +1,170 @@
+"""
+Password hashing for users.User, run in the bounded `hashing_pool`. The
+pool records queue and hashing time per call for sizing it.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    PBKDF2PasswordHasher, identify_hasher, make_password, must_update_salt,
+)
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 at settings.PASSWORD_POLICY['PBKDF2_ITERATIONS'] (Django's
+    default when unset). Stored hashes below that count are upgraded on
+    login; stronger ones are kept.
+    """
+    @property
+    def iterations(self):
+        return settings.PASSWORD_POLICY.get('PBKDF2_ITERATIONS') or PBKDF2PasswordHasher.iterations
+
+    def must_update(self, encoded):
+        decoded = self.decode(encoded)
+        return decoded['iterations'] < self.iterations or must_update_salt(decoded['salt'], self.salt_entropy)
+
+
+class HashingBusy(Exception):
+    pass
+
+
+def verify(password, encoded):
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False, False
+    valid = hasher.verify(password, encoded)
+    return valid, valid and hasher.must_update(encoded)
+
+
+def _timed(func, *args):
+    started = time.perf_counter()
+    return func(*args), time.perf_counter() - started
+
+
+def _setup_worker():
+    import django
+    django.setup()
+
+
+class Timing:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            'max_ms': round(self.max * 1000, 2),
+        }
+
+
+class HashingPool:
+    """
+    At most `max_pending` hash calls queued or running; beyond that, run()
+    raises HashingBusy.
+    """
+
+    def __init__(self, kind='thread', workers=None, max_pending=None):
+        self.kind = kind
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        self.rejected = 0
+        self.hash_time = {}
+        self.wait_time = Timing()
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        options = getattr(settings, 'PASSWORD_POLICY', {})
+        return cls(
+            kind=options.get('POOL', 'thread'),
+            workers=options.get('POOL_WORKERS'),
+            max_pending=options.get('POOL_MAX_PENDING'),
+        )
+
+    def get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                if self.kind == 'process':
+                    self._executor = ProcessPoolExecutor(self.workers, initializer=_setup_worker)
+                else:
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='hashing')
+            return self._executor
+
+    def run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise HashingBusy()
+        try:
+            started = time.perf_counter()
+            result, hashing = self.get_executor().submit(_timed, func, *args).result()
+            with self._lock:
+                self.hash_time.setdefault(func.__name__, Timing()).add(hashing)
+                self.wait_time.add(time.perf_counter() - started - hashing)
+            return result
+        finally:
+            self._slots.release()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'kind': self.kind,
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'rejected': self.rejected,
+                'wait': self.wait_time.as_dict(),
+                'hash': {name: timing.as_dict() for name, timing in self.hash_time.items()},
+            }
+
+
+hashing_pool = HashingPool.from_settings()
+
+
+@lru_cache
+def _dummy_hash(policy):
+    return make_password('dummy-password-for-timing')
+
+
+def dummy_hash():
+    return _dummy_hash((settings.PASSWORD_HASHERS[0], settings.PASSWORD_POLICY.get('PBKDF2_ITERATIONS')))
+
+
+def hash_password(password):
+    return hashing_pool.run(make_password, password)
+
+
+def check_user_password(user, password):
+    """
+    `user` may be None; it is then checked against dummy_hash() so unknown
+    emails take as long as wrong passwords.
+    """
+    if user is None:
+        hashing_pool.run(verify, password, dummy_hash())
+        return False
+
+    valid, must_update = hashing_pool.run(verify, password, user.password)
+    if valid and must_update:
+        user.password = hashing_pool.run(make_password, password)
+        user.save(update_fields=['password'])
+    return valid
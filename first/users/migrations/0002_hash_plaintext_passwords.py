@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.db import migrations, transaction
+
+BATCH_SIZE = 500
+
+
+def is_hashed(value):
+    try:
+        identify_hasher(value)
+    except ValueError:
+        return False
+    return True
+
+
+def hash_plaintext_passwords(apps, schema_editor):
+    """
+    Replace plaintext passwords with hashes, one transaction per batch, so
+    an interrupted run keeps its progress and can simply be re-run.
+    """
+    User = apps.get_model('users', 'User')
+    db_alias = schema_editor.connection.alias
+    last_pk = 0
+    with ThreadPoolExecutor() as pool:
+        while True:
+            batch = list(User.objects.using(db_alias).filter(pk__gt=last_pk).order_by('pk')[:BATCH_SIZE])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            plaintext = [user for user in batch if not is_hashed(user.password)]
+            # PBKDF2 releases the GIL, so the batch hashes in parallel
+            for user, encoded in zip(plaintext, pool.map(make_password, [user.password for user in plaintext])):
+                user.password = encoded
+            with transaction.atomic(using=db_alias):
+                User.objects.using(db_alias).bulk_update(plaintext, ['password'])
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(hash_plaintext_passwords, migrations.RunPython.noop, elidable=True),
+    ]
@@ -5,3 +5,15 @@ class User(models.Model):
     password = models.CharField(max_length=255)
     created_time = models.DateTimeField(auto_now_add=True)
 
+
+class RevokedToken(models.Model):
+    """
+    A revoked token id: a refresh token's `jti` or a login session's `sid`.
+    Rows are only needed until `expires_at`, when the token expires anyway.
+    """
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField()
+    revoked_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return self.jti
@@ -0,0 +1,86 @@
+"""
+orjson-backed drop-ins for DRF's JSONRenderer and JSONParser, set in
+REST_FRAMEWORK. Output is byte-for-byte what DRF would render.
+"""
+import math
+import re
+from io import BytesIO
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+_encoder = JSONEncoder()
+LONG_DIGITS = re.compile(rb'\d{19}')
+
+
+SCALAR_TYPES = frozenset({str, int, bool, type(None)})
+
+
+def has_non_finite_float(value):
+    if isinstance(value, dict):
+        value = value.values()
+    elif isinstance(value, float):
+        return not math.isfinite(value)
+    elif not isinstance(value, (list, tuple)):
+        return False
+    for item in value:
+        if type(item) not in SCALAR_TYPES and has_non_finite_float(item):
+            return True
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            body = orjson.dumps(data, default=_encoder.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # Integers over 64 bits, lone surrogates: DRF encodes or rejects them itself.
+            return super().render(data, accepted_media_type, renderer_context)
+        # orjson writes NaN and Infinity as null, where DRF raises (STRICT_JSON)
+        # or writes them out, so a body with nulls is checked for them.
+        if b'null' in body and has_non_finite_float(data):
+            return super().render(data, accepted_media_type, renderer_context)
+        return body
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', 'utf-8').lower().replace('_', '-')
+        if orjson is None or encoding not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        if LONG_DIGITS.search(body):
+            return super().parse(BytesIO(body), media_type, parser_context)
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+def dumps(data):
+    """
+    Encode `data` as FastJSONRenderer renders a response body.
+    """
+    return FastJSONRenderer().render(data)
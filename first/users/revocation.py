@@ -0,0 +1,159 @@
+"""
+Revoked-token checks without a database query per request.
+
+RevokedToken is the source of truth. Each process keeps a bloom filter of
+the unexpired revoked ids. It is built from the table on first use and
+topped up with newer rows every SYNC_INTERVAL seconds. A token whose ids
+miss the filter is not revoked. That is O(1) and is the outcome for almost
+every request. A hit is confirmed against the table, so the filter's false
+positives cost a query but never reject a valid token.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import RevokedToken
+
+
+class BloomFilter:
+    """
+    Fixed-size bloom filter sized for `capacity` items at `error_rate`
+    false positives; k bit positions come from one blake2b digest by
+    double hashing.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationList:
+    def __init__(self, capacity=100_000, error_rate=0.001, sync_interval=5):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.checks = 0
+        self.filter_hits = 0
+        self.revoked_hits = 0
+        self._filter = None
+        self._synced_at = None
+        self._next_sync = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        options = getattr(settings, 'TOKEN_REVOCATION', {})
+        return cls(
+            capacity=options.get('CAPACITY', 100_000),
+            error_rate=options.get('FALSE_POSITIVE_RATE', 0.001),
+            sync_interval=options.get('SYNC_INTERVAL', 5),
+        )
+
+    def rebuild(self):
+        """
+        Build a new filter from the unexpired rows, sized for at least twice
+        their number so it has room to grow before the next rebuild.
+        """
+        now = timezone.now()
+        ids = list(RevokedToken.objects.filter(expires_at__gt=now).values_list('jti', flat=True))
+        bloom = BloomFilter(max(self.capacity, 2 * len(ids)), self.error_rate)
+        for jti in ids:
+            bloom.add(jti)
+        with self._lock:
+            self._filter = bloom
+            self._synced_at = now
+            self._next_sync = time.monotonic() + self.sync_interval
+
+    def sync(self):
+        """
+        Add rows revoked since the last sync, by any process. The window
+        overlaps the previous one to cover clock skew and late commits.
+        """
+        now = timezone.now()
+        since = self._synced_at - timedelta(seconds=self.sync_interval)
+        ids = RevokedToken.objects.filter(revoked_at__gte=since).values_list('jti', flat=True)
+        with self._lock:
+            for jti in ids:
+                self._filter.add(jti)
+            self._synced_at = now
+            self._next_sync = time.monotonic() + self.sync_interval
+            full = self._filter.count > self._filter.capacity
+        if full:
+            self.rebuild()
+
+    def get_filter(self):
+        if self._filter is None:
+            self.rebuild()
+        elif time.monotonic() >= self._next_sync:
+            self.sync()
+        return self._filter
+
+    def is_revoked(self, *token_ids):
+        bloom = self.get_filter()
+        self.checks += 1
+        candidates = [token_id for token_id in token_ids if token_id and token_id in bloom]
+        if not candidates:
+            return False
+        self.filter_hits += 1
+        if RevokedToken.objects.filter(jti__in=candidates).exists():
+            self.revoked_hits += 1
+            return True
+        return False
+
+    def revoke(self, token_id, expires_at):
+        """
+        Revoke `token_id` until `expires_at` (a datetime or a Unix timestamp).
+        Returns False if it was already revoked.
+        """
+        if not isinstance(expires_at, datetime):
+            expires_at = datetime.fromtimestamp(expires_at, tz=dt_timezone.utc)
+        try:
+            with transaction.atomic():
+                RevokedToken.objects.create(jti=token_id, expires_at=expires_at)
+            created = True
+        except IntegrityError:
+            created = False
+        bloom = self.get_filter()
+        with self._lock:
+            bloom.add(token_id)
+        return created
+
+    def stats(self):
+        bloom = self._filter
+        return {
+            'checks': self.checks,
+            'filter_hits': self.filter_hits,
+            'revoked_hits': self.revoked_hits,
+            'false_positive_rate': self.error_rate,
+            'items': bloom.count if bloom else 0,
+            'capacity': bloom.capacity if bloom else self.capacity,
+            'bytes': len(bloom.bits) if bloom else 0,
+            'hash_count': bloom.hash_count if bloom else 0,
+        }
+
+
+revocation_list = RevocationList.from_settings()
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import User
+from .hashers import hash_password
 
 class UserSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True)
@@ -11,6 +12,6 @@ class UserSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         user = User.objects.create(
             email=validated_data['email'],
-            password=validated_data['password']
+            password=hash_password(validated_data['password'])
         )
         return user
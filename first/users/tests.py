@@ -1,3 +1,213 @@
-from django.test import TestCase
+import uuid
+from datetime import date, datetime, time, timezone as dt_timezone
+from decimal import Decimal
+from importlib import import_module
+from io import BytesIO
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from . import hashers, renderers
+from .authentication import RevocableJWTAuthentication
+from .hashers import HashingPool
+from .renderers import FastJSONParser, FastJSONRenderer
+from .revocation import BloomFilter, RevocationList, revocation_list
+from .throttling import throttle_stats
+from .models import User
+
+hash_migration = import_module('users.migrations.0002_hash_plaintext_passwords')
+
+
+@override_settings(PASSWORD_POLICY={'PBKDF2_ITERATIONS': 1000})
+class PasswordHashingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def login(self, password='secret'):
+        return self.client.post('/api/v1/auth/login/', {'email': 'user@example.com', 'password': password})
+
+    def test_signup_stores_hash_and_login_rehashes_outdated(self):
+        self.client.post('/api/v1/auth/signup/', {'email': 'user@example.com', 'password': 'secret'})
+        user = User.objects.get(email='user@example.com')
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$1000$'))
+
+        with override_settings(PASSWORD_POLICY={'PBKDF2_ITERATIONS': 2000}):
+            response = self.login()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('token', response.data)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$2000$'))
+
+        # A stored hash stronger than the policy is kept, not downgraded.
+        self.assertEqual(self.login().status_code, 200)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$2000$'))
+
+        self.assertEqual(self.login('wrong').status_code, 401)
+        self.assertEqual(self.client.post(
+            '/api/v1/auth/login/', {'email': 'nobody@example.com', 'password': 'secret'}
+        ).status_code, 401)
+
+    def test_busy_pool_and_timings(self):
+        User.objects.create(email='user@example.com', password=make_password('secret'))
+        pool = HashingPool(workers=1, max_pending=1)
+        original, hashers.hashing_pool = hashers.hashing_pool, pool
+        try:
+            self.assertEqual(self.login().status_code, 200)
+            pool._slots.acquire()
+            response = self.login()
+        finally:
+            hashers.hashing_pool = original
+        self.assertEqual(response.status_code, 503)
+        stats = pool.stats()
+        self.assertEqual(stats['rejected'], 1)
+        self.assertEqual(stats['hash']['verify']['count'], 1)
+        self.assertEqual(stats['wait']['count'], 1)
+
+    def test_migration_hashes_plaintext_rows(self):
+        User.objects.bulk_create([User(email=f'user{n}@example.com', password=f'plain{n}') for n in range(3)])
+        hashed = User.objects.create(email='hashed@example.com', password=make_password('kept'))
+
+        hash_migration.hash_plaintext_passwords(apps, SimpleNamespace(connection=connection))
+
+        for n in range(3):
+            user = User.objects.get(email=f'user{n}@example.com')
+            self.assertTrue(hashers.verify(f'plain{n}', user.password)[0])
+        self.assertEqual(User.objects.get(pk=hashed.pk).password, hashed.password)
+
+
+@override_settings(PASSWORD_POLICY={'PBKDF2_ITERATIONS': 1000})
+class TokenEndpointTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        revocation_list.rebuild()
+        User.objects.create(email='user@example.com', password=make_password('secret'))
+        response = self.client.post('/api/v1/auth/login/', {'email': 'user@example.com', 'password': 'secret'})
+        self.tokens = response.data
+
+    def post(self, path, data):
+        return self.client.post(f'/api/v1/auth/{path}/', data)
+
+    def authenticate(self, access):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {access}')
+        return RevocableJWTAuthentication().authenticate(request)
+
+    def test_refresh_rotates_and_rejects_reuse(self):
+        self.assertEqual(self.tokens['token'], self.tokens['refresh'])
+        response = self.post('token/refresh', {'refresh': self.tokens['refresh']})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.post('token/verify', {'token': response.data['access']}).status_code, 200)
+        self.assertEqual(self.post('token/refresh', {'refresh': self.tokens['refresh']}).status_code, 401)
+        self.assertEqual(self.post('token/refresh', {'refresh': response.data['refresh']}).status_code, 200)
+        self.assertEqual(self.post('token/refresh', {}).status_code, 401)
+
+    def test_logout_revokes_the_whole_session(self):
+        rotated = self.post('token/refresh', {'refresh': self.tokens['refresh']}).data
+        user, _ = self.authenticate(self.tokens['access'])
+        self.assertEqual(user.id, str(User.objects.get().id))
+
+        self.assertEqual(self.post('logout', {'refresh': rotated['refresh']}).status_code, 200)
+        for access in (self.tokens['access'], rotated['access']):
+            self.assertEqual(self.post('token/verify', {'token': access}).status_code, 401)
+            with self.assertRaises(InvalidToken):
+                self.authenticate(access)
+        self.assertEqual(self.post('token/refresh', {'refresh': rotated['refresh']}).status_code, 401)
+
+    def test_unrevoked_tokens_are_checked_without_queries(self):
+        self.authenticate(self.tokens['access'])
+        with self.assertNumQueries(0):
+            self.authenticate(self.tokens['access'])
+
+    def test_other_processes_revocations_are_synced(self):
+        other_process = RevocationList(sync_interval=0)
+        self.assertFalse(other_process.is_revoked('abc'))
+        revocation_list.revoke('abc', 2 ** 31)
+        self.assertTrue(other_process.is_revoked('abc'))
+
+
+@override_settings(
+    PASSWORD_POLICY={'PBKDF2_ITERATIONS': 1000},
+    REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {'login_ip': '3/min', 'login_account': '2/min'},
+    },
+)
+class LoginThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def login(self, email, ip='10.0.0.1'):
+        return self.client.post('/api/v1/auth/login/', {'email': email, 'password': 'x'}, REMOTE_ADDR=ip)
+
+    def test_account_and_ip_limits(self):
+        self.login('victim@example.com')
+        self.login('victim@example.com')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.login('victim@example.com', ip='10.0.0.2').status_code, 429)
+        self.assertEqual(self.login('other@example.com').status_code, 401)
+        self.assertEqual(self.login('third@example.com').status_code, 429)
+        self.assertEqual(throttle_stats()['login_ip']['rejected'], 1)
+
+
+class BloomFilterTests(TestCase):
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+        for n in range(10_000):
+            bloom.add(f'revoked-{n}')
+        self.assertTrue(all(f'revoked-{n}' in bloom for n in range(10_000)))
+        false_positives = sum(f'valid-{n}' in bloom for n in range(10_000))
+        self.assertLess(false_positives, 200)
+        self.assertLess(len(bloom.bits), 12_000)
+
+
+class FastJSONTests(TestCase):
+    payload = {
+        'price': Decimal('499.90'),
+        'date': date(2030, 1, 3),
+        'created_at': datetime(2030, 1, 3, 9, 30, 15, 123456, tzinfo=dt_timezone.utc),
+        'time': time(9, 30),
+        'id': uuid.UUID(int=1),
+        'label': gettext_lazy('Phones'),
+        'rows': [{'count': 1, 'empty': None, 'ratio': 1.5, 'name': 'Zoë'}],
+        7: 'int key',
+    }
+
+    def test_renders_like_drf(self):
+        expected = JSONRenderer().render(self.payload)
+        self.assertEqual(FastJSONRenderer().render(self.payload), expected)
+        with mock.patch.object(renderers, 'orjson', None):
+            self.assertEqual(FastJSONRenderer().render(self.payload), expected)
+        self.assertIn(b'"2030-01-03T09:30:15.123456Z"', expected)
+
+    def test_falls_back_to_drf_where_orjson_differs(self):
+        payload = {'id': 2 ** 70, 'rows': [{'rating': None}]}
+        self.assertEqual(FastJSONRenderer().render(payload), JSONRenderer().render(payload))
+        for value in (float('nan'), float('inf')):
+            with self.assertRaisesMessage(ValueError, 'Out of range float values'):
+                FastJSONRenderer().render({'rows': [{'rating': value}]})
+
+    def test_parses_like_drf(self):
+        body = '{"a": [1, 2.5, "Zoë", null], "b": {"c": true}}'.encode()
+        self.assertEqual(FastJSONParser().parse(BytesIO(body)), JSONParser().parse(BytesIO(body)))
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(BytesIO(b'{"a": '))
+
+    def test_parses_integers_over_64_bits_exactly(self):
+        for number in (2 ** 64, -2 ** 63 - 1, 10 ** 30):
+            body = b'{"id": %d, "price": 1.5}' % number
+            self.assertEqual(FastJSONParser().parse(BytesIO(body)), {'id': number, 'price': 1.5})
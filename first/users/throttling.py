@@ -0,0 +1,122 @@
+"""
+Login throttles for the users API: per client IP and per submitted email,
+at the DEFAULT_THROTTLE_RATES in settings, counted in the THROTTLE_CACHE
+cache with the same sliding-window scheme as the second project.
+"""
+import hashlib
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """
+    '20/min' -> (20 attempts, per 60 seconds)
+    """
+    count, period = rate.split('/')
+    return int(count), PERIODS[period[0]]
+
+
+class WindowCounter:
+    def __init__(self, alias='default', local_max_keys=10_000):
+        self.alias = alias
+        self.local = LocMemCache(f'throttle-{alias}', {'OPTIONS': {'MAX_ENTRIES': local_max_keys}})
+
+    @classmethod
+    def from_settings(cls):
+        return cls(alias=getattr(settings, 'THROTTLE_CACHE', 'default'))
+
+    def take(self, key, limit, period):
+        """
+        Count one attempt against `key`. Returns (allowed, seconds until an
+        attempt would be allowed).
+        """
+        now = time.time()
+        try:
+            return self.count(caches[self.alias], key, limit, period, now)
+        except Exception:
+            # Cache backends raise their client's own errors when unreachable.
+            logger.warning('Throttle cache %r unavailable; using process memory.', self.alias, exc_info=True)
+            return self.count(self.local, key, limit, period, now)
+
+    @staticmethod
+    def count(cache, key, limit, period, now):
+        window, elapsed = divmod(now, period)
+        current = f'{key}:{int(window)}'
+        # Kept through the next window, where it is the previous count.
+        cache.add(current, 0, timeout=2 * period + 1)
+        attempts = cache.incr(current)
+        previous = cache.get(f'{key}:{int(window) - 1}', 0)
+        if previous * (1 - elapsed / period) + attempts <= limit:
+            return True, 0
+        # Rejected attempts do not count against the limit.
+        cache.decr(current)
+        if previous and attempts <= limit:
+            return False, (1 - (limit - attempts) / previous) * period - elapsed
+        return False, period - elapsed
+
+
+window_counter = WindowCounter.from_settings()
+
+_counters = {}
+_counters_lock = threading.Lock()
+
+
+def throttle_stats():
+    with _counters_lock:
+        return {scope: dict(counts) for scope, counts in _counters.items()}
+
+
+class LoginThrottle(BaseThrottle):
+    scope = None
+    rate = None
+
+    def get_rate(self):
+        return parse_rate(self.rate or api_settings.DEFAULT_THROTTLE_RATES[self.scope])
+
+    def get_ident_key(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        ident = self.get_ident_key(request)
+        if ident is None:
+            return True
+        limit, period = self.get_rate()
+        allowed, self.wait_seconds = window_counter.take(
+            f'throttle:{self.scope}:{hashlib.md5(ident.encode()).hexdigest()}', limit, period
+        )
+        with _counters_lock:
+            counts = _counters.setdefault(self.scope, {'allowed': 0, 'rejected': 0})
+            counts['allowed' if allowed else 'rejected'] += 1
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class LoginIPThrottle(LoginThrottle):
+    scope = 'login_ip'
+
+    def get_ident_key(self, request):
+        return self.get_ident(request)
+
+
+class LoginAccountThrottle(LoginThrottle):
+    scope = 'login_account'
+    field = 'email'
+
+    def get_ident_key(self, request):
+        value = request.data.get(self.field)
+        if not isinstance(value, str) or not value.strip():
+            return None
+        return value.strip().lower()
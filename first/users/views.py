@@ -1,9 +1,41 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken, UntypedToken
+from uuid import uuid4
+from django.conf import settings
 from .models import User
 from .serializer import UserSerializer
+from .hashers import HashingBusy, check_user_password, hashing_pool
+from .revocation import revocation_list
+from .throttling import LoginIPThrottle, LoginAccountThrottle, throttle_stats
+
+
+def busy_response():
+    return Response(
+        {'error': 'Too many sign-in requests in progress. Please retry shortly.'},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={'Retry-After': '1'},
+    )
+
+
+def token_error(message):
+    return Response({'error': message}, status=status.HTTP_401_UNAUTHORIZED)
+
+
+def read_token(token_class, raw_token):
+    """
+    Decode and validate `raw_token`; raises TokenError if it is missing,
+    invalid, expired or revoked.
+    """
+    if not raw_token:
+        raise TokenError('Token is required.')
+    token = token_class(raw_token)
+    if revocation_list.is_revoked(token.get(api_settings.JTI_CLAIM), token.get('sid')):
+        raise TokenError('Token has been revoked.')
+    return token
 
 
 class SignUpView(APIView):
@@ -17,7 +49,10 @@ class SignUpView(APIView):
             if User.objects.filter(email=email).exists():
                 return Response({'error': 'Email is already registered.'}, status=status.HTTP_400_BAD_REQUEST)
 
-            user = serializer.save(email=email, password=password)
+            try:
+                user = serializer.save(email=email, password=password)
+            except HashingBusy:
+                return busy_response()
         
             return Response({'message': 'User signed up successfully.'}, status=status.HTTP_201_CREATED)
 
@@ -25,21 +60,99 @@ class SignUpView(APIView):
 
 
 class LoginView(APIView):
+    throttle_classes = [LoginIPThrottle, LoginAccountThrottle]
+
     def post(self, request):
         email = request.data.get('email')
         password = request.data.get('password')
 
+        if not email or not password:
+            return Response({'error': 'Email and password are required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        user = User.objects.filter(email=email).first()
         try:
-            user = User.objects.get(email=email)
-        except User.DoesNotExist:
-            return Response({'error': 'Invalid email or password.'}, status=status.HTTP_401_UNAUTHORIZED)
+            valid = check_user_password(user, password)
+        except HashingBusy:
+            return busy_response()
 
-        if user.password != password:
+        if not valid:
             return Response({'error': 'Invalid email or password.'}, status=status.HTTP_401_UNAUTHORIZED)
 
-        token = RefreshToken.for_user(user)
+        # `sid` identifies the login session across refresh rotations, so
+        # logout can revoke every token issued from this login at once.
+        refresh = RefreshToken.for_user(user)
+        refresh['sid'] = uuid4().hex
 
         return Response({
             'message': 'Login successful.',
-            'token': str(token), 
-        }, status=status.HTTP_200_OK)
\ No newline at end of file
+            'token': str(refresh),
+            'refresh': str(refresh),
+            'access': str(refresh.access_token),
+        }, status=status.HTTP_200_OK)
+
+
+class TokenRefreshView(APIView):
+    """
+    Exchange a refresh token for a new access/refresh pair. The presented
+    refresh token is revoked, so each one can be used only once.
+    """
+    authentication_classes = []
+
+    def post(self, request):
+        try:
+            old = read_token(RefreshToken, request.data.get('refresh'))
+        except TokenError as exc:
+            return token_error(str(exc))
+
+        if not revocation_list.revoke(old[api_settings.JTI_CLAIM], old['exp']):
+            return token_error('Token has been revoked.')
+
+        refresh = RefreshToken()
+        refresh[api_settings.USER_ID_CLAIM] = old[api_settings.USER_ID_CLAIM]
+        if 'sid' in old:
+            refresh['sid'] = old['sid']
+        return Response({
+            'refresh': str(refresh),
+            'access': str(refresh.access_token),
+        }, status=status.HTTP_200_OK)
+
+
+class TokenVerifyView(APIView):
+    authentication_classes = []
+
+    def post(self, request):
+        try:
+            read_token(UntypedToken, request.data.get('token'))
+        except TokenError as exc:
+            return token_error(str(exc))
+        return Response({'message': 'Token is valid.'}, status=status.HTTP_200_OK)
+
+
+class LogoutView(APIView):
+    """
+    Revoke the login session of the given refresh token, which invalidates
+    its refresh token and every access token issued from it.
+    """
+    authentication_classes = []
+
+    def post(self, request):
+        try:
+            refresh = read_token(RefreshToken, request.data.get('refresh'))
+        except TokenError as exc:
+            return token_error(str(exc))
+
+        revocation_list.revoke(refresh.get('sid') or refresh[api_settings.JTI_CLAIM], refresh['exp'])
+        return Response({'message': 'Logged out successfully.'}, status=status.HTTP_200_OK)
+
+
+class MetricsView(APIView):
+    authentication_classes = []
+
+    def get(self, request):
+        if not settings.METRICS_ENABLED:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            'password_hashing': hashing_pool.stats(),
+            'token_revocation': revocation_list.stats(),
+            'throttle': throttle_stats(),
+        }, status=status.HTTP_200_OK)
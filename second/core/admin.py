@@ -1,6 +1,14 @@
 from django.contrib import admin
-from .models import User, Doctor, Booking
+from .models import User, Doctor, AvailabilitySlot, Booking
 
 admin.site.register(User)
 admin.site.register(Doctor)
-admin.site.register(Booking)
\ No newline at end of file
+admin.site.register(AvailabilitySlot)
+
+
+@admin.register(Booking)
+class BookingAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'doctor', 'date', 'time_slot', 'status')
+    list_filter = ('status',)
+    list_select_related = ('user', 'doctor')
+    raw_id_fields = ('user', 'doctor')
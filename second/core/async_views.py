@@ -0,0 +1,127 @@
+"""
+ASGI-native variants of the hot read endpoints.
+
+project.urls routes GET requests here when settings.ASYNC_READ_VIEWS is
+on. The ORM is used through its async API, so a request does not hold a
+worker thread while it waits on the database. The response bodies match
+the DRF views in core.views.
+"""
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException
+from rest_framework.utils.encoders import JSONEncoder
+
+from .authentication import JWTAuthentication
+from .models import Doctor
+from .pagination import KeysetPagination, wants_stream
+from .renderers import dumps
+from .serializer import DoctorSerializer, BookingSerializer
+from .views import scoped_bookings
+
+
+def with_async_get(async_get, sync_view):
+    """
+    Serve GET with `async_get` and every other method with the sync view.
+    """
+    sync_call = sync_to_async(sync_view)
+
+    async def view(request, *args, **kwargs):
+        if request.method == 'GET':
+            return await async_get(request, *args, **kwargs)
+        return await sync_call(request, *args, **kwargs)
+
+    return csrf_exempt(view)
+
+
+def json_response(data, status=200):
+    return HttpResponse(dumps(data), content_type='application/json', status=status)
+
+
+def api_view(async_get):
+    """
+    Give an async GET handler the parts of APIView it relies on: the
+    request is authenticated first (setting request.user and request.auth)
+    and APIExceptions become JSON errors.
+    """
+    authenticator = sync_to_async(JWTAuthentication().authenticate)
+
+    @wraps(async_get)
+    async def view(request, *args, **kwargs):
+        try:
+            result = await authenticator(request)
+            if result is not None:
+                request.user, request.auth = result
+            else:
+                request.auth = None
+            return await async_get(request, *args, **kwargs)
+        except APIException as exc:
+            # The same body shape as rest_framework.views.exception_handler
+            data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+            response = json_response(data, status=exc.status_code)
+            if exc.status_code == 401:
+                response['WWW-Authenticate'] = 'Bearer'
+            return response
+
+    return view
+
+
+def stream_list(key, queryset, serializer_class):
+    serializer = serializer_class()
+
+    async def rows():
+        yield '{"success": true, %s: [' % json.dumps(key)
+        separator = ''
+        async for obj in queryset.aiterator(chunk_size=settings.STREAM_CHUNK_SIZE):
+            yield separator + json.dumps(serializer.to_representation(obj), cls=JSONEncoder)
+            separator = ','
+        yield ']}'
+
+    return StreamingHttpResponse(rows(), content_type='application/json')
+
+
+async def paginate(queryset, request):
+    paginator = KeysetPagination()
+    page_queryset, page_size = paginator.get_page_queryset(queryset, request)
+    page = paginator.set_page([obj async for obj in page_queryset], page_size, request)
+    return page, paginator.get_next_link()
+
+
+@api_view
+async def doctor_list(request, doctor_id=None):
+    doctors = Doctor.objects.prefetch_related('slots').order_by('id')
+    if wants_stream(request):
+        return stream_list('doctors', doctors, DoctorSerializer)
+
+    page, next_link = await paginate(doctors, request)
+    return json_response({
+        'success': True,
+        'next': next_link,
+        'doctors': DoctorSerializer(page, many=True).data,
+    })
+
+
+@api_view
+async def booking_list(request, booking_id=None):
+    if request.auth is None:
+        return json_response({
+            'success': False,
+            'message': 'Authorization header missing or invalid.'
+        }, status=401)
+
+    bookings, error = scoped_bookings(request.user, request.auth, request.GET)
+    if error:
+        return json_response(*error)
+    if wants_stream(request):
+        return stream_list('bookings', bookings, BookingSerializer)
+
+    page, next_link = await paginate(bookings, request)
+    return json_response({
+        'success': True,
+        'next': next_link,
+        'bookings': BookingSerializer(page, many=True).data,
+    })
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta, timezone
+
+import jwt
+from django.conf import settings
+from rest_framework import authentication, exceptions
+
+from .cache import token_user_cache
+from .models import User, Doctor
+
+
+def generate_jwt_token(user):
+    """
+    Issue an access token whose claims carry everything authorization needs:
+    the user's PK and, for doctors, their Doctor PK.
+    """
+    payload = {
+        'user_id': user.pk,
+        'email': user.email,
+        'iat': datetime.now(timezone.utc),
+        'exp': datetime.now(timezone.utc) + timedelta(minutes=60),
+    }
+    doctor_id = Doctor.objects.filter(user=user).values_list('id', flat=True).first()
+    if doctor_id is not None:
+        payload['doctor_id'] = doctor_id
+    return jwt.encode(payload, settings.SECRET_KEY, algorithm='HS256')
+
+
+def decode_jwt_token(token):
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
+        return payload, None
+    except jwt.ExpiredSignatureError:
+        return None, "Token has expired."
+    except jwt.InvalidTokenError:
+        return None, "Invalid token."
+
+
+class JWTAuthentication(authentication.BaseAuthentication):
+    """
+    `Authorization: Bearer <token>` authentication.
+
+    Sets request.user to the token's User and request.auth to the verified
+    claims. Permission checks should read `user_id` / `doctor_id` from
+    request.auth instead of querying. `doctor_id` is checked against the
+    user's current Doctor row when the token is first seen, and the cache
+    entry is dropped when that row changes, so a token outliving its doctor
+    profile carries no doctor_id. Verified tokens are kept in
+    token_user_cache, so repeat requests make no database reads.
+    """
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        auth_header = request.headers.get('Authorization')
+        if not auth_header or not auth_header.startswith(self.keyword + ' '):
+            return None
+
+        token = auth_header.split(' ')[1]
+        cached = token_user_cache.get(token)
+        if cached is not None:
+            return cached
+
+        payload, error_message = decode_jwt_token(token)
+        if not payload:
+            raise exceptions.AuthenticationFailed(error_message)
+
+        # Tokens issued before user_id was embedded only carry the email.
+        users = User.objects.select_related('doctor')
+        if 'user_id' in payload:
+            version = token_user_cache.version(payload['user_id'])
+            user = users.filter(pk=payload['user_id']).first()
+        else:
+            user = users.filter(email=payload.get('email')).first()
+            version = token_user_cache.version(user.pk) if user else None
+        if not user:
+            raise exceptions.AuthenticationFailed('User with this token does not exist.')
+
+        payload.pop('doctor_id', None)
+        doctor = getattr(user, 'doctor', None)
+        if doctor is not None:
+            payload['doctor_id'] = doctor.pk
+
+        token_user_cache.set(token, user, payload, expires_at=payload.get('exp'), version=version)
+        return user, payload
+
+    def authenticate_header(self, request):
+        return self.keyword
@@ -0,0 +1,130 @@
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+_UNSET = object()
+
+
+class TokenUserCache:
+    """
+    Bounded, in-process LRU cache mapping a verified JWT to (user, claims).
+
+    Entries expire after `ttl` seconds or when the token itself expires,
+    whichever comes first. The entries are per process, so each carries the
+    user's version stamp from the shared Django cache `alias`, and a hit
+    only counts while the stamp is unchanged. The signals in core.signals
+    call invalidate_user() whenever a user is saved or deleted, which drops
+    the entries here and, once the transaction commits, replaces the stamp
+    so the other processes drop theirs on their next lookup. A hit costs
+    one shared cache read instead of two database queries.
+    """
+
+    def __init__(self, max_size=1024, ttl=300, alias='default'):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.alias = alias
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        options = getattr(settings, 'AUTH_USER_CACHE', {})
+        return cls(
+            max_size=options.get('MAX_SIZE', 1024),
+            ttl=options.get('TTL', 300),
+            alias=options.get('CACHE', 'default'),
+        )
+
+    def version(self, user_id):
+        """
+        The user's current version stamp, or None if it was never replaced.
+        Read it before loading the user, so a change committed in between
+        leaves an entry that is already stale.
+        """
+        try:
+            return caches[self.alias].get(f'token-user-version:{user_id}')
+        except Exception:
+            # Cache backends raise their client's own errors when unreachable.
+            logger.warning('Token user cache %r unavailable.', self.alias, exc_info=True)
+            return uuid.uuid4().hex  # matches no entry, so lookups miss
+
+    def get(self, token):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None and entry[2] <= time.time():
+                del self._entries[token]
+                entry = None
+        # Checked outside the lock: it is a round trip to the shared cache.
+        if entry is not None and self.version(entry[0].pk) != entry[3]:
+            with self._lock:
+                if self._entries.get(token) is entry:
+                    del self._entries[token]
+            entry = None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            if token in self._entries:
+                self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def set(self, token, user, claims, expires_at=None, version=_UNSET):
+        """
+        Cache (user, claims) for `token`. `version` is the stamp read with
+        version() before the user was loaded; by default it is read now.
+        """
+        if self.max_size <= 0:
+            return
+        if version is _UNSET:
+            version = self.version(user.pk)
+        expires_at = min(time.time() + self.ttl, expires_at or float('inf'))
+        with self._lock:
+            self._entries[token] = (user, claims, expires_at, version)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            stale = [token for token, (user, *_) in self._entries.items() if user.pk == user_id]
+            for token in stale:
+                del self._entries[token]
+        transaction.on_commit(lambda: self._replace_version(user_id))
+
+    def _replace_version(self, user_id):
+        try:
+            # Entries are never older than ttl, so the stamp can expire with them.
+            caches[self.alias].set(f'token-user-version:{user_id}', uuid.uuid4().hex, timeout=self.ttl)
+        except Exception:
+            logger.warning('Token user cache %r unavailable.', self.alias, exc_info=True)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+token_user_cache = TokenUserCache.from_settings()
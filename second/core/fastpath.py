@@ -0,0 +1,96 @@
+"""
+Read-only fast path for the doctor and booking lists (`?fast=1`), encoded
+with renderers.dumps.
+"""
+from itertools import groupby
+from operator import itemgetter
+
+from django.http import HttpResponse
+
+from .models import AvailabilitySlot
+from .pagination import KeysetPagination
+from .renderers import dumps
+from .serializer import DoctorSerializer, BookingSerializer
+
+
+def wants_fast(request):
+    return request.GET.get('fast', '').lower() in ('1', 'true', 'yes')
+
+
+class ValuesSerializer:
+    """
+    Renders values_list() rows the way `serializer` renders instances,
+    without building a model per row. Each field reads the column named by
+    its source (`doctor.name` -> `doctor__name`) through the field's
+    to_representation(), looked up once per list rather than once per row.
+    `computed` maps a field name to (lookups, function) for fields that are
+    not one column; the function gets the looked-up values in order. Fields
+    in `exclude` are left for the caller to fill.
+    """
+
+    def __init__(self, serializer, computed=None, exclude=()):
+        computed = computed or {}
+        self.lookups = []
+        self.accessors = []
+        for name, field in serializer.fields.items():
+            if name in exclude:
+                continue
+            if name in computed:
+                lookups, func = computed[name]
+                single = False
+            else:
+                lookups, func = [field.source.replace('.', '__')], field.to_representation
+                single = True
+            indexes = range(len(self.lookups), len(self.lookups) + len(lookups))
+            self.lookups.extend(lookups)
+            self.accessors.append((name, indexes[0] if single else indexes, func, single))
+
+    def rows(self, queryset):
+        return queryset.values_list(*self.lookups)
+
+    def to_representation(self, row):
+        data = {}
+        for name, index, func, single in self.accessors:
+            if single:
+                value = row[index]
+                data[name] = None if value is None else func(value)
+            else:
+                data[name] = func(*[row[i] for i in index])
+        return data
+
+
+def page_rows(values, queryset, request):
+    paginator = KeysetPagination()
+    page_queryset, page_size = paginator.get_page_queryset(values.rows(queryset), request)
+    page = [values.to_representation(row) for row in page_queryset]
+    return paginator.set_page(page, page_size, request, pk=itemgetter('id')), paginator.get_next_link()
+
+
+def booking_list(request, bookings):
+    page, next_link = page_rows(ValuesSerializer(BookingSerializer()), bookings, request)
+    return HttpResponse(dumps({'success': True, 'next': next_link, 'bookings': page}),
+                        content_type='application/json')
+
+
+def doctor_list(request, doctors):
+    """
+    The doctor page, then its slots in one query, grouped per doctor and
+    date as AvailableSlotsField renders them.
+    """
+    page, next_link = page_rows(ValuesSerializer(DoctorSerializer(), exclude=['available_slots']), doctors, request)
+
+    slots = AvailabilitySlot.objects.filter(doctor_id__in=[doctor['id'] for doctor in page]).order_by(
+        'doctor_id', 'date', 'time_slot'
+    ).values_list('doctor_id', 'date', 'time_slot')
+    grouped = {
+        doctor_id: [
+            {'date': date.isoformat(), 'slots': [time_slot for _, _, time_slot in day]}
+            for date, day in groupby(rows, key=itemgetter(1))
+        ]
+        for doctor_id, rows in groupby(slots, key=itemgetter(0))
+    }
+    for doctor in page:
+        doctor['available_slots'] = grouped.get(doctor['id'], [])
+
+    return HttpResponse(dumps({'success': True, 'next': next_link, 'doctors': page}),
+                        content_type='application/json')
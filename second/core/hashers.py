@@ -0,0 +1,157 @@
+"""
+Password hashing policy and bounded off-request hashing.
+
+The first entry of settings.PASSWORD_HASHERS hashes new passwords. Login
+verifies a hash with whichever hasher produced it and rehashes it when
+that hasher or its cost no longer matches the policy. Hashing runs in
+`hashing_pool`, a bounded thread or process pool. When the pool is full,
+callers get HashingBusy instead of queueing behind other requests.
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    PBKDF2PasswordHasher, identify_hasher, make_password, must_update_salt,
+)
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 with the iteration count from
+    settings.PASSWORD_POLICY['PBKDF2_ITERATIONS'], or Django's default when
+    that is unset. It keeps the `pbkdf2_sha256` algorithm name, so existing
+    hashes still verify. Only hashes below the policy's count are rehashed
+    on login; a stronger stored hash is never downgraded.
+    """
+    @property
+    def iterations(self):
+        return settings.PASSWORD_POLICY.get('PBKDF2_ITERATIONS') or PBKDF2PasswordHasher.iterations
+
+    def must_update(self, encoded):
+        decoded = self.decode(encoded)
+        return decoded['iterations'] < self.iterations or must_update_salt(decoded['salt'], self.salt_entropy)
+
+
+class HashingBusy(Exception):
+    """
+    Raised when every hashing slot is taken.
+    """
+
+
+def verify(password, encoded):
+    """
+    Return (valid, must_update) for `password` against `encoded`.
+    """
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False, False
+    valid = hasher.verify(password, encoded)
+    return valid, valid and hasher.must_update(encoded)
+
+
+def _setup_worker():
+    import django
+    django.setup()
+
+
+class HashingPool:
+    """
+    Runs hash functions on a thread or process pool with at most
+    `max_pending` calls in flight. PBKDF2 (hashlib) and Argon2 release the
+    GIL, so threads are enough for the stock hashers. Use processes for
+    hashers that hold it.
+    """
+
+    def __init__(self, kind='thread', workers=None, max_pending=None):
+        self.kind = kind
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        self.completed = 0
+        self.rejected = 0
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        options = getattr(settings, 'PASSWORD_POLICY', {})
+        return cls(
+            kind=options.get('POOL', 'thread'),
+            workers=options.get('POOL_WORKERS'),
+            max_pending=options.get('POOL_MAX_PENDING'),
+        )
+
+    def get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                if self.kind == 'process':
+                    self._executor = ProcessPoolExecutor(self.workers, initializer=_setup_worker)
+                else:
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='hashing')
+            return self._executor
+
+    def run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise HashingBusy()
+        try:
+            result = self.get_executor().submit(func, *args).result()
+            self.completed += 1
+            return result
+        finally:
+            self._slots.release()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def stats(self):
+        return {
+            'kind': self.kind,
+            'workers': self.workers,
+            'max_pending': self.max_pending,
+            'completed': self.completed,
+            'rejected': self.rejected,
+        }
+
+
+hashing_pool = HashingPool.from_settings()
+
+
+@lru_cache
+def _dummy_hash(policy):
+    return make_password('dummy-password-for-timing')
+
+
+def dummy_hash():
+    """
+    A hash made under the current policy, to verify against when there is no user.
+    """
+    return _dummy_hash((settings.PASSWORD_HASHERS[0], settings.PASSWORD_POLICY.get('PBKDF2_ITERATIONS')))
+
+
+def hash_password(password):
+    return hashing_pool.run(make_password, password)
+
+
+def check_user_password(user, password):
+    """
+    Check `password` for `user` (which may be None) and rehash the stored
+    hash if it is outdated. A missing user is checked against a dummy hash
+    so the response time does not reveal whether the email exists.
+    """
+    if user is None:
+        hashing_pool.run(verify, password, dummy_hash())
+        return False
+
+    valid, must_update = hashing_pool.run(verify, password, user.password)
+    if valid and must_update:
+        user.password = hashing_pool.run(make_password, password)
+        user.save(update_fields=['password'])
+    return valid
@@ -0,0 +1,93 @@
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client, override_settings
+
+from core.models import User, Doctor, AvailabilitySlot
+
+TIME_SLOTS = ['09:00', '10:00', '11:00', '12:00', '14:00', '15:00', '16:00', '17:00']
+BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed doctors with a year of slots and time the availability search. "
+        "Runs against the configured database and removes its fixtures afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--doctors', type=int, default=10_000)
+        parser.add_argument('--days', type=int, default=365)
+        parser.add_argument('--slots-per-day', type=int, default=2)
+        parser.add_argument('--specialties', type=int, default=20)
+        parser.add_argument('--queries', type=int, default=200)
+
+    def handle(self, *args, **options):
+        specialties = [f'bench-specialty-{n}' for n in range(options['specialties'])]
+        start_date = date.today() + timedelta(days=1)
+
+        started = time.perf_counter()
+        users = self.seed(options, specialties, start_date)
+        rows = options['doctors'] * options['days'] * options['slots_per_day']
+        self.stdout.write(f"Seeded {rows} slots in {time.perf_counter() - started:.1f}s")
+
+        try:
+            self.explain(specialties[0], start_date)
+            client = Client()
+            timings = []
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                for _ in range(options['queries']):
+                    window_start = start_date + timedelta(days=random.randrange(options['days']))
+                    params = {
+                        'specialty': random.choice(specialties),
+                        'start': window_start.isoformat(),
+                        'end': (window_start + timedelta(days=30)).isoformat(),
+                        'limit': 20,
+                    }
+                    began = time.perf_counter()
+                    response = client.get('/api/v1/availability/', params)
+                    timings.append(time.perf_counter() - began)
+                    assert response.status_code == 200, response.content
+        finally:
+            AvailabilitySlot.objects.filter(specialty__in=specialties).delete()
+            User.objects.filter(pk__in=users).delete()
+
+        timings.sort()
+        self.stdout.write(
+            f"{len(timings)} searches: p50 {timings[len(timings) // 2] * 1000:.2f}ms, "
+            f"p95 {timings[int(len(timings) * 0.95)] * 1000:.2f}ms, "
+            f"mean {statistics.mean(timings) * 1000:.2f}ms"
+        )
+
+    def seed(self, options, specialties, start_date):
+        users = User.objects.bulk_create(
+            [User(email=f'bench-availability-{n}@example.com', password='!') for n in range(options['doctors'])]
+        )
+        doctors = Doctor.objects.bulk_create([
+            Doctor(user=user, name=f'Bench {n}', specialty=specialties[n % len(specialties)])
+            for n, user in enumerate(users)
+        ])
+        batch = []
+        for doctor in doctors:
+            for day in range(options['days']):
+                slot_date = start_date + timedelta(days=day)
+                for time_slot in random.sample(TIME_SLOTS, options['slots_per_day']):
+                    batch.append(AvailabilitySlot(
+                        doctor=doctor, specialty=doctor.specialty, date=slot_date, time_slot=time_slot
+                    ))
+            if len(batch) >= BATCH_SIZE:
+                with transaction.atomic():
+                    AvailabilitySlot.objects.bulk_create(batch)
+                batch = []
+        AvailabilitySlot.objects.bulk_create(batch)
+        return [user.pk for user in users]
+
+    def explain(self, specialty, start_date):
+        queryset = AvailabilitySlot.objects.filter(
+            specialty=specialty, date__gte=start_date, date__lte=start_date + timedelta(days=30)
+        ).order_by('date', 'time_slot', 'doctor_id').values('doctor_id', 'doctor__name', 'date', 'time_slot')[:20]
+        self.stdout.write(f"Query plan ({connection.vendor}):\n{queryset.explain()}")
@@ -0,0 +1,73 @@
+import threading
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+
+from core.models import User, Doctor, Booking
+from core.views import book_slot
+
+
+class Command(BaseCommand):
+    help = (
+        "Start N threads booking the same slot and check that exactly one wins. "
+        "Runs against the configured database and removes its fixtures afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=20)
+        parser.add_argument('--rounds', type=int, default=10)
+
+    def handle(self, *args, **options):
+        threads = options['threads']
+        rounds = options['rounds']
+
+        patient = User.objects.create(email='bench-patient@example.com', password='!')
+        doctor_user = User.objects.create(email='bench-doctor@example.com', password='!')
+        doctor = Doctor.objects.create(user=doctor_user, name='Bench', specialty='Benchmark')
+        start_date = date.today() + timedelta(days=3650)
+        doctor.add_slots((start_date + timedelta(days=i), '09:00') for i in range(rounds))
+
+        wins = []
+        errors = 0
+        elapsed = 0.0
+        try:
+            for i in range(rounds):
+                slot_date = start_date + timedelta(days=i)
+                results = [None] * threads
+                barrier = threading.Barrier(threads)
+
+                def attempt(index):
+                    barrier.wait()
+                    try:
+                        results[index] = book_slot(patient, doctor, slot_date, '09:00')
+                    except OperationalError:
+                        results[index] = 'error'
+                    finally:
+                        connection.close()
+
+                workers = [threading.Thread(target=attempt, args=(n,)) for n in range(threads)]
+                started = time.perf_counter()
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+                elapsed += time.perf_counter() - started
+
+                errors += results.count('error')
+                won = [r for r in results if isinstance(r, Booking)]
+                wins.append(len(won))
+        finally:
+            patient.delete()
+            doctor_user.delete()
+
+        attempts = threads * rounds
+        self.stdout.write(
+            f"{attempts} attempts in {elapsed:.3f}s: {attempts / elapsed:.0f} attempts/s, "
+            f"{sum(wins) / elapsed:.1f} bookings/s, {errors} lock errors"
+        )
+        bad_rounds = [n for n, count in enumerate(wins) if count != 1]
+        if bad_rounds:
+            raise CommandError(f"Rounds {bad_rounds} did not have exactly one successful booking: {wins}")
+        self.stdout.write(self.style.SUCCESS(f"Exactly one booking per slot in all {rounds} rounds."))
@@ -0,0 +1,73 @@
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+from core.authentication import generate_jwt_token
+from core.models import User, Doctor, Booking, AvailabilitySlot
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare rows per second of the serializer and ?fast=1 paths of the "
+        "doctor and booking lists. Runs against the configured database and "
+        "removes its fixtures afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--doctors', type=int, default=2000)
+        parser.add_argument('--slots', type=int, default=10, help='Slots per doctor.')
+        parser.add_argument('--bookings', type=int, default=20_000)
+        parser.add_argument('--page-size', type=int, default=500)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        patient, users = self.seed(options)
+        client = Client(headers={'Authorization': f'Bearer {generate_jwt_token(patient)}'})
+        try:
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                for path, key in (('/api/v1/doctors/', 'doctors'), ('/api/v1/appointments/', 'bookings')):
+                    for label, fast in (('serializer', ''), ('fast', '&fast=1')):
+                        rate = self.measure(client, f"{path}?page_size={options['page_size']}{fast}", key, options)
+                        self.stdout.write(f"{path:<22} {label:<10} {rate:10.0f} rows/s")
+        finally:
+            Booking.objects.filter(user=patient).delete()
+            User.objects.filter(pk__in=users + [patient.pk]).delete()
+
+    def measure(self, client, path, key, options):
+        best = 0
+        for _ in range(options['repeat']):
+            rows = 0
+            started = time.perf_counter()
+            url = path
+            while url:
+                response = client.get(url)
+                assert response.status_code == 200, response.content
+                body = response.json()
+                rows += len(body[key])
+                url = body['next']
+            best = max(best, rows / (time.perf_counter() - started))
+        return best
+
+    def seed(self, options):
+        patient = User.objects.create(email='bench-fast-patient@example.com', password='!')
+        users = User.objects.bulk_create(
+            [User(email=f'bench-fast-{n}@example.com', password='!') for n in range(options['doctors'])]
+        )
+        doctors = Doctor.objects.bulk_create([
+            Doctor(user=user, name=f'Bench {n}', specialty='bench') for n, user in enumerate(users)
+        ])
+        start = date.today() + timedelta(days=1)
+        AvailabilitySlot.objects.bulk_create([
+            AvailabilitySlot(doctor=doctor, specialty='bench', date=start + timedelta(days=n), time_slot='09:00')
+            for doctor in doctors for n in range(options['slots'])
+        ], batch_size=5000)
+        Booking.objects.bulk_create([
+            Booking(
+                user=patient, doctor=doctors[n % len(doctors)],
+                date=start + timedelta(days=n // len(doctors)), time_slot='10:00',
+            )
+            for n in range(options['bookings'])
+        ], batch_size=5000)
+        return patient, [user.pk for user in users]
@@ -0,0 +1,62 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from core.hashers import HashingPool, verify
+
+POLICIES = {
+    'pbkdf2-1000k': ('core.hashers.TunedPBKDF2PasswordHasher', 1_000_000),
+    'pbkdf2-600k': ('core.hashers.TunedPBKDF2PasswordHasher', 600_000),
+    'pbkdf2-310k': ('core.hashers.TunedPBKDF2PasswordHasher', 310_000),
+    'argon2': ('django.contrib.auth.hashers.Argon2PasswordHasher', None),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Report password checks (the CPU cost of a login) per second for each "
+        "hashing policy: on one core inline, and through the hashing pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checks', type=int, default=20, help='Password checks per measurement.')
+        parser.add_argument('--pool', choices=['thread', 'process'], default='thread')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--policy', action='append', dest='policies', choices=list(POLICIES))
+
+    def handle(self, *args, **options):
+        checks = options['checks']
+        workers = options['workers']
+        for name in options['policies'] or POLICIES:
+            hasher, iterations = POLICIES[name]
+            policy = {**settings.PASSWORD_POLICY, 'PBKDF2_ITERATIONS': iterations}
+            with override_settings(PASSWORD_HASHERS=[hasher], PASSWORD_POLICY=policy):
+                try:
+                    encoded = make_password('correct horse battery staple')
+                except ValueError as exc:
+                    self.stdout.write(f"{name:<13} skipped: {exc}")
+                    continue
+
+                started = time.perf_counter()
+                for _ in range(checks):
+                    verify('correct horse battery staple', encoded)
+                inline = checks / (time.perf_counter() - started)
+
+                pool = HashingPool(kind=options['pool'], workers=workers, max_pending=workers * 4)
+                pool.run(verify, 'warm-up', encoded)
+                started = time.perf_counter()
+                with ThreadPoolExecutor(workers * 4) as callers:
+                    list(callers.map(lambda _: pool.run(verify, 'correct horse battery staple', encoded), range(checks)))
+                pooled = checks / (time.perf_counter() - started)
+                pool.shutdown()
+
+            self.stdout.write(
+                f"{name:<13} {inline:7.1f} checks/s on one core (inline), "
+                f"{pooled:7.1f} checks/s via {workers} {options['pool']} workers "
+                f"({pooled / workers:.1f}/s per worker)"
+            )
@@ -0,0 +1,138 @@
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core import renderers
+from core.renderers import FastJSONParser, FastJSONRenderer
+
+
+def best_rate(func, arg, seconds):
+    """
+    Calls per second of func(arg), the best of three runs of ~seconds/3.
+    """
+    best = 0
+    for _ in range(3):
+        calls = 0
+        started = time.perf_counter()
+        while time.perf_counter() - started < seconds / 3:
+            func(arg)
+            calls += 1
+        best = max(best, calls / (time.perf_counter() - started))
+    return best
+
+
+class Command(BaseCommand):
+    help = (
+        "Time DRF's JSONRenderer/JSONParser against FastJSONRenderer/FastJSONParser "
+        "on doctor and booking list pages, and on shop product/order and first user "
+        "payloads whose Decimals and datetimes go through the `default=` fallback. "
+        "Needs no database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500, help='Rows per list page.')
+        parser.add_argument('--seconds', type=float, default=1.5, help='Time per measurement.')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"JSON backend: {'orjson' if renderers.orjson else 'stdlib'}")
+        for name, payload in self.payloads(options['rows']).items():
+            body = JSONRenderer().render(payload)
+            assert FastJSONRenderer().render(payload) == body
+            rates = [
+                best_rate(JSONRenderer().render, payload, options['seconds']),
+                best_rate(FastJSONRenderer().render, payload, options['seconds']),
+                best_rate(lambda data: JSONParser().parse(BytesIO(data)), body, options['seconds']),
+                best_rate(lambda data: FastJSONParser().parse(BytesIO(data)), body, options['seconds']),
+            ]
+            megabytes = len(body) / 1_000_000
+            self.stdout.write(
+                f"{name:<16} {len(body) / 1024:8.1f} KiB  "
+                f"render {rates[0] * megabytes:7.1f} -> {rates[1] * megabytes:7.1f} MB/s  "
+                f"parse {rates[2] * megabytes:7.1f} -> {rates[3] * megabytes:7.1f} MB/s"
+            )
+
+    def payloads(self, rows):
+        created = datetime(2030, 1, 1, 9, tzinfo=timezone.utc)
+        return {
+            'doctors page': {
+                'success': True,
+                'next': 'http://testserver/api/v1/doctors/?cursor=NTAw',
+                'doctors': [
+                    {
+                        'id': n,
+                        'name': f'Dr. Doctor {n}',
+                        'specialty': 'cardiology',
+                        'available_slots': [
+                            {'date': f'2030-01-{day:02d}', 'slots': ['09:00', '10:00', '11:00', '14:00']}
+                            for day in range(1, 8)
+                        ],
+                    }
+                    for n in range(rows)
+                ],
+            },
+            'bookings page': {
+                'success': True,
+                'next': None,
+                'bookings': [
+                    {
+                        'id': n,
+                        'doctor_id': n % 50,
+                        'doctor_name': f'Dr. Doctor {n % 50}',
+                        'patient_email': f'patient{n}@example.com',
+                        'date': f'2030-{n % 12 + 1:02d}-{n % 28 + 1:02d}',
+                        'time_slot': '10:00',
+                        'status': 'confirmed',
+                    }
+                    for n in range(rows)
+                ],
+            },
+            # shop and first render model values with DRF's encoder as the
+            # `default=`, so these keep Decimal and datetime objects
+            'products page': {
+                'count': rows,
+                'next': None,
+                'results': [
+                    {
+                        'id': n,
+                        'name': f'Acme Phone {n}',
+                        'category': 'Phones',
+                        'brand': 'Acme',
+                        'price': Decimal(f'{n % 900 + 99}.99'),
+                        'stock': n % 40,
+                        'review_count': n % 17,
+                        'rating': round(3 + n % 20 / 10, 2) if n % 17 else None,
+                        'created_at': created + timedelta(minutes=n),
+                        'thumbnail': f'products/{n}/front.jpg',
+                    }
+                    for n in range(rows)
+                ],
+            },
+            'orders page': [
+                {
+                    'id': n,
+                    'status': 'paid',
+                    'created_at': created + timedelta(hours=n, microseconds=123456),
+                    'total': Decimal(f'{n * 3 + 10}.50'),
+                    'items': [
+                        {'product_id': item, 'quantity': item % 3 + 1, 'price': Decimal(f'{item + 9}.99')}
+                        for item in range(4)
+                    ],
+                }
+                for n in range(rows // 5)
+            ],
+            'users page': [
+                {
+                    'id': n,
+                    'email': f'user{n}@example.com',
+                    'date_joined': created + timedelta(days=n % 365),
+                    'last_login': created + timedelta(days=n % 365, hours=3) if n % 3 else None,
+                    'is_active': True,
+                }
+                for n in range(rows)
+            ],
+        }
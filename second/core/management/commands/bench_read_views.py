@@ -0,0 +1,122 @@
+import asyncio
+import importlib
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, AsyncClient, override_settings
+from django.urls import clear_url_caches
+
+from core.models import User, Doctor, Booking
+
+PATHS = ['/api/v1/doctors/', '/api/v1/appointments/']
+
+
+def use_async_views(enabled):
+    """
+    Re-import the URLconf with ASYNC_READ_VIEWS set to `enabled`.
+    """
+    with override_settings(ASYNC_READ_VIEWS=enabled):
+        importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+    clear_url_caches()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the sync (WSGI handler, one thread per in-flight request) and async "
+        "(ASGI handler, one event loop) read views under the same concurrent load. "
+        "Runs against the configured database and removes its fixtures afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--doctors', type=int, default=200)
+        parser.add_argument('--path', action='append', dest='paths', help='Path to request; may be repeated.')
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or PATHS
+        total = options['requests']
+        concurrency = options['concurrency']
+
+        users = self.create_fixtures(options['doctors'])
+        try:
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                for mode, run in (('sync/wsgi', self.run_sync), ('async/asgi', self.run_async)):
+                    use_async_views(mode.startswith('async'))
+                    latencies, failures, elapsed = run(paths, total, concurrency)
+                    self.report(mode, latencies, failures, elapsed)
+        finally:
+            use_async_views(settings.ASYNC_READ_VIEWS)
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+    def create_fixtures(self, count):
+        patient = User.objects.create(email='bench-read-patient@example.com', password='!')
+        users = User.objects.bulk_create(
+            [User(email=f'bench-read-doctor{n}@example.com', password='!') for n in range(count)]
+        )
+        doctors = Doctor.objects.bulk_create(
+            [Doctor(user=user, name=f'Bench {n}', specialty='Benchmark') for n, user in enumerate(users)]
+        )
+        start_date = date.today() + timedelta(days=3650)
+        for doctor in doctors:
+            doctor.add_slots((start_date + timedelta(days=day), '09:00') for day in range(5))
+        Booking.objects.bulk_create(
+            [Booking(user=patient, doctor=doctor, date=start_date, time_slot='10:00', status='confirmed')
+             for doctor in doctors]
+        )
+        return [patient, *users]
+
+    def run_sync(self, paths, total, concurrency):
+        def request(n):
+            started = time.perf_counter()
+            status = Client().get(paths[n % len(paths)]).status_code
+            return time.perf_counter() - started, status
+
+        def close_connection(_):
+            connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(request, range(total)))
+            list(pool.map(close_connection, range(concurrency)))
+        return self.split(results) + (time.perf_counter() - started,)
+
+    def run_async(self, paths, total, concurrency):
+        async def main():
+            client = AsyncClient()
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def request(n):
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.get(paths[n % len(paths)])
+                    if response.streaming:
+                        async for _ in response:
+                            pass
+                    return time.perf_counter() - started, response.status_code
+
+            return await asyncio.gather(*(request(n) for n in range(total)))
+
+        started = time.perf_counter()
+        results = asyncio.run(main())
+        return self.split(results) + (time.perf_counter() - started,)
+
+    def split(self, results):
+        latencies = sorted(latency for latency, _ in results)
+        failures = sum(1 for _, status in results if status != 200)
+        return latencies, failures
+
+    def report(self, mode, latencies, failures, elapsed):
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+        self.stdout.write(
+            f"{mode:<11} {len(latencies)} requests in {elapsed:.2f}s: {len(latencies) / elapsed:.0f} req/s, "
+            f"p50 {percentile(0.50):.1f}ms, p95 {percentile(0.95):.1f}ms, p99 {percentile(0.99):.1f}ms, "
+            f"mean {statistics.mean(latencies) * 1000:.1f}ms, {failures} non-200"
+        )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core.tasks import compact_slots
+
+
+class Command(BaseCommand):
+    help = "Delete availability slots dated before today. Run it daily (cron), or pass --enqueue to hand it to the worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--enqueue', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['enqueue']:
+            compact_slots.enqueue(batch_size=options['batch_size'])
+            self.stdout.write("Queued compact_slots.")
+            return
+        deleted = compact_slots(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} past slots."))
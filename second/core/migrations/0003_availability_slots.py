@@ -0,0 +1,107 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:58
+
+import django.db.models.deletion
+from collections import defaultdict
+from django.db import migrations, models
+from django.utils.dateparse import parse_date, parse_time
+
+
+BATCH_SIZE = 1000
+
+
+def parse_slots(entry):
+    """
+    The (date, time_slot) pairs of one legacy `available_slots` entry,
+    skipping malformed dates and values that are not times.
+    """
+    try:
+        date = parse_date(str(entry.get('date', '')))
+    except ValueError:
+        return []
+    slots = entry.get('slots')
+    if isinstance(slots, str):
+        slots = [slots]
+    if date is None or not isinstance(slots, list):
+        return []
+    pairs = []
+    for time_slot in slots:
+        try:
+            valid = isinstance(time_slot, str) and parse_time(time_slot) is not None
+        except ValueError:
+            valid = False
+        if valid:
+            pairs.append((date, time_slot))
+    return pairs
+
+
+def copy_slots_to_table(apps, schema_editor):
+    Doctor = apps.get_model('core', 'Doctor')
+    AvailabilitySlot = apps.get_model('core', 'AvailabilitySlot')
+    Booking = apps.get_model('core', 'Booking')
+
+    doctors = Doctor.objects.only('id', 'available_slots').order_by('id')
+    last_id = 0
+    while True:
+        chunk = list(doctors.filter(id__gt=last_id)[:BATCH_SIZE])
+        if not chunk:
+            break
+        last_id = chunk[-1].id
+        # Slots with an active booking are taken, not free.
+        booked = set(
+            Booking.objects.filter(doctor_id__in=[doctor.id for doctor in chunk])
+            .exclude(status='cancelled')
+            .values_list('doctor_id', 'date', 'time_slot')
+        )
+        AvailabilitySlot.objects.bulk_create(
+            [
+                AvailabilitySlot(doctor_id=doctor.id, date=date, time_slot=time_slot)
+                for doctor in chunk
+                for entry in doctor.available_slots or []
+                if isinstance(entry, dict)
+                for date, time_slot in parse_slots(entry)
+                if (doctor.id, date, time_slot) not in booked
+            ],
+            ignore_conflicts=True,
+        )
+
+
+def copy_slots_to_json(apps, schema_editor):
+    Doctor = apps.get_model('core', 'Doctor')
+    AvailabilitySlot = apps.get_model('core', 'AvailabilitySlot')
+
+    grouped = defaultdict(dict)
+    for doctor_id, date, time_slot in AvailabilitySlot.objects.order_by('date', 'time_slot').values_list('doctor_id', 'date', 'time_slot'):
+        grouped[doctor_id].setdefault(date.isoformat(), []).append(time_slot)
+    for doctor_id, dates in grouped.items():
+        Doctor.objects.filter(id=doctor_id).update(
+            available_slots=[{'date': date, 'slots': slots} for date, slots in dates.items()]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_booking_bookings_doctor__8896c0_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AvailabilitySlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('time_slot', models.CharField(max_length=20)),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slots', to='core.doctor')),
+            ],
+            options={
+                'db_table': 'availability_slots',
+                'ordering': ['date', 'time_slot'],
+                'constraints': [models.UniqueConstraint(fields=('doctor', 'date', 'time_slot'), name='unique_doctor_slot')],
+            },
+        ),
+        migrations.RunPython(copy_slots_to_table, copy_slots_to_json),
+        migrations.RemoveField(
+            model_name='doctor',
+            name='available_slots',
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:59
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def cancel_duplicate_active_bookings(apps, schema_editor):
+    """
+    Keep the earliest active booking of each (doctor, date, time_slot) and
+    cancel the others, so the unique constraint below can be added.
+    """
+    Booking = apps.get_model('core', 'Booking')
+    active = Booking.objects.using(schema_editor.connection.alias).exclude(status='cancelled')
+    duplicates = (
+        active.values('doctor_id', 'date', 'time_slot')
+        .annotate(first_id=Min('id'), count=Count('id'))
+        .filter(count__gt=1)
+        .order_by()
+    )
+    for slot in list(duplicates):
+        active.filter(doctor_id=slot['doctor_id'], date=slot['date'], time_slot=slot['time_slot']).exclude(
+            id=slot['first_id']
+        ).update(status='cancelled')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_availability_slots'),
+    ]
+
+    operations = [
+        migrations.RunPython(cancel_duplicate_active_bookings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'cancelled'), _negated=True), fields=('doctor', 'date', 'time_slot'), name='unique_active_booking'),
+        ),
+    ]
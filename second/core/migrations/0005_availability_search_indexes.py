@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:22
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_doctor_specialty(apps, schema_editor):
+    Doctor = apps.get_model('core', 'Doctor')
+    AvailabilitySlot = apps.get_model('core', 'AvailabilitySlot')
+    AvailabilitySlot.objects.update(
+        specialty=Subquery(Doctor.objects.filter(pk=OuterRef('doctor_id')).values('specialty')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_booking_unique_active_slot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='availabilityslot',
+            name='specialty',
+            field=models.CharField(default='', max_length=100),
+        ),
+        migrations.RunPython(copy_doctor_specialty, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='availabilityslot',
+            index=models.Index(fields=['specialty', 'date', 'time_slot', 'doctor'], name='slot_specialty_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='doctor',
+            index=models.Index(fields=['specialty'], name='doctors_special_fd5ec6_idx'),
+        ),
+    ]
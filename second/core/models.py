@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 
 
 class User(models.Model):
@@ -12,20 +12,83 @@ class User(models.Model):
     def __str__(self):
         return self.email
 
+    @property
+    def is_authenticated(self):
+        return True
+
+    @property
+    def is_anonymous(self):
+        return False
+
 
 class Doctor(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     name = models.CharField(max_length=100)
     specialty = models.CharField(max_length=100)
-    available_slots = models.JSONField(default=list)
     created_at = models.DateTimeField(null=True, blank=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'doctors'
+        indexes = [
+            models.Index(fields=['specialty']),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.specialty})"
+
+    def add_slots(self, slots):
+        """
+        Publish (date, time_slot) pairs with batched INSERTs in one transaction.
+        Duplicates, in `slots` or already stored, are skipped, and so are
+        pairs with an active booking: booking a slot deletes its row, so the
+        unique constraint alone would let it be published again.
+        """
+        slots = dict.fromkeys(slots)
+        if not slots:
+            return
+        with transaction.atomic():
+            booked = set(
+                Booking.objects.filter(doctor=self, date__in={date for date, _ in slots})
+                .exclude(status='cancelled')
+                .values_list('date', 'time_slot')
+            )
+            AvailabilitySlot.objects.bulk_create(
+                [
+                    AvailabilitySlot(doctor=self, specialty=self.specialty, date=date, time_slot=time_slot)
+                    for date, time_slot in slots
+                    if (date, time_slot) not in booked
+                ],
+                ignore_conflicts=True,
+            )
+
+    def sync_slot_specialty(self):
+        """
+        Copy the doctor's specialty onto their slots after it changes.
+        Called from a post_save signal, so every save path keeps them in step.
+        """
+        self.slots.exclude(specialty=self.specialty).update(specialty=self.specialty)
+
+
+class AvailabilitySlot(models.Model):
+    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, related_name='slots')
+    # Copy of doctor.specialty so availability search is one index range scan
+    specialty = models.CharField(max_length=100, default='')
+    date = models.DateField()
+    time_slot = models.CharField(max_length=20)
+
+    class Meta:
+        db_table = 'availability_slots'
+        ordering = ['date', 'time_slot']
+        indexes = [
+            models.Index(fields=['specialty', 'date', 'time_slot', 'doctor'], name='slot_specialty_date_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['doctor', 'date', 'time_slot'], name='unique_doctor_slot'),
+        ]
+
+    def __str__(self):
+        return f"{self.doctor_id} - {self.date} {self.time_slot}"
     
      
 class Booking(models.Model):
@@ -46,6 +109,14 @@ class Booking(models.Model):
         db_table = 'bookings'
         indexes = [
             models.Index(fields=['doctor_id', 'date', 'time_slot']),
+            models.Index(fields=['user', 'date']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['doctor', 'date', 'time_slot'],
+                condition=~models.Q(status='cancelled'),
+                name='unique_active_booking',
+            ),
         ]
     
     def __str__(self):
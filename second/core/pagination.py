@@ -0,0 +1,105 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from operator import attrgetter
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only cursor pagination ordered by primary key.
+
+    Each page is a single `WHERE id > cursor ORDER BY id LIMIT n` query,
+    so the cost does not grow with how deep the client has paged.
+    """
+    page_size = api_settings.PAGE_SIZE or 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor.'
+    max_cursor = 2 ** 63 - 1
+
+    def get_window(self, request):
+        """
+        Return (after_pk, page_size) from the query string.
+        """
+        try:
+            page_size = _positive_int(
+                request.GET[self.page_size_query_param], strict=True, cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            page_size = self.page_size
+
+        encoded = request.GET.get(self.cursor_query_param)
+        if not encoded:
+            return None, page_size
+        try:
+            after = int(urlsafe_b64decode(encoded.encode('ascii')).decode('ascii'))
+        except (TypeError, ValueError, UnicodeError, BinasciiError):
+            after = None
+        # A cursor the database cannot compare against is as invalid as garbage.
+        if after is None or not 0 <= after <= self.max_cursor:
+            raise ValidationError({self.cursor_query_param: [self.invalid_cursor_message]})
+        return after, page_size
+
+    def get_page_queryset(self, queryset, request):
+        after, page_size = self.get_window(request)
+        if after is not None:
+            queryset = queryset.filter(pk__gt=after)
+        return queryset.order_by('pk')[:page_size + 1], page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_queryset, page_size = self.get_page_queryset(queryset, request)
+        return self.set_page(list(page_queryset), page_size, request)
+
+    def set_page(self, rows, page_size, request, pk=attrgetter('pk')):
+        """
+        Trim the fetched rows to the page. `pk` reads a row's primary key.
+        """
+        self.request = request
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.last_pk = pk(rows[-1]) if rows else None
+        return rows
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        cursor = urlsafe_b64encode(str(self.last_pk).encode('ascii')).decode('ascii')
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+
+def wants_stream(request):
+    return request.GET.get('stream', '').lower() in ('1', 'true', 'yes')
+
+
+def stream_list(key, queryset, serializer_class, chunk_size=None):
+    """
+    Stream `{"success": true, "<key>": [...]}` row by row.
+
+    The queryset is read with `.iterator()`, so peak memory is bounded by
+    the chunk size rather than the number of rows.
+    """
+    chunk_size = chunk_size or settings.STREAM_CHUNK_SIZE
+    serializer = serializer_class()
+
+    def rows():
+        yield '{"success": true, %s: [' % json.dumps(key)
+        separator = ''
+        for obj in queryset.iterator(chunk_size=chunk_size):
+            yield separator + json.dumps(serializer.to_representation(obj), cls=JSONEncoder)
+            separator = ','
+        yield ']}'
+
+    return StreamingHttpResponse(rows(), content_type='application/json')
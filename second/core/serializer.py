@@ -1,6 +1,8 @@
+from datetime import datetime, timedelta
+from itertools import groupby
 from rest_framework import serializers
 from .models import User, Doctor, Booking
-from django.contrib.auth.hashers import make_password
+from .hashers import hash_password
 
 
 
@@ -10,11 +12,41 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ['id', 'email', 'password']
         
     def create(self, validated_data):
-        validated_data['password'] = make_password(validated_data['password'])
+        validated_data['password'] = hash_password(validated_data['password'])
         return super().create(validated_data)
         
 
+class AvailableSlotsField(serializers.Field):
+    """
+    Exposes a doctor's AvailabilitySlot rows as the historical
+    [{"date": ..., "slots": [...]}] structure.
+    """
+    def __init__(self, **kwargs):
+        kwargs.setdefault('source', 'slots')
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return [
+            {'date': date.isoformat(), 'slots': [slot.time_slot for slot in slots]}
+            for date, slots in groupby(value.all(), key=lambda slot: slot.date)
+        ]
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            raise serializers.ValidationError('Expected a list of {"date", "slots"} objects.')
+        date_field = serializers.DateField()
+        slots = []
+        for entry in data:
+            if not isinstance(entry, dict) or not isinstance(entry.get('slots'), list):
+                raise serializers.ValidationError('Each entry needs a "date" and a list of "slots".')
+            date = date_field.to_internal_value(entry.get('date'))
+            slots.extend((date, str(time_slot)) for time_slot in entry['slots'])
+        return slots
+
+
 class DoctorSerializer(serializers.ModelSerializer):
+    available_slots = AvailableSlotsField(required=False)
+
     class Meta:
         model = Doctor
         fields = ['id', 'name', 'specialty', 'available_slots']
@@ -24,20 +56,107 @@ class DoctorSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("This user already has a doctor profile.")
         return value
     
+    def create(self, validated_data):
+        new_slots = validated_data.pop('slots', [])
+        instance = super().create(validated_data)
+        instance.add_slots(new_slots)
+        return instance
+
     def update(self, instance, validated_data):
-        new_slots = validated_data.pop('available_slots', [])
-        instance.available_slots.extend(new_slots)
+        new_slots = validated_data.pop('slots', [])
         
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
 
+        instance.add_slots(new_slots)
         return instance
         
 
 class BookingSerializer(serializers.ModelSerializer):
     doctor_id = serializers.IntegerField()
+    doctor_name = serializers.CharField(source='doctor.name', read_only=True)
+    patient_email = serializers.EmailField(source='user.email', read_only=True)
     
     class Meta:
         model = Booking
-        fields = ['id', 'doctor_id', 'date', 'time_slot', 'status']     
+        fields = ['id', 'doctor_id', 'doctor_name', 'patient_email', 'date', 'time_slot', 'status']
+
+
+class BookingListQuerySerializer(serializers.Serializer):
+    """
+    Filters for the booking list. `role` defaults to `doctor` for callers
+    whose token carries a doctor_id claim and to `patient` otherwise.
+    """
+    role = serializers.ChoiceField(choices=['patient', 'doctor'], required=False)
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+
+class AvailabilityQuerySerializer(serializers.Serializer):
+    """
+    Query parameters of the availability search.
+    """
+    specialty = serializers.CharField(max_length=100)
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+    def validate(self, attrs):
+        if attrs.get('start') and attrs.get('end') and attrs['start'] > attrs['end']:
+            raise serializers.ValidationError('start must not be after end.')
+        return attrs
+
+
+class SlotTemplateSerializer(serializers.Serializer):
+    """
+    A recurring availability template, e.g. Mon-Fri 09:00-17:00 every 30
+    minutes from start_date to end_date. expand() returns the concrete
+    (date, time_slot) pairs.
+    """
+    WEEKDAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+    MAX_DAYS = 366
+    MAX_SLOTS = 20_000
+
+    weekdays = serializers.ListField(child=serializers.ChoiceField(choices=WEEKDAYS), min_length=1)
+    start_time = serializers.TimeField(format='%H:%M')
+    end_time = serializers.TimeField(format='%H:%M')
+    interval_minutes = serializers.IntegerField(min_value=5, max_value=24 * 60)
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+
+    def validate(self, attrs):
+        if attrs['start_time'] >= attrs['end_time']:
+            raise serializers.ValidationError('start_time must be before end_time.')
+        if attrs['start_date'] > attrs['end_date']:
+            raise serializers.ValidationError('start_date must not be after end_date.')
+        if (attrs['end_date'] - attrs['start_date']).days >= self.MAX_DAYS:
+            raise serializers.ValidationError(f'A template can cover at most {self.MAX_DAYS} days.')
+        if len(self.days(attrs)) * len(self.times(attrs)) > self.MAX_SLOTS:
+            raise serializers.ValidationError(f'A template can publish at most {self.MAX_SLOTS} slots.')
+        return attrs
+
+    def days(self, attrs):
+        weekdays = {self.WEEKDAYS.index(day) for day in attrs['weekdays']}
+        total = (attrs['end_date'] - attrs['start_date']).days + 1
+        return [
+            day for day in (attrs['start_date'] + timedelta(days=n) for n in range(total))
+            if day.weekday() in weekdays
+        ]
+
+    def times(self, attrs):
+        """
+        The day's slot start times; the last one ends by end_time.
+        """
+        step = timedelta(minutes=attrs['interval_minutes'])
+        current = datetime.combine(attrs['start_date'], attrs['start_time'])
+        end = datetime.combine(attrs['start_date'], attrs['end_time'])
+        times = []
+        while current + step <= end:
+            times.append(current.strftime('%H:%M'))
+            current += step
+        return times
+
+    def expand(self):
+        times = self.times(self.validated_data)
+        return [(day, time_slot) for day in self.days(self.validated_data) for time_slot in times]
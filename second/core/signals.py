@@ -0,0 +1,27 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import token_user_cache
+from .models import User, Doctor
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    # Any save may change the password or email a token was issued against.
+    token_user_cache.invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=Doctor)
+@receiver(post_delete, sender=Doctor)
+def invalidate_cached_doctor(sender, instance, **kwargs):
+    # Cached claims carry the doctor_id of the user's profile.
+    token_user_cache.invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=Doctor)
+def copy_specialty_to_slots(sender, instance, created, update_fields=None, **kwargs):
+    # Every save path (serializer, admin, shell) keeps the slots' copy in step.
+    if created or (update_fields is not None and 'specialty' not in update_fields):
+        return
+    instance.sync_slot_specialty()
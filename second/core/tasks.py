@@ -0,0 +1,51 @@
+from django.core.mail import send_mail
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from tasks.queue import task
+from .models import User, Booking, AvailabilitySlot
+
+
+@task
+def send_welcome_email(user_id):
+    user = User.objects.filter(id=user_id).first()
+    if user is None:
+        return
+    send_mail(
+        'Welcome!',
+        'Your account was created successfully.',
+        None,
+        [user.email],
+    )
+
+
+@task
+def send_booking_confirmation(booking_id):
+    booking = Booking.objects.select_related('user', 'doctor').filter(id=booking_id).first()
+    if booking is None:  # cancelled before the worker got to it
+        return
+    send_mail(
+        'Booking confirmed',
+        f"Your appointment with Dr. {booking.doctor.name} on {booking.date} at {booking.time_slot} is confirmed.",
+        None,
+        [booking.user.email],
+    )
+
+
+@task
+def compact_slots(batch_size=10_000):
+    """
+    Delete availability slots dated before today, walking the primary key
+    in windows of `batch_size` so each DELETE is short. Returns the count.
+    """
+    today = timezone.localdate()
+    bounds = AvailabilitySlot.objects.filter(date__lt=today).aggregate(low=Min('id'), high=Max('id'))
+    if bounds['low'] is None:
+        return 0
+    deleted = 0
+    for start in range(bounds['low'], bounds['high'] + 1, batch_size):
+        count, _ = AvailabilitySlot.objects.filter(
+            id__gte=start, id__lt=start + batch_size, date__lt=today
+        ).delete()
+        deleted += count
+    return deleted
@@ -1,3 +1,753 @@
-from django.test import TestCase
+import json
+import uuid
+from base64 import urlsafe_b64encode
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+import jwt
+from asgiref.sync import async_to_sync
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, make_password
+from django.core.cache import cache, caches
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.conf import settings
+from django.test import TestCase, TransactionTestCase, RequestFactory, AsyncRequestFactory, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import AuthenticationFailed, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from .async_views import doctor_list, booking_list
+from .authentication import JWTAuthentication, generate_jwt_token
+from .cache import TokenUserCache, token_user_cache
+from .hashers import HashingPool, TunedPBKDF2PasswordHasher
+from .tasks import compact_slots
+from .throttling import WindowCounter, throttle_stats
+from . import hashers, renderers
+from .models import User, Doctor, Booking, AvailabilitySlot
+from .pagination import KeysetPagination
+from .renderers import FastJSONParser, FastJSONRenderer
+from .serializer import DoctorSerializer, SlotTemplateSerializer
+from .views import DoctorProfileAPIView, BookAppointmentAPIView, book_slot
+
+
+class BookSlotTests(TestCase):
+    def setUp(self):
+        doctor_user = User.objects.create(email='doctor@example.com', password='x')
+        self.doctor = Doctor.objects.create(user=doctor_user, name='Doc', specialty='cardiology')
+        self.doctor.add_slots([(date(2030, 1, 1), '09:00')])
+        self.patients = [User.objects.create(email=f'patient{n}@example.com', password='x') for n in range(2)]
+
+    def book(self, patient):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {generate_jwt_token(patient)}')
+        return client.post(
+            '/api/v1/appointments/',
+            {'doctor_id': self.doctor.id, 'date': '2030-01-01', 'time_slot': '09:00'},
+            format='json',
+        )
+
+    def test_slot_is_booked_once(self):
+        self.assertEqual(self.book(self.patients[0]).status_code, 201)
+        self.assertEqual(self.book(self.patients[1]).status_code, 400)
+        self.assertEqual(Booking.objects.get().user, self.patients[0])
+        self.assertFalse(self.doctor.slots.exists())
+
+    def test_rebooking_after_cancellation(self):
+        self.assertEqual(self.book(self.patients[0]).status_code, 201)
+        Booking.objects.update(status='cancelled')
+        self.doctor.add_slots([(date(2030, 1, 1), '09:00')])
+        self.assertEqual(self.book(self.patients[1]).status_code, 201)
+        self.assertEqual(
+            sorted(Booking.objects.values_list('status', flat=True)), ['cancelled', 'confirmed']
+        )
+
+    def test_active_booking_wins_over_a_stray_slot_row(self):
+        Booking.objects.create(
+            user=self.patients[0], doctor=self.doctor, date=date(2030, 1, 1), time_slot='09:00', status='confirmed'
+        )
+        self.assertIsNone(book_slot(self.patients[1], self.doctor, date(2030, 1, 1), '09:00'))
+        # The claimed slot row is restored with the rolled-back transaction.
+        self.assertTrue(self.doctor.slots.exists())
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_book_slot_claims_the_slot(self):
+        booking = book_slot(self.patients[0], self.doctor, date(2030, 1, 1), '09:00')
+        self.assertEqual((booking.user, booking.status), (self.patients[0], 'confirmed'))
+        self.assertFalse(self.doctor.slots.exists())
+        self.assertIsNone(book_slot(self.patients[1], self.doctor, date(2030, 1, 1), '09:00'))
+        self.assertIsNone(book_slot(self.patients[1], self.doctor, date(2030, 1, 1), '10:00'))
+
+    def test_doctor_deletes_slots(self):
+        self.doctor.add_slots([(date(2030, 1, 1), '10:00'), (date(2030, 1, 2), '09:00')])
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {generate_jwt_token(self.doctor.user)}')
+
+        def delete(entry):
+            return client.delete(f'/api/v1/doctors/{self.doctor.id}/', {'available_slots': [entry]}, format='json')
+
+        self.assertEqual(delete({'date': '2030-01-01', 'slots': ['09:00', '10:00']}).status_code, 200)
+        self.assertEqual(list(self.doctor.slots.values_list('date', 'time_slot')), [(date(2030, 1, 2), '09:00')])
+        self.assertEqual(delete({'date': '2030-01-01', 'slots': '09:00'}).status_code, 404)
+        self.assertEqual(delete({'date': '2030-02-30', 'slots': '09:00'}).status_code, 400)
+        self.assertEqual(delete({'date': '2030-01-02', 'slots': '09:00'}).status_code, 200)
+        self.assertFalse(self.doctor.slots.exists())
+
+
+class MigrationTests(TransactionTestCase):
+    def migrate(self, name):
+        executor = MigrationExecutor(connection)
+        executor.migrate([('core', name)])
+        return executor.loader.project_state([('core', name)]).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes('core')[0][1])
+
+    def test_legacy_slots_are_copied_to_the_table(self):
+        apps = self.migrate('0002_booking_bookings_doctor__8896c0_idx')
+        User = apps.get_model('core', 'User')
+        Doctor = apps.get_model('core', 'Doctor')
+        Booking = apps.get_model('core', 'Booking')
+        doctor = Doctor.objects.create(
+            user=User.objects.create(email='doctor@example.com'),
+            name='Doc',
+            specialty='x',
+            available_slots=[
+                {'date': '2030-01-01', 'slots': ['09:00', '10:00', '11:00', 'noon', '25:00', 9]},
+                {'date': '2030-01-02', 'slots': '09:00'},
+                {'date': '2030-02-30', 'slots': ['09:00']},
+                {'date': 'soon', 'slots': ['09:00']},
+                {'date': '2030-01-03', 'slots': {'09:00': True}},
+                '2030-01-04',
+            ],
+        )
+        patient = User.objects.create(email='patient@example.com')
+        Booking.objects.create(doctor=doctor, user=patient, date=date(2030, 1, 1), time_slot='10:00', status='confirmed')
+        Booking.objects.create(doctor=doctor, user=patient, date=date(2030, 1, 1), time_slot='11:00', status='cancelled')
+
+        apps = self.migrate('0003_availability_slots')
+        slots = apps.get_model('core', 'AvailabilitySlot').objects.order_by('date', 'time_slot')
+        self.assertEqual(
+            list(slots.values_list('date', 'time_slot')),
+            [(date(2030, 1, 1), '09:00'), (date(2030, 1, 1), '11:00'), (date(2030, 1, 2), '09:00')],
+        )
+
+    def test_duplicate_active_bookings_are_cancelled_before_the_constraint(self):
+        apps = self.migrate('0003_availability_slots')
+        User = apps.get_model('core', 'User')
+        Doctor = apps.get_model('core', 'Doctor')
+        Booking = apps.get_model('core', 'Booking')
+        doctor = Doctor.objects.create(user=User.objects.create(email='doctor@example.com'), name='Doc', specialty='x')
+        patient = User.objects.create(email='patient@example.com')
+        slot = dict(doctor=doctor, user=patient, date=date(2030, 1, 1), time_slot='09:00')
+        first, second, third = [Booking.objects.create(status=status, **slot) for status in ('pending', 'confirmed', 'confirmed')]
+        other = Booking.objects.create(status='confirmed', **dict(slot, time_slot='10:00'))
+
+        self.migrate('0004_booking_unique_active_slot')
+        statuses = dict(Booking.objects.values_list('id', 'status'))
+        self.assertEqual(
+            statuses,
+            {first.id: 'pending', second.id: 'cancelled', third.id: 'cancelled', other.id: 'confirmed'},
+        )
+
+
+class TokenUserCacheTests(TestCase):
+    def setUp(self):
+        token_user_cache.clear()
+        self.user = User.objects.create(email='user@example.com', password='x')
+        self.token = generate_jwt_token(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    def test_hit_and_miss(self):
+        self.assertEqual(self.client.get('/api/v1/appointments/').status_code, 200)
+        self.assertEqual(token_user_cache.stats()['misses'], 1)
+        with self.assertNumQueries(1):  # the bookings page, no user lookup
+            self.assertEqual(self.client.get('/api/v1/appointments/').status_code, 200)
+        self.assertEqual(token_user_cache.stats()['hits'], 1)
+
+    def test_entries_expire_after_ttl_or_token_expiry(self):
+        cache = TokenUserCache(ttl=60)
+        with mock.patch('core.cache.time.time', return_value=1000.0):
+            cache.set('a', self.user, {}, expires_at=1030.0)
+            cache.set('b', self.user, {})
+            self.assertIsNotNone(cache.get('a'))
+        with mock.patch('core.cache.time.time', return_value=1031.0):
+            self.assertIsNone(cache.get('a'))
+            self.assertIsNotNone(cache.get('b'))
+        with mock.patch('core.cache.time.time', return_value=1061.0):
+            self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats()['size'], 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TokenUserCache(max_size=2)
+        cache.set('a', self.user, {})
+        cache.set('b', self.user, {})
+        cache.get('a')
+        cache.set('c', self.user, {})
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+
+    def test_user_save_and_delete_evict_entries(self):
+        self.client.get('/api/v1/appointments/')
+        self.user.phone_number = '555'
+        self.user.save()
+        self.assertEqual(token_user_cache.stats()['size'], 0)
+
+        self.client.get('/api/v1/appointments/')
+        self.user.delete()
+        response = self.client.get('/api/v1/appointments/')
+        self.assertEqual(response.status_code, 401)
+
+    def test_invalidation_reaches_other_processes(self):
+        # Two instances sharing the default cache stand in for two processes.
+        here, there = TokenUserCache(), TokenUserCache()
+        for cache in (here, there):
+            cache.set('a', self.user, {}, version=cache.version(self.user.pk))
+        with self.captureOnCommitCallbacks(execute=True):
+            here.invalidate_user(self.user.pk)
+        self.assertIsNone(here.get('a'))
+        self.assertIsNone(there.get('a'))
+        self.assertEqual(there.stats()['size'], 0)
+
+        there.set('a', self.user, {})
+        self.assertIsNotNone(there.get('a'))
+        with mock.patch.object(caches['default'], 'get', side_effect=ConnectionError), self.assertLogs('core.cache'):
+            self.assertIsNone(there.get('a'))
+
+
+class JWTAuthenticationTests(TestCase):
+    def setUp(self):
+        token_user_cache.clear()
+        self.patient = User.objects.create(email='patient@example.com', password='x')
+        self.stranger = User.objects.create(email='stranger@example.com', password='x')
+        doctor_user = User.objects.create(email='doctor@example.com', password='x')
+        self.doctor = Doctor.objects.create(user=doctor_user, name='Doc', specialty='cardiology')
+
+    def authenticate(self, header):
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=header)
+        return JWTAuthentication().authenticate(request)
+
+    def book(self, doctor=None):
+        return Booking.objects.create(
+            user=self.patient, doctor=doctor or self.doctor, date=date(2030, 1, 1),
+            time_slot=f'{9 + Booking.objects.count()}:00',
+        )
+
+    def delete(self, user, booking_id):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {generate_jwt_token(user)}')
+        return client.delete(f'/api/v1/appointments/{booking_id}/')
+
+    def test_tokens(self):
+        user, claims = self.authenticate(f'Bearer {generate_jwt_token(self.doctor.user)}')
+        self.assertEqual(user, self.doctor.user)
+        self.assertEqual((claims['user_id'], claims['doctor_id']), (self.doctor.user_id, self.doctor.id))
+
+        self.assertIsNone(self.authenticate(''))
+        self.assertIsNone(self.authenticate('Token abc'))
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate('Bearer not-a-jwt')
+        expired = jwt.encode(
+            {'user_id': self.patient.pk, 'exp': datetime.now(dt_timezone.utc) - timedelta(minutes=1)},
+            settings.SECRET_KEY, algorithm='HS256',
+        )
+        with self.assertRaisesMessage(AuthenticationFailed, 'expired'):
+            self.authenticate(f'Bearer {expired}')
+
+        # Tokens from before user_id was embedded carry only the email.
+        legacy = jwt.encode({'email': self.patient.email}, settings.SECRET_KEY, algorithm='HS256')
+        self.assertEqual(self.authenticate(f'Bearer {legacy}')[0], self.patient)
+
+        token = generate_jwt_token(self.stranger)
+        self.stranger.delete()
+        with self.assertRaisesMessage(AuthenticationFailed, 'does not exist'):
+            self.authenticate(f'Bearer {token}')
+
+    def test_delete_checks_ownership_from_claims(self):
+        self.assertEqual(self.delete(self.stranger, self.book().id).status_code, 403)
+        self.assertEqual(self.delete(self.patient, self.book().id).status_code, 200)
+        self.assertEqual(self.delete(self.doctor.user, self.book().id).status_code, 200)
+        self.assertEqual(self.delete(self.patient, 999).status_code, 404)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_doctor_claim_follows_the_doctor_profile(self):
+        doctor_user = self.doctor.user
+        token = f'Bearer {generate_jwt_token(doctor_user)}'
+        self.assertIn('doctor_id', self.authenticate(token)[1])
+
+        # The profile is deleted and its id reused for another user's profile.
+        doctor_id = self.doctor.id
+        self.doctor.delete()
+        self.assertNotIn('doctor_id', self.authenticate(token)[1])
+        other = Doctor.objects.create(id=doctor_id, user=self.stranger, name='Other', specialty='cardiology')
+        booking = self.book(other)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=token)
+        self.assertEqual(client.delete(f'/api/v1/appointments/{booking.id}/').status_code, 403)
+
+        # A token issued before the profile existed gains the claim.
+        token = f'Bearer {generate_jwt_token(self.patient)}'
+        self.assertNotIn('doctor_id', self.authenticate(token)[1])
+        profile = Doctor.objects.create(user=self.patient, name='Patient Doc', specialty='dermatology')
+        self.assertEqual(self.authenticate(token)[1]['doctor_id'], profile.id)
+
+
+class AsyncReadViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        patient = User.objects.create(email='patient@example.com', password='x')
+        for number in range(3):
+            user = User.objects.create(email=f'doctor{number}@example.com', password='x')
+            doctor = Doctor.objects.create(user=user, name=f'Doctor {number}', specialty='cardiology')
+            doctor.add_slots([(date(2030, 1, 1), '09:00'), (date(2030, 1, 2), '10:00')])
+            Booking.objects.create(
+                user=patient, doctor=doctor, date=date(2030, 1, 3), time_slot='11:00', status='confirmed'
+            )
+
+    def assert_same_response(self, sync_view, async_view, path, **extra):
+        sync_response = sync_view(RequestFactory().get(path, **extra))
+        async_response = self.async_call(async_view, path, **extra)
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(json.loads(async_response.content), json.loads(sync_response.rendered_content))
+
+    def async_call(self, view, path, **extra):
+        return async_to_sync(view)(AsyncRequestFactory().get(path, **extra))
+
+    def test_doctor_list_matches_sync_view(self):
+        view = DoctorProfileAPIView.as_view()
+        self.assert_same_response(view, doctor_list, '/api/v1/doctors/')
+        self.assert_same_response(view, doctor_list, '/api/v1/doctors/?page_size=2')
+
+    def test_booking_list_matches_sync_view(self):
+        view = BookAppointmentAPIView.as_view()
+        patient = User.objects.get(email='patient@example.com')
+        doctor = User.objects.get(email='doctor0@example.com')
+        for user in (patient, doctor):
+            headers = {'Authorization': f'Bearer {generate_jwt_token(user)}'}
+            self.assert_same_response(view, booking_list, '/api/v1/appointments/', headers=headers)
+            self.assert_same_response(view, booking_list, '/api/v1/appointments/?page_size=1', headers=headers)
+        self.assert_same_response(view, booking_list, '/api/v1/appointments/')
+
+    def test_streamed_list(self):
+        response = self.async_call(doctor_list, '/api/v1/doctors/?stream=1')
+
+        async def read():
+            return b''.join([chunk async for chunk in response])
+
+        body = json.loads(async_to_sync(read)())
+        self.assertEqual(len(body['doctors']), 3)
+
+    def test_invalid_cursor_and_token(self):
+        response = self.async_call(doctor_list, '/api/v1/doctors/?cursor=%%%')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.content), {'cursor': ['Invalid cursor.']})
+        response = self.async_call(booking_list, '/api/v1/appointments/', headers={'Authorization': 'Bearer nope'})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer')
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for number in range(5):
+            user = User.objects.create(email=f'doctor{number}@example.com', password='x')
+            doctor = Doctor.objects.create(user=user, name=f'Doctor {number}', specialty='cardiology')
+            doctor.add_slots([(date(2030, 1, 1), '09:00')])
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def get(self, path, **params):
+        response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def cursor(self, value):
+        return urlsafe_b64encode(str(value).encode()).decode()
+
+    def test_cursor_round_trip(self):
+        ids, path, params = [], '/api/v1/doctors/', {'page_size': 2}
+        while path:
+            page = self.get(path, **params)
+            self.assertLessEqual(len(page['doctors']), 2)
+            ids += [doctor['id'] for doctor in page['doctors']]
+            path, params = page['next'], {}
+        self.assertEqual(ids, list(Doctor.objects.order_by('id').values_list('id', flat=True)))
+
+    def test_page_size_is_capped(self):
+        with mock.patch.object(KeysetPagination, 'max_page_size', 3):
+            self.assertEqual(len(self.get('/api/v1/doctors/', page_size=100)['doctors']), 3)
+        self.assertEqual(len(self.get('/api/v1/doctors/', page_size=0)['doctors']), 5)
+        self.assertEqual(len(self.get('/api/v1/doctors/', page_size='many')['doctors']), 5)
+
+    def test_invalid_or_tampered_cursor_is_rejected(self):
+        for cursor in ('%%%', 'not-base64!', self.cursor('abc'), self.cursor(-1), self.cursor(10 ** 30), 'é'):
+            response = self.client.get('/api/v1/doctors/', {'cursor': cursor})
+            self.assertEqual(response.status_code, 400, cursor)
+            self.assertEqual(response.json(), {'cursor': ['Invalid cursor.']})
+
+    def test_last_page_is_stable(self):
+        last_ids = list(Doctor.objects.order_by('id').values_list('id', flat=True))[-2:]
+        params = {'page_size': 2, 'cursor': self.cursor(last_ids[0] - 1)}
+        for _ in range(2):
+            page = self.get('/api/v1/doctors/', **params)
+            self.assertEqual([doctor['id'] for doctor in page['doctors']], last_ids)
+            self.assertIsNone(page['next'])
+        page = self.get('/api/v1/doctors/', cursor=self.cursor(last_ids[-1]))
+        self.assertEqual((page['doctors'], page['next']), ([], None))
+
+    def test_stream_matches_paged_list(self):
+        response = self.client.get('/api/v1/doctors/', {'stream': 1})
+        streamed = json.loads(b''.join(response.streaming_content))
+        paged = self.get('/api/v1/doctors/', page_size=100)
+        self.assertEqual(streamed['doctors'], paged['doctors'])
+
+
+class BookingListScopeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = User.objects.create(email='patient@example.com', password='x')
+        cls.other = User.objects.create(email='other@example.com', password='x')
+        cls.doctor_user = User.objects.create(email='doctor@example.com', password='x')
+        cls.doctor = Doctor.objects.create(user=cls.doctor_user, name='Doctor', specialty='cardiology')
+        second = Doctor.objects.create(
+            user=User.objects.create(email='second@example.com', password='x'), name='Second', specialty='cardiology'
+        )
+        Booking.objects.create(user=cls.patient, doctor=cls.doctor, date=date(2030, 1, 1), time_slot='09:00')
+        Booking.objects.create(user=cls.patient, doctor=second, date=date(2030, 2, 1), time_slot='09:00')
+        Booking.objects.create(user=cls.other, doctor=cls.doctor, date=date(2030, 3, 1), time_slot='09:00')
+        Booking.objects.create(user=cls.doctor_user, doctor=second, date=date(2030, 4, 1), time_slot='09:00')
+
+    def list_bookings(self, user, query=''):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {generate_jwt_token(user)}')
+        return client.get(f'/api/v1/appointments/{query}')
+
+    def dates(self, response):
+        self.assertEqual(response.status_code, 200, response.content)
+        return [booking['date'] for booking in response.json()['bookings']]
+
+    def test_requires_authentication(self):
+        self.assertEqual(APIClient().get('/api/v1/appointments/').status_code, 401)
+
+    def test_patient_sees_own_bookings(self):
+        response = self.list_bookings(self.patient)
+        self.assertEqual(self.dates(response), ['2030-01-01', '2030-02-01'])
+        self.assertEqual(response.json()['bookings'][0]['doctor_name'], 'Doctor')
+        self.assertEqual(self.list_bookings(self.patient, '?role=doctor').status_code, 403)
+
+    def test_doctor_sees_their_patients_and_can_switch_role(self):
+        response = self.list_bookings(self.doctor_user)
+        self.assertEqual(self.dates(response), ['2030-01-01', '2030-03-01'])
+        self.assertEqual(
+            [booking['patient_email'] for booking in response.json()['bookings']],
+            ['patient@example.com', 'other@example.com'],
+        )
+        self.assertEqual(self.dates(self.list_bookings(self.doctor_user, '?role=patient')), ['2030-04-01'])
+
+    def test_date_range(self):
+        self.assertEqual(self.dates(self.list_bookings(self.patient, '?start=2030-01-15')), ['2030-02-01'])
+        self.assertEqual(self.dates(self.list_bookings(self.patient, '?end=2030-01-15')), ['2030-01-01'])
+        self.assertEqual(self.list_bookings(self.patient, '?start=soon').status_code, 400)
+
+    def test_query_count_does_not_grow_with_bookings(self):
+        token = generate_jwt_token(self.other)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        client.get('/api/v1/appointments/')
+        with self.assertNumQueries(1):
+            self.assertEqual(len(client.get('/api/v1/appointments/').json()['bookings']), 1)
+
+        Booking.objects.bulk_create([
+            Booking(user=self.other, doctor=self.doctor, date=date(2031, 1, day), time_slot='09:00')
+            for day in range(1, 11)
+        ])
+        with self.assertNumQueries(1):
+            self.assertEqual(len(client.get('/api/v1/appointments/').json()['bookings']), 11)
+
+
+class FastListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = User.objects.create(email='patient@example.com', password='x')
+        for number in range(4):
+            user = User.objects.create(email=f'doctor{number}@example.com', password='x')
+            doctor = Doctor.objects.create(user=user, name=f'Doctor {number}', specialty='cardiology')
+            if number != 2:
+                doctor.add_slots([(date(2030, 1, 2), '10:00'), (date(2030, 1, 1), '09:00'), (date(2030, 1, 1), '11:00')])
+            Booking.objects.create(user=cls.patient, doctor=doctor, date=date(2030, 1, 3), time_slot='11:00')
+
+    def assert_same_pages(self, path, key, client=None):
+        client = client or APIClient()
+        query = '?page_size=3'
+        while query:
+            expected = client.get(f'{path}{query}').json()
+            response = client.get(f'{path}{query}&fast=1')
+            self.assertEqual(response['Content-Type'], 'application/json')
+            fast = response.json()
+            self.assertTrue(expected[key])
+            self.assertEqual(fast[key], expected[key])
+            self.assertEqual(bool(fast['next']), bool(expected['next']))
+            query = expected['next'] and '?' + expected['next'].split('?', 1)[1].replace('&fast=1', '')
+
+    def test_doctor_list_matches_serializer(self):
+        self.assert_same_pages('/api/v1/doctors/', 'doctors')
+
+    def test_booking_list_matches_serializer(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {generate_jwt_token(self.patient)}')
+        self.assert_same_pages('/api/v1/appointments/', 'bookings', client)
+
+
+@override_settings(PASSWORD_POLICY={'PBKDF2_ITERATIONS': 1000})
+class PasswordPolicyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def login(self, password='secret'):
+        return self.client.post('/api/v1/login/', {'email': 'user@example.com', 'password': password}, format='json')
+
+    def test_signup_hashes_with_policy_and_login_rehashes_outdated(self):
+        self.client.post('/api/v1/signup/', {'email': 'user@example.com', 'password': 'secret'}, format='json')
+        user = User.objects.get(email='user@example.com')
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$1000$'))
+
+        with override_settings(PASSWORD_POLICY={'PBKDF2_ITERATIONS': 2000}):
+            self.assertEqual(self.login().status_code, 200)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$2000$'))
+
+        self.assertEqual(self.login('wrong').status_code, 401)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$2000$'))
+
+        # A stored hash stronger than the policy is kept, not downgraded.
+        self.assertEqual(self.login().status_code, 200)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$2000$'))
+
+        with override_settings(PASSWORD_POLICY={}):
+            self.assertEqual(TunedPBKDF2PasswordHasher().iterations, PBKDF2PasswordHasher.iterations)
+
+    def test_unknown_email_and_busy_pool(self):
+        User.objects.create(email='user@example.com', password=make_password('secret'))
+        self.assertEqual(self.client.post(
+            '/api/v1/login/', {'email': 'nobody@example.com', 'password': 'secret'}, format='json'
+        ).status_code, 401)
+
+        full_pool = HashingPool(workers=1, max_pending=1)
+        full_pool._slots.acquire()
+        original, hashers.hashing_pool = hashers.hashing_pool, full_pool
+        try:
+            response = self.login()
+        finally:
+            hashers.hashing_pool = original
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(full_pool.stats()['rejected'], 1)
+
+
+@override_settings(
+    PASSWORD_POLICY={'PBKDF2_ITERATIONS': 1000},
+    REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {'login_ip': '4/min', 'login_account': '2/min'},
+    },
+)
+class LoginThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def login(self, email, ip='10.0.0.1'):
+        return self.client.post(
+            '/api/v1/login/', {'email': email, 'password': 'wrong'}, format='json', REMOTE_ADDR=ip
+        )
+
+    def test_account_limit_rejects_before_any_query(self):
+        for _ in range(2):
+            self.assertEqual(self.login('victim@example.com').status_code, 401)
+        rejected = throttle_stats().get('login_account', {}).get('rejected', 0)
+        with self.assertNumQueries(0):
+            response = self.login('Victim@Example.com ', ip='10.0.0.2')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(throttle_stats()['login_account']['rejected'], rejected + 1)
+        self.assertEqual(self.login('other@example.com', ip='10.0.0.2').status_code, 401)
+
+    def test_ip_limit(self):
+        for n in range(4):
+            self.assertEqual(self.login(f'user{n}@example.com').status_code, 401)
+        self.assertEqual(self.login('user99@example.com').status_code, 429)
+        self.assertEqual(self.login('user99@example.com', ip='10.0.0.3').status_code, 401)
+
+    def test_concurrent_attempts_are_counted_once_each(self):
+        counter = WindowCounter()
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(lambda _: counter.take('throttle:test:burst', 5, 60)[0], range(50)))
+        self.assertEqual(results.count(True), 5)
+
+    def test_rejected_attempts_are_not_counted_and_cache_outage_falls_back(self):
+        counter = WindowCounter()
+        with mock.patch('core.throttling.time.time', return_value=600.0):
+            self.assertTrue(counter.take('throttle:test:window', 1, 60)[0])
+            self.assertEqual(counter.take('throttle:test:window', 1, 60), (False, 60.0))
+            self.assertEqual(cache.get('throttle:test:window:10'), 1)
+        with self.assertLogs('core.throttling', 'WARNING'), mock.patch('core.throttling.caches', {'default': None}):
+            self.assertTrue(counter.take('throttle:test:outage', 1, 60)[0])
+            self.assertFalse(counter.take('throttle:test:outage', 1, 60)[0])
+
+
+class AvailabilitySearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cardio = Doctor.objects.create(
+            user=User.objects.create(email='a@example.com', password='x'), name='A', specialty='cardiology'
+        )
+        cls.derm = Doctor.objects.create(
+            user=User.objects.create(email='b@example.com', password='x'), name='B', specialty='dermatology'
+        )
+        cls.cardio.add_slots([(date(2030, 1, 2), '10:00'), (date(2030, 1, 1), '15:00'), (date(2030, 2, 1), '09:00')])
+        cls.derm.add_slots([(date(2030, 1, 1), '09:00')])
+
+    def search(self, **params):
+        return APIClient().get('/api/v1/availability/', params)
+
+    def test_first_slots_for_specialty_in_range(self):
+        response = self.search(specialty='cardiology', start='2030-01-01', end='2030-01-31')
+        self.assertEqual(
+            [(slot['date'], slot['time_slot']) for slot in response.data['slots']],
+            [(date(2030, 1, 1), '15:00'), (date(2030, 1, 2), '10:00')],
+        )
+        self.assertEqual(response.data['slots'][0]['doctor_name'], 'A')
+        self.assertEqual(len(self.search(specialty='cardiology', start='2030-01-01', limit=1).data['slots']), 1)
+
+    def test_specialty_change_moves_slots(self):
+        serializer = DoctorSerializer(self.cardio, data={'specialty': 'neurology'}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        self.assertEqual(len(self.search(specialty='neurology', start='2030-01-01').data['slots']), 3)
+        self.assertEqual(self.search(specialty='cardiology', start='2030-01-01').data['slots'], [])
+        self.assertEqual(AvailabilitySlot.objects.filter(specialty='dermatology').count(), 1)
+
+    def test_plain_save_moves_slots(self):
+        self.cardio.specialty = 'neurology'
+        self.cardio.save(update_fields=['name'])
+        self.assertEqual(AvailabilitySlot.objects.filter(specialty='neurology').count(), 0)
+        self.cardio.save()
+        self.assertEqual(len(self.search(specialty='neurology', start='2030-01-01').data['slots']), 3)
+        self.assertEqual(self.search(specialty='cardiology', start='2030-01-01').data['slots'], [])
+
+    def test_invalid_queries(self):
+        self.assertEqual(self.search().status_code, 400)
+        self.assertEqual(self.search(specialty='x', start='2030-02-01', end='2030-01-01').status_code, 400)
+        self.assertEqual(self.search(specialty='x', limit=1000).status_code, 400)
+
+
+class SlotTemplateTests(TestCase):
+    def setUp(self):
+        user = User.objects.create(email='doc@example.com', password='x')
+        self.doctor = Doctor.objects.create(user=user, name='Doc', specialty='cardiology')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {generate_jwt_token(user)}')
+
+    def publish(self, **overrides):
+        template = {
+            'weekdays': ['mon', 'tue', 'wed', 'thu', 'fri'],
+            'start_time': '09:00',
+            'end_time': '17:00',
+            'interval_minutes': 30,
+            'start_date': '2030-01-07',  # a Monday
+            'end_date': '2030-01-20',
+            **overrides,
+        }
+        return self.client.post('/api/v1/doctors/slots/', template, format='json')
+
+    def test_template_expands_and_overlaps_are_merged(self):
+        response = self.publish()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 10 * 16)
+        slots = self.doctor.slots.all()
+        self.assertEqual(slots.first().time_slot, '09:00')
+        self.assertEqual(slots.last().time_slot, '16:30')
+        self.assertEqual({slot.date.weekday() for slot in slots}, {0, 1, 2, 3, 4})
+
+        response = self.publish(weekdays=['fri', 'sat'], start_time='16:00', end_time='18:00')
+        self.assertEqual(response.data['requested'], 4 * 4)
+        self.assertEqual(response.data['created'], 4 * 4 - 2 * 2)
+        self.assertEqual(set(slots.values_list('specialty', flat=True)), {'cardiology'})
+
+    def test_republishing_skips_booked_slots(self):
+        window = {'weekdays': ['mon'], 'start_time': '09:00', 'end_time': '10:00', 'end_date': '2030-01-07'}
+        self.assertEqual(self.publish(**window).data['created'], 2)
+        patient = User.objects.create(email='patient@example.com', password='x')
+        patient_client = APIClient()
+        patient_client.credentials(HTTP_AUTHORIZATION=f'Bearer {generate_jwt_token(patient)}')
+        booking = {'doctor_id': self.doctor.id, 'date': '2030-01-07', 'time_slot': '09:00'}
+        self.assertEqual(patient_client.post('/api/v1/appointments/', booking, format='json').status_code, 201)
+
+        self.assertEqual(self.publish(**window).data['created'], 0)
+        self.assertEqual(list(self.doctor.slots.values_list('time_slot', flat=True)), ['09:30'])
+
+        Booking.objects.filter(doctor=self.doctor).update(status='cancelled')
+        self.assertEqual(self.publish(**window).data['created'], 1)
+
+    def test_invalid_templates(self):
+        self.assertEqual(self.publish(start_time='17:00', end_time='09:00').status_code, 400)
+        self.assertEqual(self.publish(weekdays=['someday']).status_code, 400)
+        self.assertEqual(self.publish(end_date='2032-01-01').status_code, 400)
+        too_many = self.publish(
+            weekdays=SlotTemplateSerializer.WEEKDAYS, interval_minutes=5, end_date='2030-12-31'
+        )
+        self.assertEqual(too_many.status_code, 400)
+        self.assertFalse(self.doctor.slots.exists())
+
+    def test_compaction_prunes_past_dates(self):
+        today = date.today()
+        self.doctor.add_slots([(today - timedelta(days=n), '09:00') for n in range(1, 30)] + [(today, '09:00')])
+        self.assertEqual(compact_slots(batch_size=7), 29)
+        self.assertEqual(list(self.doctor.slots.values_list('date', flat=True)), [today])
+
+
+class FastJSONTests(TestCase):
+    payload = {
+        'price': Decimal('499.90'),
+        'date': date(2030, 1, 3),
+        'created_at': datetime(2030, 1, 3, 9, 30, 15, 123456, tzinfo=dt_timezone.utc),
+        'time': time(9, 30),
+        'id': uuid.UUID(int=1),
+        'label': gettext_lazy('Phones'),
+        'rows': [{'count': 1, 'empty': None, 'ratio': 1.5, 'name': 'Zoë'}],
+        7: 'int key',
+    }
+
+    def test_renders_like_drf(self):
+        expected = JSONRenderer().render(self.payload)
+        self.assertEqual(FastJSONRenderer().render(self.payload), expected)
+        with mock.patch.object(renderers, 'orjson', None):
+            self.assertEqual(FastJSONRenderer().render(self.payload), expected)
+        self.assertIn(b'"2030-01-03T09:30:15.123456Z"', expected)
+
+    def test_falls_back_to_drf_where_orjson_differs(self):
+        payload = {'id': 2 ** 70, 'rows': [{'rating': None}]}
+        self.assertEqual(FastJSONRenderer().render(payload), JSONRenderer().render(payload))
+        for value in (float('nan'), float('inf')):
+            with self.assertRaisesMessage(ValueError, 'Out of range float values'):
+                FastJSONRenderer().render({'rows': [{'rating': value}]})
+
+    def test_parses_like_drf(self):
+        body = '{"a": [1, 2.5, "Zoë", null], "b": {"c": true}}'.encode()
+        self.assertEqual(FastJSONParser().parse(BytesIO(body)), JSONParser().parse(BytesIO(body)))
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(BytesIO(b'{"a": '))
+
+    def test_parses_integers_over_64_bits_exactly(self):
+        for number in (2 ** 64, -2 ** 63 - 1, 10 ** 30):
+            body = b'{"id": %d, "price": 1.5}' % number
+            self.assertEqual(FastJSONParser().parse(BytesIO(body)), {'id': number, 'price': 1.5})
@@ -1,66 +1,123 @@
-from datetime import datetime, timedelta, timezone
-import jwt
-from django.contrib.auth.hashers import check_password
 from rest_framework.response import Response
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, authentication_classes, throttle_classes
 from rest_framework import status
 from rest_framework.views import APIView
-from .serializer import UserSerializer, DoctorSerializer, BookingSerializer
-from .models import User, Doctor, Booking
+from .serializer import (
+    UserSerializer, DoctorSerializer, BookingSerializer, BookingListQuerySerializer, AvailabilityQuerySerializer,
+    SlotTemplateSerializer,
+)
+from .models import User, Doctor, Booking, AvailabilitySlot
+from .authentication import generate_jwt_token
+from .cache import token_user_cache
+from .hashers import HashingBusy, check_user_password, hashing_pool
+from .tasks import send_welcome_email, send_booking_confirmation
+from .pagination import KeysetPagination, stream_list, wants_stream
+from . import fastpath
+from .throttling import LoginIPThrottle, LoginAccountThrottle, throttle_stats
 from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from tasks.worker import queue_stats
 
 
-def generate_jwt_token(user):
-    payload = {
-        'email': user.email,
-        'iat': datetime.now(timezone.utc),
-        'exp': datetime.now(timezone.utc) + timedelta(minutes=60),
-    }
-    return jwt.encode(payload, settings.SECRET_KEY, algorithm='HS256')
+def book_slot(user, doctor, date, time_slot):
+    """
+    Claim a slot and create its booking in one transaction.
 
-    # this version is better to debug! : 
-    # token = jwt.encode(payload, settings.SECRET_KEY, algorithm='HS256')
-    # return token
-
-def decode_jwt_token(token):
+    The conditional DELETE on the slot row lets exactly one concurrent
+    caller win, and the partial unique constraint on Booking rejects any
+    second active booking for the same (doctor, date, time_slot).
+    Returns the booking, or None if the slot is not available.
+    """
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
-        return payload, None 
-    except jwt.ExpiredSignatureError:
-        return None, "Token has expired."
-    except jwt.InvalidTokenError:
-        return None, "Invalid token."
-
-def get_user_from_token(request):
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return None, 'Authorization header missing or invalid.'
-
-    # decode the token
-    token = auth_header.split(' ')[1]
-    payload, error_message = decode_jwt_token(token)
-    if not payload:
-        return None, error_message
-
-    # Fetch the user
-    email = payload.get('email')
-    user = User.objects.filter(email=email).first()
-    if not user:
-        return None, 'User with this email does not exist.'
+        with transaction.atomic():
+            deleted, _ = doctor.slots.filter(date=date, time_slot=time_slot).delete()
+            if not deleted:
+                return None
+            return Booking.objects.create(
+                user=user,
+                doctor=doctor,
+                date=date,
+                time_slot=time_slot,
+                status='confirmed',
+            )
+    except IntegrityError:
+        return None
+
+
+def scoped_bookings(user, claims, query_params):
+    """
+    The bookings the caller may list: their patients' bookings for a doctor
+    (decided by the token's doctor_id claim), otherwise their own.
+    Returns (queryset, None) or (None, error response data and status).
+    """
+    query = BookingListQuerySerializer(data=query_params)
+    if not query.is_valid():
+        return None, ({
+            'success': False,
+            'message': 'Invalid query parameters.',
+            'errors': query.errors
+        }, status.HTTP_400_BAD_REQUEST)
+    params = query.validated_data
+
+    doctor_id = (claims or {}).get('doctor_id')
+    role = params.get('role') or ('doctor' if doctor_id is not None else 'patient')
+    if role == 'doctor':
+        if doctor_id is None:
+            return None, ({
+                'success': False,
+                'message': 'Doctor profile not found.'
+            }, status.HTTP_403_FORBIDDEN)
+        bookings = Booking.objects.filter(doctor_id=doctor_id)
+    else:
+        bookings = Booking.objects.filter(user_id=user.pk)
+
+    if params.get('start'):
+        bookings = bookings.filter(date__gte=params['start'])
+    if params.get('end'):
+        bookings = bookings.filter(date__lte=params['end'])
+    return bookings.select_related('user', 'doctor').order_by('id'), None
+
+
+@api_view(['GET'])
+@authentication_classes([])
+def metrics(request):
+    if not settings.METRICS_ENABLED:
+        return Response(status=status.HTTP_404_NOT_FOUND)
+    return Response({
+        'auth_user_cache': token_user_cache.stats(),
+        'task_queue': queue_stats(),
+        'password_hashing': hashing_pool.stats(),
+        'throttle': throttle_stats(),
+    }, status=status.HTTP_200_OK)
 
-    return user, None
+
+def busy_response():
+    return Response(
+        {'error': 'Too many sign-in requests in progress. Please retry shortly.'},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={'Retry-After': '1'},
+    )
 
 
 @api_view(["POST"])
+@authentication_classes([])
 def signup(request):
     serializer = UserSerializer(data=request.data)
     if serializer.is_valid():
-        serializer.save()  
+        try:
+            user = serializer.save()
+        except HashingBusy:
+            return busy_response()
+        send_welcome_email.enqueue(user_id=user.id)
         return Response({'message': 'User signed up successfully.'}, status=status.HTTP_201_CREATED)
     return Response({'error': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
 
 @api_view(['POST'])
+@authentication_classes([])
+@throttle_classes([LoginIPThrottle, LoginAccountThrottle])
 def login(request):
     email = request.data.get('email')
     password = request.data.get('password')
@@ -69,7 +126,11 @@ def login(request):
         return Response({'error': 'Email and password are required.'}, status=status.HTTP_400_BAD_REQUEST)
 
     user = User.objects.filter(email=email).first()
-    if not user or not check_password(password, user.password):
+    try:
+        valid = check_user_password(user, password)
+    except HashingBusy:
+        return busy_response()
+    if not valid:
         return Response({'error': 'Invalid email or password.'}, status=status.HTTP_401_UNAUTHORIZED)
 
     token = generate_jwt_token(user)
@@ -79,13 +140,53 @@ def login(request):
     }, status=status.HTTP_200_OK)
 
 
+@api_view(['GET'])
+def availability(request):
+    """
+    The first `limit` free slots for a specialty between `start` (default
+    today) and `end`, earliest first. Answered from the
+    (specialty, date, time_slot, doctor) index on availability_slots.
+    """
+    query = AvailabilityQuerySerializer(data=request.query_params)
+    if not query.is_valid():
+        return Response({
+            'success': False,
+            'message': 'Invalid query parameters.',
+            'errors': query.errors
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    params = query.validated_data
+    slots = AvailabilitySlot.objects.filter(
+        specialty=params['specialty'],
+        date__gte=params.get('start') or timezone.localdate(),
+    )
+    if params.get('end'):
+        slots = slots.filter(date__lte=params['end'])
+    rows = slots.order_by('date', 'time_slot', 'doctor_id').values(
+        'doctor_id', 'doctor__name', 'date', 'time_slot'
+    )[:params['limit']]
+
+    return Response({
+        'success': True,
+        'slots': [
+            {
+                'doctor_id': row['doctor_id'],
+                'doctor_name': row['doctor__name'],
+                'date': row['date'],
+                'time_slot': row['time_slot'],
+            }
+            for row in rows
+        ],
+    }, status=status.HTTP_200_OK)
+
+
 class DoctorProfileAPIView(APIView): 
     def post(self, request):
-        user, error_message = get_user_from_token(request)
-        if not user:
+        user = request.user
+        if not user.is_authenticated:
             return Response({
                 'success': False,
-                'message': error_message
+                'message': 'Authorization header missing or invalid.'
             }, status=status.HTTP_401_UNAUTHORIZED)
 
         serializer = DoctorSerializer(data=request.data)
@@ -100,15 +201,17 @@ class DoctorProfileAPIView(APIView):
         return Response({
             'success': True,
             'message': 'Doctor profile created successfully.',
-            'doctor_id': serializer.data['id']
+            'doctor_id': serializer.data['id'],
+            # Re-issued so the doctor_id claim is available to permission checks.
+            'access_token': generate_jwt_token(user),
         }, status=status.HTTP_201_CREATED)
     
     def put(self, request):
-        user, error_message = get_user_from_token(request)
-        if not user:
+        user = request.user
+        if not user.is_authenticated:
             return Response({
                 'success': False,
-                'message': error_message
+                'message': 'Authorization header missing or invalid.'
             }, status=status.HTTP_401_UNAUTHORIZED) 
             
         try:
@@ -135,11 +238,11 @@ class DoctorProfileAPIView(APIView):
         }, status=status.HTTP_200_OK)
     
     def delete(self, request, doctor_id=None):
-        user, error_message = get_user_from_token(request)
-        if not user:
+        user = request.user
+        if not user.is_authenticated:
             return Response({
                 'success': False,
-                'message': error_message
+                'message': 'Authorization header missing or invalid.'
             }, status=status.HTTP_401_UNAUTHORIZED)
 
         try:
@@ -175,48 +278,98 @@ class DoctorProfileAPIView(APIView):
                 'message': 'Both "date" and "slots" are required in "available_slots".'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        # Update available_slots safely
-        new_slots = []
-        slot_found = False
+        if isinstance(slots_to_delete, str):
+            slots_to_delete = [slots_to_delete]
 
-        for slot in doctor.available_slots:
-            if slot["date"] == date_to_delete:
-                slot["slots"] = [s for s in slot["slots"] if s not in slots_to_delete]
-                slot_found = True
+        try:
+            date_to_delete = parse_date(str(date_to_delete))
+        except ValueError:
+            date_to_delete = None
+        if date_to_delete is None:
+            return Response({
+                'success': False,
+                'message': '"date" must be in YYYY-MM-DD format.'
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-            if slot["slots"]:  # Keep only slots that still have times
-                new_slots.append(slot)
+        # Single indexed DELETE on (doctor, date, time_slot)
+        deleted, _ = doctor.slots.filter(date=date_to_delete, time_slot__in=slots_to_delete).delete()
 
-        if not slot_found:
+        if not deleted:
             return Response({
                 'success': False,
                 'message': 'The specified slot(s) and date were not found.'
             }, status=status.HTTP_404_NOT_FOUND)
 
-        doctor.available_slots = new_slots
-        doctor.save()
-
         return Response({
             'success': True,
             'message': 'The specified slot(s) were deleted successfully.'
         }, status=status.HTTP_200_OK)
         
     def get(self, request):
-        doctors = Doctor.objects.all()
-        serializer = DoctorSerializer(doctors, many=True)
+        doctors = Doctor.objects.prefetch_related('slots').order_by('id')
+        if wants_stream(request):
+            return stream_list('doctors', doctors, DoctorSerializer)
+        if fastpath.wants_fast(request):
+            return fastpath.doctor_list(request, Doctor.objects.all())
+
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(doctors, request, view=self)
+        serializer = DoctorSerializer(page, many=True)
         return Response({
             'success': True,
+            'next': paginator.get_next_link(),
             'doctors': serializer.data
         }, status=status.HTTP_200_OK)
         
 
+class DoctorSlotTemplateAPIView(APIView):
+    """
+    Publish a recurring availability template for the calling doctor. The
+    template is expanded here and written in one transaction; slots that
+    already exist or are booked are skipped.
+    """
+    def post(self, request):
+        user = request.user
+        if not user.is_authenticated:
+            return Response({
+                'success': False,
+                'message': 'Authorization header missing or invalid.'
+            }, status=status.HTTP_401_UNAUTHORIZED)
+
+        try:
+            doctor = Doctor.objects.get(user=user)
+        except Doctor.DoesNotExist:
+            return Response({
+                'success': False,
+                'message': 'Doctor profile not found.'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        template = SlotTemplateSerializer(data=request.data)
+        if not template.is_valid():
+            return Response({
+                'success': False,
+                'message': 'Invalid data.',
+                'errors': template.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        slots = template.expand()
+        before = doctor.slots.count()
+        doctor.add_slots(slots)
+        return Response({
+            'success': True,
+            'message': 'Slots published successfully.',
+            'requested': len(slots),
+            'created': doctor.slots.count() - before,
+        }, status=status.HTTP_201_CREATED)
+
+
 class BookAppointmentAPIView(APIView):
     def post(self, request):
-        user, error_message = get_user_from_token(request)
-        if not user:
+        user = request.user
+        if not user.is_authenticated:
             return Response({
                 "success": False,
-                'message': error_message
+                'message': 'Authorization header missing or invalid.'
             }, status=status.HTTP_401_UNAUTHORIZED)
             
         serializer = BookingSerializer(data=request.data)
@@ -246,28 +399,13 @@ class BookAppointmentAPIView(APIView):
                 "message": "Doctor not found."
             }, status=status.HTTP_404_NOT_FOUND)
            
-        if Booking.objects.filter(doctor_id=doctor_id, date=date, time_slot=time_slot).exists():
-             return Response({
-                 "success": False,
-                 "message": "The requested time slot is not available."
-             }, status=status.HTTP_400_BAD_REQUEST)
-             
-        slot_found = False
-        for slot in doctor.available_slots:
-            if time_slot in slot["slots"]:
-                slot["slots"].remove(time_slot)  
-            doctor.save()  
-            slot_found = True
-            break    
-         
-        if not slot_found:
+        booking = book_slot(user, doctor, date, time_slot)
+        if booking is None:
             return Response({
                 "success": False,
                 "message": "The selected time slot is not available."
-            }, status=status.HTTP_400_BAD_REQUEST)   
-             
-        
-        booking = serializer.save(user=user, status='confirmed', doctor=doctor)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        send_booking_confirmation.enqueue(booking_id=booking.id)
         # booking = serializer.save(status="Confirmed")
         
         return Response({
@@ -277,17 +415,18 @@ class BookAppointmentAPIView(APIView):
         }, status=status.HTTP_201_CREATED)
     
     def delete(self, request, booking_id):
-        user, error_message = get_user_from_token(request)
-        if not user:
+        user = request.user
+        if not user.is_authenticated:
             return Response({
                 "success": False,
-                'message': error_message
+                'message': 'Authorization header missing or invalid.'
             }, status=status.HTTP_401_UNAUTHORIZED)
             
         try:
             booking  = Booking.objects.get(id=booking_id)
-            is_patient = booking.user == user
-            is_doctor = Doctor.objects.filter(user=user, id=booking.doctor.id).exists()
+            # Decided from the verified token claims, without loading the user or doctor.
+            is_patient = booking.user_id == user.pk
+            is_doctor = request.auth.get('doctor_id') == booking.doctor_id
 
             if not (is_patient or is_doctor):
                 return Response({
@@ -309,9 +448,26 @@ class BookAppointmentAPIView(APIView):
             }, status=status.HTTP_404_NOT_FOUND)
     
     def get(self, request):
-        bookings = Booking.objects.all()
-        serializer = BookingSerializer(bookings, many=True)
+        user = request.user
+        if not user.is_authenticated:
+            return Response({
+                "success": False,
+                'message': 'Authorization header missing or invalid.'
+            }, status=status.HTTP_401_UNAUTHORIZED)
+
+        bookings, error = scoped_bookings(user, request.auth, request.query_params)
+        if error:
+            return Response(*error)
+        if wants_stream(request):
+            return stream_list('bookings', bookings, BookingSerializer)
+        if fastpath.wants_fast(request):
+            return fastpath.booking_list(request, bookings)
+
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(bookings, request, view=self)
+        serializer = BookingSerializer(page, many=True)
         return Response({
             "success": True,
+            "next": paginator.get_next_link(),
             "bookings": serializer.data
         }, status=status.HTTP_200_OK)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -39,8 +40,55 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'core',
+    'tasks',
 ]
 
+REST_FRAMEWORK = {
+    # orjson-backed when installed, DRF's JSON classes otherwise (core.renderers)
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'core.authentication.JWTAuthentication',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
+    # Login attempts per period (core.throttling), counted in a sliding window
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': os.environ.get('LOGIN_IP_RATE', '20/min'),
+        'login_account': os.environ.get('LOGIN_ACCOUNT_RATE', '5/min'),
+    },
+}
+
+# Cache alias holding the throttle counters; point it at a shared backend
+# (Redis, Memcached) so limits hold across processes.
+THROTTLE_CACHE = 'default'
+
+# Verified token -> user cache used by the JWT auth path
+AUTH_USER_CACHE = {
+    'MAX_SIZE': 1024,
+    'TTL': 300,
+    # Cache alias holding the per-user version stamps; point it at a shared
+    # backend so an invalidation reaches every process.
+    'CACHE': 'default',
+}
+
+# Expose in-process counters at /api/v1/metrics/
+METRICS_ENABLED = DEBUG
+
+# Rows fetched per database round trip when a list endpoint is streamed (?stream=1)
+STREAM_CHUNK_SIZE = 2000
+
+# Serve the doctor and appointment list GETs from the async views in
+# core.async_views. Turn on for ASGI deployments (ASYNC_READ_VIEWS=1).
+ASYNC_READ_VIEWS = os.environ.get('ASYNC_READ_VIEWS', '').lower() in ('1', 'true', 'yes')
+
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
@@ -84,6 +132,43 @@ DATABASES = {
 }
 
 
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+
+# Background task queue (tasks app, `manage.py run_worker`)
+TASKS = {
+    'CONCURRENCY': 4,
+    'BATCH_SIZE': 20,
+    'POLL_INTERVAL': 1.0,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_BACKOFF': 5,
+    'LOCK_TIMEOUT': 300,
+    # Seconds between metrics reports from run_worker; 0 turns them off.
+    'METRICS_INTERVAL': 60,
+}
+
+
+# Password hashing. New hashes use the first hasher; older ones are
+# rehashed on login. PASSWORD_HASHER=argon2 needs argon2-cffi installed.
+PASSWORD_POLICY = {
+    # None uses Django's PBKDF2PasswordHasher.iterations. Hashes stored at
+    # a higher count than this are kept, never downgraded.
+    'PBKDF2_ITERATIONS': int(os.environ.get('PBKDF2_ITERATIONS', 0)) or None,
+    # 'thread' or 'process'; hashing calls beyond POOL_MAX_PENDING get a 503.
+    'POOL': os.environ.get('PASSWORD_HASH_POOL', 'thread'),
+    'POOL_WORKERS': None,
+    'POOL_MAX_PENDING': None,
+}
+
+PASSWORD_HASHERS = [
+    'core.hashers.TunedPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+if os.environ.get('PASSWORD_HASHER') == 'argon2':
+    PASSWORD_HASHERS.insert(0, PASSWORD_HASHERS.pop(1))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -14,18 +14,31 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path
-from core.views import signup, login, DoctorProfileAPIView, BookAppointmentAPIView
+from core.async_views import with_async_get, doctor_list, booking_list
+from core.views import (
+    signup, login, metrics, availability, DoctorProfileAPIView, DoctorSlotTemplateAPIView, BookAppointmentAPIView,
+)
 
 
+doctors_view = DoctorProfileAPIView.as_view()
+appointments_view = BookAppointmentAPIView.as_view()
+if settings.ASYNC_READ_VIEWS:
+    doctors_view = with_async_get(doctor_list, doctors_view)
+    appointments_view = with_async_get(booking_list, appointments_view)
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/v1/signup/', signup),
     path('api/v1/login/', login),
-    path('api/v1/doctors/', DoctorProfileAPIView.as_view()),
-    path('api/v1/doctors/<int:doctor_id>/', DoctorProfileAPIView.as_view(), name='delete-slot'),
-    path('api/v1/appointments/', BookAppointmentAPIView.as_view(), name='create-appointment'),
-    path('api/v1/appointments/<int:booking_id>/', BookAppointmentAPIView.as_view(), name='manage-appointment'),
+    path('api/v1/doctors/', doctors_view),
+    path('api/v1/doctors/<int:doctor_id>/', doctors_view, name='delete-slot'),
+    path('api/v1/doctors/slots/', DoctorSlotTemplateAPIView.as_view(), name='publish-slots'),
+    path('api/v1/appointments/', appointments_view, name='create-appointment'),
+    path('api/v1/appointments/<int:booking_id>/', appointments_view, name='manage-appointment'),
+    path('api/v1/availability/', availability),
+    path('api/v1/metrics/', metrics),
 ]
 
@@ -0,0 +1,41 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from tasks.worker import Worker
+
+
+class Command(BaseCommand):
+    help = "Run queued background tasks until interrupted."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, help="Threads running tasks in parallel.")
+        parser.add_argument('--batch-size', type=int, help="Tasks claimed per poll.")
+        parser.add_argument('--poll-interval', type=float, help="Seconds to sleep when the queue is empty.")
+        parser.add_argument('--max-tasks', type=int, help="Exit after running this many tasks.")
+        parser.add_argument('--once', action='store_true', help="Run one batch and exit.")
+        parser.add_argument(
+            '--metrics-interval', type=float, help="Seconds between metrics reports while running; 0 turns them off."
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            concurrency=options['concurrency'],
+            batch_size=options['batch_size'],
+            poll_interval=options['poll_interval'],
+            metrics_interval=options['metrics_interval'],
+        )
+        if options['once']:
+            worker.run_once()
+        else:
+            stop = threading.Event()
+            signal.signal(signal.SIGTERM, lambda *_: stop.set())
+            try:
+                worker.run(stop=stop, max_tasks=options['max_tasks'], report=self.report)
+            except KeyboardInterrupt:
+                pass
+        self.report(worker.metrics.as_dict())
+
+    def report(self, metrics):
+        self.stdout.write(str(metrics))
@@ -0,0 +1,167 @@
+"""
+Polling worker for the tasks table.
+
+Claiming uses `SELECT ... FOR UPDATE SKIP LOCKED` where the database
+supports it, so workers never contend for a row. On SQLite it falls
+back to a conditional `UPDATE ... WHERE status = 'queued'` per
+candidate, and a claim only counts when that UPDATE changes a row.
+Claimed tasks run on a thread pool. A failed task is retried with
+exponential backoff until it has used up max_attempts. A task whose lock
+expires, because its worker died, counts as a failed attempt.
+"""
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Min
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import Task
+from .queue import get_setting, get_task
+
+
+class WorkerMetrics:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, outcome, latency):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+
+    def as_dict(self):
+        with self._lock:
+            processed = self.succeeded + self.retried + self.failed
+            elapsed = time.monotonic() - self.started
+            return {
+                'processed': processed,
+                'succeeded': self.succeeded,
+                'retried': self.retried,
+                'failed': self.failed,
+                'throughput_per_second': processed / elapsed if elapsed else 0.0,
+                'queue_latency_avg_seconds': self.latency_total / processed if processed else 0.0,
+                'queue_latency_max_seconds': self.latency_max,
+            }
+
+
+class Worker:
+    def __init__(self, concurrency=None, batch_size=None, poll_interval=None, metrics_interval=None):
+        self.concurrency = concurrency or get_setting('CONCURRENCY')
+        self.batch_size = batch_size or get_setting('BATCH_SIZE')
+        self.poll_interval = poll_interval or get_setting('POLL_INTERVAL')
+        self.metrics_interval = get_setting('METRICS_INTERVAL') if metrics_interval is None else metrics_interval
+        self.metrics = WorkerMetrics()
+        autodiscover_modules('tasks')
+
+    def claim(self, limit):
+        now = timezone.now()
+        # Tasks left running by a worker that died count as a failed attempt,
+        # so a task that kills its worker cannot be retried forever.
+        stale = Task.objects.filter(
+            status='running', locked_at__lt=now - timedelta(seconds=get_setting('LOCK_TIMEOUT'))
+        )
+        stale.filter(attempts__gte=F('max_attempts') - 1).update(
+            status='failed', attempts=F('attempts') + 1, locked_at=None, finished_at=now,
+            last_error='Lock expired: the worker running this task stopped before it finished.',
+        )
+        stale.update(status='queued', attempts=F('attempts') + 1, locked_at=None)
+
+        due = Task.objects.filter(status='queued', run_at__lte=now).order_by('run_at')
+        if connection.features.has_select_for_update_skip_locked:
+            with transaction.atomic():
+                ids = list(due.select_for_update(skip_locked=True).values_list('id', flat=True)[:limit])
+                Task.objects.filter(id__in=ids).update(status='running', locked_at=now, started_at=now)
+        else:
+            ids = [
+                task_id for task_id in due.values_list('id', flat=True)[:limit]
+                if Task.objects.filter(id=task_id, status='queued').update(
+                    status='running', locked_at=now, started_at=now
+                )
+            ]
+        return list(Task.objects.filter(id__in=ids))
+
+    def execute(self, task):
+        latency = (task.started_at - task.run_at).total_seconds()
+        try:
+            get_task(task.name)(**task.payload)
+        except Exception:
+            attempts = task.attempts + 1
+            if attempts >= task.max_attempts:
+                Task.objects.filter(id=task.id).update(
+                    status='failed', attempts=attempts, finished_at=timezone.now(),
+                    last_error=traceback.format_exc(),
+                )
+                self.metrics.record('failed', latency)
+            else:
+                backoff = get_setting('RETRY_BACKOFF') * 2 ** (attempts - 1)
+                Task.objects.filter(id=task.id).update(
+                    status='queued', attempts=attempts, locked_at=None,
+                    run_at=timezone.now() + timedelta(seconds=backoff), last_error=traceback.format_exc(),
+                )
+                self.metrics.record('retried', latency)
+        else:
+            Task.objects.filter(id=task.id).update(
+                status='done', attempts=task.attempts + 1, finished_at=timezone.now()
+            )
+            self.metrics.record('succeeded', latency)
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                connection.close()
+
+    def run_once(self, pool=None):
+        """
+        Claim and run one batch. Returns the number of tasks run.
+        """
+        tasks = self.claim(self.batch_size)
+        if pool is None:
+            for task in tasks:
+                self.execute(task)
+        else:
+            list(pool.map(self.execute, tasks))
+        return len(tasks)
+
+    def run(self, stop=None, max_tasks=None, report=None):
+        """
+        Run batches until `stop` is set or `max_tasks` have run. `report`,
+        if given, is called with metrics.as_dict() every metrics_interval
+        seconds. Returns the number of tasks run.
+        """
+        stop = stop or threading.Event()
+        processed = 0
+        reported = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            while not stop.is_set():
+                ran = self.run_once(pool)
+                processed += ran
+                if report and self.metrics_interval and time.monotonic() - reported >= self.metrics_interval:
+                    report(self.metrics.as_dict())
+                    reported = time.monotonic()
+                if max_tasks is not None and processed >= max_tasks:
+                    break
+                if not ran:
+                    stop.wait(self.poll_interval)
+        return processed
+
+
+def queue_stats():
+    """
+    Queue depth by status and the age of the oldest due task, from the database.
+    """
+    now = timezone.now()
+    counts = dict(Task.objects.values_list('status').annotate(count=Count('id')).order_by())
+    oldest = Task.objects.filter(status='queued', run_at__lte=now).aggregate(oldest=Min('run_at'))['oldest']
+    return {
+        'counts': {status: counts.get(status, 0) for status, _ in Task.STATUS_CHOICES},
+        'oldest_due_seconds': (now - oldest).total_seconds() if oldest else 0.0,
+    }
@@ -1,3 +1,5 @@
 from django.contrib import admin
+from .models import Order, OrderItem
 
-# Register your models here.
+admin.site.register(Order)
+admin.site.register(OrderItem)
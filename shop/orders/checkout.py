@@ -0,0 +1,71 @@
+"""
+Checkout and cancellation with oversell-free stock reservation.
+
+Stock is reserved with one conditional UPDATE per product:
+`UPDATE products SET stock = stock - n WHERE id = ? AND stock >= n`.
+The database applies it atomically, so concurrent checkouts can never
+take stock below zero, and no row is read first and written back later.
+Products are reserved in id order so concurrent multi-item orders lock
+rows in the same order.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F
+
+from products.cache import invalidate_products
+from products.models import Product
+from .models import Order, OrderItem
+
+
+class OutOfStock(Exception):
+    def __init__(self, product_id):
+        self.product_id = product_id
+        super().__init__(f"Product {product_id} is unavailable or out of stock.")
+
+
+def place_order(user, items):
+    """
+    items: iterable of (product_id, quantity). Raises OutOfStock and
+    reserves nothing if any product cannot cover its quantity.
+    """
+    quantities = Counter()
+    for product_id, quantity in items:
+        quantities[product_id] += quantity
+
+    with transaction.atomic():
+        for product_id in sorted(quantities):
+            reserved = Product.objects.filter(id=product_id, stock__gte=quantities[product_id]).update(
+                stock=F('stock') - quantities[product_id]
+            )
+            if not reserved:
+                raise OutOfStock(product_id)
+
+        prices = dict(Product.objects.filter(id__in=quantities).values_list('id', 'price'))
+        order = Order.objects.create(
+            user=user,
+            total=sum(prices[product_id] * quantity for product_id, quantity in quantities.items()),
+        )
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product_id=product_id, quantity=quantity, unit_price=prices[product_id])
+            for product_id, quantity in quantities.items()
+        ])
+        # stock is part of the cached product payload
+        transaction.on_commit(lambda: invalidate_products(list(quantities)))
+    return order
+
+
+def cancel_order(order):
+    """
+    Cancel a placed order and return its stock. Returns False if it was
+    already cancelled.
+    """
+    with transaction.atomic():
+        if not Order.objects.filter(id=order.id, status='placed').update(status='cancelled'):
+            return False
+        items = list(order.items.values_list('product_id', 'quantity'))
+        for product_id, quantity in items:
+            Product.objects.filter(id=product_id).update(stock=F('stock') + quantity)
+        transaction.on_commit(lambda: invalidate_products([product_id for product_id, _ in items]))
+    order.status = 'cancelled'
+    return True
@@ -0,0 +1,65 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+
+from orders.checkout import OutOfStock, place_order
+from orders.models import Order, OrderItem
+from products.models import Product
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Run many parallel checkouts against one SKU and report orders/s and oversell. "
+        "Runs against the configured database and removes its fixtures afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checkouts', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--stock', type=int, default=200)
+        parser.add_argument('--quantity', type=int, default=1)
+
+    def handle(self, *args, **options):
+        user = User.objects.create_user(username='bench-checkout', password=None, name='Bench')
+        product = Product.objects.create(
+            name='Bench SKU', category='Phones', price='1.00', color='-', brand='-', builtin_memory='-',
+            protection_class='-', screen_diagonal=0, screen_type='-', battery_capacity=0, main_camera='-',
+            front_camera='-', stock=options['stock'],
+        )
+
+        def checkout(_):
+            try:
+                place_order(user, [(product.id, options['quantity'])])
+                return 'placed'
+            except OutOfStock:
+                return 'out_of_stock'
+            except OperationalError:
+                return 'error'
+            finally:
+                connection.close()
+
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+                outcomes = list(pool.map(checkout, range(options['checkouts'])))
+            elapsed = time.perf_counter() - started
+
+            product.refresh_from_db()
+            sold = sum(OrderItem.objects.filter(product=product).values_list('quantity', flat=True))
+        finally:
+            Order.objects.filter(user=user).delete()
+            product.delete()
+            user.delete()
+
+        placed = outcomes.count('placed')
+        oversell = max(0, sold - options['stock'])
+        self.stdout.write(
+            f"{options['checkouts']} checkouts x{options['concurrency']} in {elapsed:.3f}s: "
+            f"{placed / elapsed:.1f} orders/s, {placed} placed, {outcomes.count('out_of_stock')} out of stock, "
+            f"{outcomes.count('error')} lock errors, final stock {product.stock}, oversell {oversell}"
+        )
+        if oversell or sold != options['stock'] - product.stock:
+            raise CommandError("Stock accounting is inconsistent: oversold or lost updates detected.")
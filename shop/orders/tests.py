@@ -1,3 +1,48 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from products.models import Product
+from products.serializer import ProductSerializer
+from products.tests import make_product
+from users.models import User
+
+
+class CheckoutTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='buyer', password='x'))
+        self.phone = make_product(name='Phone', price='100.00', stock=3)
+        self.case = make_product(name='Case', price='5.00', stock=1)
+
+    def checkout(self, *items):
+        return self.client.post(
+            '/api/orders/',
+            {'items': [{'product_id': product.id, 'quantity': quantity} for product, quantity in items]},
+            format='json',
+        )
+
+    def test_checkout_reserves_stock(self):
+        response = self.checkout((self.phone, 2), (self.case, 1))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['total'], '205.00')
+        self.phone.refresh_from_db()
+        self.assertEqual(self.phone.stock, 1)
+
+    def test_stock_is_read_only_through_the_product_api(self):
+        data = {**ProductSerializer(self.phone).data, 'name': 'Listed', 'stock': 1000}
+        response = APIClient().post('/api/products/', data, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Product.objects.get(name='Listed').stock, 0)
+
+    def test_out_of_stock_reserves_nothing(self):
+        response = self.checkout((self.phone, 1), (self.case, 2))
+        self.assertEqual(response.status_code, 409)
+        self.phone.refresh_from_db()
+        self.assertEqual(self.phone.stock, 3)
+
+    def test_cancel_returns_stock(self):
+        order_id = self.checkout((self.phone, 3)).data['id']
+        self.assertEqual(self.client.delete(f'/api/orders/{order_id}/').data['status'], 'cancelled')
+        self.assertEqual(self.client.delete(f'/api/orders/{order_id}/').status_code, 409)
+        self.phone.refresh_from_db()
+        self.assertEqual(self.phone.stock, 3)
@@ -1,7 +1,8 @@
 from django.urls import path
-from . import views  
+from orders.views import OrderListView, OrderDetailView
 
-urlpatterns = [
-    # path('orders/', include('orders.urls')),
 
-]
\ No newline at end of file
+urlpatterns = [
+    path('', OrderListView.as_view(), name='order-list'),
+    path('<int:order_id>/', OrderDetailView.as_view(), name='order-detail'),
+]
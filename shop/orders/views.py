@@ -1,3 +1,51 @@
-from django.shortcuts import render
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from django.shortcuts import get_object_or_404
+from .models import Order
+from .serializer import OrderSerializer, CheckoutSerializer
+from .checkout import OutOfStock, place_order, cancel_order
 
-# Create your views here.
+
+class OrderListView(APIView):
+    """
+    List the current user's orders and check out a new one.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        orders = Order.objects.filter(user=request.user).prefetch_related('items').order_by('-created_at')
+        serializer = OrderSerializer(orders, many=True)
+        return Response(serializer.data)
+
+    def post(self, request):
+        serializer = CheckoutSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        items = [(item['product_id'], item['quantity']) for item in serializer.validated_data['items']]
+        try:
+            order = place_order(request.user, items)
+        except OutOfStock as exc:
+            return Response({'detail': str(exc), 'product_id': exc.product_id}, status=status.HTTP_409_CONFLICT)
+        return Response(OrderSerializer(order).data, status=status.HTTP_201_CREATED)
+
+
+class OrderDetailView(APIView):
+    """
+    Get or cancel one of the current user's orders.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get_object(self, request, order_id):
+        return get_object_or_404(Order.objects.prefetch_related('items'), id=order_id, user=request.user)
+
+    def get(self, request, order_id):
+        return Response(OrderSerializer(self.get_object(request, order_id)).data)
+
+    def delete(self, request, order_id):
+        order = self.get_object(request, order_id)
+        if not cancel_order(order):
+            return Response({'detail': 'Order is already cancelled.'}, status=status.HTTP_409_CONFLICT)
+        return Response(OrderSerializer(order).data)
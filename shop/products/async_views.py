@@ -0,0 +1,70 @@
+"""
+ASGI-native variants of the product list and detail endpoints.
+
+products.urls routes GET requests here when settings.ASYNC_READ_VIEWS is
+on. Cache lookups and ORM reads go through the async APIs, so a request
+does not hold a worker thread while it waits. The response bodies and
+cache entries are the same as those of the DRF views in products.views.
+Both endpoints are public (AllowAny), so no authentication runs.
+"""
+from asgiref.sync import sync_to_async
+from django.http import Http404, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.utils.encoders import JSONEncoder
+
+from . import cache, fastpath
+from .filters import ProductFilterSerializer, afacet_counts
+from .serializer import ProductSerializer, ProductListSerializer
+from .views import ProductListView, ProductDetailView
+
+
+def with_async_get(async_get, sync_view):
+    """
+    Serve GET with `async_get` and every other method with the sync view.
+    """
+    sync_call = sync_to_async(sync_view)
+
+    async def view(request, *args, **kwargs):
+        if request.method == 'GET':
+            return await async_get(request, *args, **kwargs)
+        return await sync_call(request, *args, **kwargs)
+
+    return csrf_exempt(view)
+
+
+async def product_list(request):
+    filters = ProductFilterSerializer(data=request.GET)
+    if not filters.is_valid():
+        return JsonResponse(filters.errors, encoder=JSONEncoder, status=400)
+
+    fieldset = filters.fieldset()
+    fast = filters.validated_data.get('fast') and fastpath.supports(ProductListSerializer(**fieldset))
+
+    async def build():
+        products = filters.order_queryset(filters.filter_queryset(ProductListView().get_queryset(fieldset)))
+        facets = await afacet_counts(products)
+        if fast:
+            values = fastpath.product_values(ProductListSerializer(**fieldset))
+            results = [values.to_representation(row) async for row in values.rows(products)]
+        else:
+            results = ProductListSerializer([product async for product in products], many=True, **fieldset).data
+        return {
+            'count': sum(facets['category'].values()),
+            'facets': facets,
+            'results': results,
+        }
+
+    return await cache.acached_response(request, cache.list_key(request), build)
+
+
+async def product_detail(request, product_id):
+    async def build():
+        product = await ProductDetailView().get_queryset().filter(id=product_id).afirst()
+        if product is None:
+            raise Http404('No Product matches the given query.')
+        return ProductSerializer(product).data
+
+    try:
+        return await cache.acached_response(request, cache.detail_key(product_id), build)
+    except Http404 as exc:
+        return JsonResponse({'detail': str(exc)}, status=404)
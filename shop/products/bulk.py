@@ -0,0 +1,219 @@
+"""
+Streaming bulk import/export of products and their images as CSV or JSONL.
+
+Rows are validated one by one and written in batches with
+bulk_create/bulk_update, one transaction per batch, so memory depends on
+the batch size rather than the file size. A row with an `id` that already
+exists, in the database or earlier in the file, updates that product and
+replaces its images; only the fields present in the rows are written, and
+the rows are locked while `stock` is. Any other row creates a product. A
+batch that fails on a database constraint is retried row by row, and the
+failing rows are reported like validation errors. In CSV, `images` is a
+`|`-separated list of paths in the media storage; their variants are
+rendered by process_product_images.
+"""
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from . import cache, search
+from .models import Product, Image
+from .tasks import process_product_images
+
+FORMATS = ('csv', 'jsonl')
+PRODUCT_FIELDS = [
+    'name', 'category', 'price', 'color', 'brand', 'builtin_memory', 'protection_class',
+    'screen_diagonal', 'screen_type', 'battery_capacity', 'main_camera', 'front_camera', 'stock',
+]
+EXPORT_FIELDS = ['id'] + PRODUCT_FIELDS + ['images']
+IMAGE_SEPARATOR = '|'
+
+
+class ProductImportSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False, min_value=1)
+    images = serializers.ListField(child=serializers.CharField(max_length=255), required=False)
+
+    class Meta:
+        model = Product
+        fields = ['id'] + PRODUCT_FIELDS + ['images']
+
+
+@dataclass
+class ImportResult:
+    max_errors: int = 1000
+    created: int = 0
+    updated: int = 0
+    error_count: int = 0
+    errors: list = field(default_factory=list)
+
+    def add_error(self, row, errors):
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'row': row, 'errors': errors})
+
+    def as_dict(self):
+        return {
+            'created': self.created,
+            'updated': self.updated,
+            'error_count': self.error_count,
+            'errors': self.errors,
+        }
+
+
+def read_rows(lines, file_format):
+    """
+    Yield one dict per record from an iterable of text lines.
+    A JSONL line that is not valid JSON is yielded as-is so validation reports it.
+    """
+    if file_format == 'csv':
+        for row in csv.DictReader(lines):
+            if not row.get('id'):
+                row.pop('id', None)
+            images = row.pop('images', None)
+            if images:
+                row['images'] = images.split(IMAGE_SEPARATOR)
+            yield row
+    elif file_format == 'jsonl':
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield line
+    else:
+        raise ValueError(f"Unsupported format {file_format!r}; expected one of {FORMATS}.")
+
+
+def import_rows(rows, batch_size=1000, max_errors=1000):
+    """
+    Validate and write rows in batches. Errors are reported per row
+    (1-based); only the first `max_errors` are kept, but all are counted.
+    """
+    result = ImportResult(max_errors=max_errors)
+    batch, batch_ids = [], set()
+    # One serializer instance validates every row, as ListSerializer does,
+    # so the fields are built once rather than per row.
+    validator = ProductImportSerializer()
+    for number, row in enumerate(rows, start=1):
+        try:
+            validated = validator.run_validation(row)
+        except serializers.ValidationError as exc:
+            result.add_error(number, serializers.as_serializer_error(exc))
+            continue
+        row_id = validated.get('id')
+        if row_id in batch_ids:
+            # The earlier row with this id is written first, so this one updates it.
+            _write_batch(batch, result)
+            batch, batch_ids = [], set()
+        batch.append((number, validated))
+        if row_id is not None:
+            batch_ids.add(row_id)
+        if len(batch) >= batch_size:
+            _write_batch(batch, result)
+            batch, batch_ids = [], set()
+    if batch:
+        _write_batch(batch, result)
+    return result
+
+
+def _write_batch(batch, result):
+    """
+    Write `batch`, a list of (row number, validated row), in one transaction.
+    """
+    try:
+        created, updated = _write_rows([row for _, row in batch])
+    except IntegrityError as exc:
+        if len(batch) > 1:
+            for entry in batch:
+                _write_batch([entry], result)
+        else:
+            result.add_error(batch[0][0], {api_settings.NON_FIELD_ERRORS_KEY: [f'Could not be saved: {exc}']})
+        return
+    result.created += created
+    result.updated += updated
+
+
+def _write_rows(rows):
+    ids = [row['id'] for row in rows if 'id' in row]
+    # Only the fields the rows carry are written back, so an import without
+    # `stock` cannot overwrite a checkout that ran since the rows were read.
+    update_fields = [name for name in PRODUCT_FIELDS if any(name in row for row in rows if 'id' in row)]
+    products = Product.objects.all()
+    if 'stock' in update_fields:
+        products = products.select_for_update()
+    with transaction.atomic():
+        existing = products.in_bulk(ids)
+        to_create, to_update, images = [], [], []
+        for row in rows:
+            fields = {name: row[name] for name in PRODUCT_FIELDS if name in row}
+            product = existing.get(row.get('id'))
+            if product is None:
+                product = Product(id=row.get('id'), **fields)
+                to_create.append(product)
+            else:
+                for name, value in fields.items():
+                    setattr(product, name, value)
+                to_update.append(product)
+            images.append((product, row.get('images')))
+
+        Product.objects.bulk_create(to_create)
+        if to_update and update_fields:
+            Product.objects.bulk_update(to_update, update_fields)
+
+        updated_ids = {product.id for product in to_update}
+        replaced = [product.id for product, paths in images if paths is not None and product.id in updated_ids]
+        Image.objects.filter(product_id__in=replaced).delete()
+        Image.objects.bulk_create(
+            [Image(product_id=product.id, image=path) for product, paths in images for path in paths or []]
+        )
+
+        # bulk writes skip the model signals, so sync search and cache here
+        product_ids = [product.id for product, _ in images]
+        search.index_products(product_ids)
+        transaction.on_commit(lambda: cache.invalidate_products(product_ids))
+        with_images = [product.id for product, paths in images if paths]
+        if with_images:
+            process_product_images.enqueue(product_ids=with_images)
+
+    return len(to_create), len(to_update)
+
+
+def export_rows(queryset, file_format, chunk_size=2000):
+    """
+    Yield the products in `queryset` as CSV or JSONL text, one record at a time.
+    """
+    if file_format not in FORMATS:
+        raise ValueError(f"Unsupported format {file_format!r}; expected one of {FORMATS}.")
+
+    products = queryset.order_by('id').prefetch_related(
+        Prefetch('images', queryset=Image.objects.order_by('id'))
+    )
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def csv_line(values):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(values)
+        return buffer.getvalue()
+
+    if file_format == 'csv':
+        yield csv_line(EXPORT_FIELDS)
+    for product in products.iterator(chunk_size=chunk_size):
+        paths = [image.image.name for image in product.images.all()]
+        if file_format == 'csv':
+            yield csv_line(
+                [product.id] + [getattr(product, name) for name in PRODUCT_FIELDS] + [IMAGE_SEPARATOR.join(paths)]
+            )
+        else:
+            record = {'id': product.id, **{name: getattr(product, name) for name in PRODUCT_FIELDS}, 'images': paths}
+            yield json.dumps(record, cls=DjangoJSONEncoder) + '\n'
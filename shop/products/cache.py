@@ -0,0 +1,90 @@
+"""
+Response cache for the product catalog endpoints.
+
+Detail responses are stored under one key per product. List responses
+are stored under a key derived from the query string and a shared list
+version. Any product, image or review write (products.signals) deletes
+the product's key and bumps the version, which orphans every cached list
+page at once. Entries hold the rendered JSON body, so a hit touches
+neither the ORM nor the serializers.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .renderers import dumps
+
+LIST_VERSION_KEY = 'products:list:version'
+
+
+def detail_key(product_id):
+    return f'products:detail:{product_id}'
+
+
+def list_key(request):
+    version = cache.get(LIST_VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        cache.add(LIST_VERSION_KEY, version, timeout=None)
+        version = cache.get(LIST_VERSION_KEY, version)
+    params = hashlib.md5(request.GET.urlencode().encode()).hexdigest()
+    return f'products:list:{version}:{params}'
+
+
+def invalidate_product(product_id):
+    cache.delete(detail_key(product_id))
+    cache.set(LIST_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def invalidate_products(product_ids):
+    cache.delete_many([detail_key(product_id) for product_id in product_ids])
+    cache.set(LIST_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def make_entry(data):
+    body = dumps(data)
+    return {
+        'body': body,
+        'etag': quote_etag(hashlib.md5(body).hexdigest()),
+        'last_modified': int(time.time()),
+    }
+
+
+def entry_response(request, entry):
+    """
+    Answer 304 when the client's If-None-Match/If-Modified-Since still holds.
+    """
+    not_modified = get_conditional_response(
+        request, etag=entry['etag'], last_modified=entry['last_modified']
+    )
+    response = not_modified or HttpResponse(entry['body'], content_type='application/json')
+    response['ETag'] = entry['etag']
+    response['Last-Modified'] = http_date(entry['last_modified'])
+    return response
+
+
+def cached_response(request, key, build_data):
+    """
+    Serve `key` from the cache, building it with build_data() on a miss.
+    """
+    entry = cache.get(key)
+    if entry is None:
+        entry = make_entry(build_data())
+        cache.set(key, entry, timeout=settings.PRODUCT_CACHE_TIMEOUT)
+    return entry_response(request, entry)
+
+
+async def acached_response(request, key, build_data):
+    """
+    cached_response() for async views; build_data is a coroutine function.
+    """
+    entry = await cache.aget(key)
+    if entry is None:
+        entry = make_entry(await build_data())
+        await cache.aset(key, entry, timeout=settings.PRODUCT_CACHE_TIMEOUT)
+    return entry_response(request, entry)
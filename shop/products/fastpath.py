@@ -0,0 +1,60 @@
+"""
+Read-only fast path for the product list (`?fast=1`). Nested fields
+(`?expand=images`) are not supported; supports() leaves those to
+ProductListSerializer.
+"""
+from .models import mean_rating
+
+
+class ValuesSerializer:
+    """
+    Renders values_list() rows of products the way ProductListSerializer
+    renders Product instances, without building a model per row. Each field
+    reads the column named by its source (`price`, or `product.name` ->
+    `product__name` for a dotted source) through the field's
+    to_representation(), looked up once per list rather than once per row.
+    `computed` maps a field name to (lookups, function) for fields that are
+    not one column, such as `rating` from `rating_sum` and `rating_count`;
+    the function gets the looked-up values in order.
+    """
+
+    def __init__(self, serializer, computed=None):
+        computed = computed or {}
+        self.lookups = []
+        self.accessors = []
+        for name, field in serializer.fields.items():
+            if name in computed:
+                lookups, func = computed[name]
+                single = False
+            else:
+                lookups, func = [field.source.replace('.', '__')], field.to_representation
+                single = True
+            indexes = range(len(self.lookups), len(self.lookups) + len(lookups))
+            self.lookups.extend(lookups)
+            self.accessors.append((name, indexes[0] if single else indexes, func, single))
+
+    def rows(self, queryset):
+        return queryset.values_list(*self.lookups)
+
+    def to_representation(self, row):
+        data = {}
+        for name, index, func, single in self.accessors:
+            if single:
+                value = row[index]
+                data[name] = None if value is None else func(value)
+            else:
+                data[name] = func(*[row[i] for i in index])
+        return data
+
+
+def supports(serializer):
+    return not any(name in serializer.field_prefetches for name in serializer.fields)
+
+
+def product_values(serializer):
+    """
+    A ValuesSerializer for `serializer`, a ProductListSerializer.
+    """
+    return ValuesSerializer(serializer, computed={
+        'rating': (['rating_sum', 'rating_count'], mean_rating),
+    })
@@ -0,0 +1,120 @@
+from collections import Counter
+
+from django.db.models import Count
+from rest_framework import serializers
+
+from .models import Product
+from .serializer import ProductListSerializer
+
+
+class CommaSeparatedField(serializers.CharField):
+    """
+    `?brand=Apple,Samsung` -> ['Apple', 'Samsung']
+    """
+    def __init__(self, choices=None, **kwargs):
+        self.choices = choices
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        values = [value.strip() for value in super().to_internal_value(data).split(',') if value.strip()]
+        if self.choices is not None:
+            invalid = [value for value in values if value not in self.choices]
+            if invalid:
+                raise serializers.ValidationError(f"Invalid choice(s): {', '.join(invalid)}.")
+        return values
+
+
+class ProductFilterSerializer(serializers.Serializer):
+    """
+    Validates catalog query parameters and applies them to a Product queryset.
+    """
+    ORDERING_FIELDS = ['id', 'name', 'price', 'screen_diagonal', 'battery_capacity']
+    LIST_FILTERS = {
+        'category': 'category__in',
+        'brand': 'brand__in',
+        'color': 'color__in',
+    }
+    RANGE_FILTERS = {
+        'min_price': 'price__gte',
+        'max_price': 'price__lte',
+        'min_screen_diagonal': 'screen_diagonal__gte',
+        'max_screen_diagonal': 'screen_diagonal__lte',
+        'min_battery_capacity': 'battery_capacity__gte',
+        'max_battery_capacity': 'battery_capacity__lte',
+    }
+
+    category = CommaSeparatedField(choices=[value for value, _ in Product.STATUS_CHOICES], required=False)
+    brand = CommaSeparatedField(required=False)
+    color = CommaSeparatedField(required=False)
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    max_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    min_screen_diagonal = serializers.FloatField(required=False)
+    max_screen_diagonal = serializers.FloatField(required=False)
+    min_battery_capacity = serializers.IntegerField(required=False)
+    max_battery_capacity = serializers.IntegerField(required=False)
+    ordering = serializers.ChoiceField(
+        choices=ORDERING_FIELDS + [f'-{field}' for field in ORDERING_FIELDS],
+        required=False,
+    )
+    # Sparse fieldsets for ProductListSerializer.
+    fields = CommaSeparatedField(required=False)
+    expand = CommaSeparatedField(choices=['images'], required=False)
+    # Render the list through products.fastpath.
+    fast = serializers.BooleanField(required=False)
+
+    def validate_fields(self, value):
+        invalid = set(value) - set(ProductListSerializer.available_fields())
+        if invalid:
+            raise serializers.ValidationError(f"Unknown field(s): {', '.join(sorted(invalid))}.")
+        return value
+
+    def fieldset(self):
+        """
+        Keyword arguments for ProductListSerializer.
+        """
+        return {
+            'fields': self.validated_data.get('fields'),
+            'expand': self.validated_data.get('expand', []),
+        }
+
+    def filter_queryset(self, queryset):
+        lookups = {}
+        for param, lookup in {**self.LIST_FILTERS, **self.RANGE_FILTERS}.items():
+            if param in self.validated_data:
+                lookups[lookup] = self.validated_data[param]
+        return queryset.filter(**lookups)
+
+    def order_queryset(self, queryset):
+        ordering = self.validated_data.get('ordering', 'id')
+        if ordering.lstrip('-') == 'id':
+            return queryset.order_by(ordering)
+        # id breaks ties so the order is stable
+        return queryset.order_by(ordering, 'id')
+
+
+def facet_rows(queryset):
+    return queryset.order_by().values('category', 'brand').annotate(count=Count('id'))
+
+
+def summarize_facets(rows):
+    categories = Counter()
+    brands = Counter()
+    for row in rows:
+        categories[row['category']] += row['count']
+        brands[row['brand']] += row['count']
+    return {
+        'category': dict(categories.most_common()),
+        'brand': dict(brands.most_common()),
+    }
+
+
+def facet_counts(queryset):
+    """
+    Per-category and per-brand counts for the filtered catalog from a single
+    GROUP BY (category, brand) query.
+    """
+    return summarize_facets(facet_rows(queryset))
+
+
+async def afacet_counts(queryset):
+    return summarize_facets([row async for row in facet_rows(queryset)])
@@ -0,0 +1,96 @@
+"""
+Storage of product images and their resized variants.
+
+An upload is stored under a name derived from its content
+(`products/originals/3f/3fa9….jpg`), so a stored file never changes and
+can be cached for settings.MEDIA_CACHE_MAX_AGE. Uploading the same file
+again reuses it. The variants in settings.PRODUCT_IMAGE_VARIANTS are
+rendered off the request thread by products.tasks.process_product_images,
+as WebP and JPEG, under names derived from the original's and the size.
+"""
+import hashlib
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image as PILImage, ImageOps
+
+ORIGINALS_DIR = 'products/originals'
+VARIANTS_DIR = 'products/variants'
+
+# Pillow format -> extension of the accepted upload formats
+UPLOAD_FORMATS = {'JPEG': '.jpg', 'PNG': '.png', 'WEBP': '.webp', 'GIF': '.gif'}
+
+# variant format -> (Pillow format, extension, save options)
+VARIANT_FORMATS = {
+    'webp': ('WEBP', '.webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', '.jpg', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+
+def content_name(file, extension):
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    hexdigest = digest.hexdigest()[:32]
+    return f'{ORIGINALS_DIR}/{hexdigest[:2]}/{hexdigest}{extension}'
+
+
+def store_original(file):
+    """
+    Store an uploaded image validated by serializers.ImageField (which sets
+    `file.image`) and return its storage name.
+    """
+    name = content_name(file, UPLOAD_FORMATS[file.image.format])
+    if default_storage.exists(name):
+        return name
+    return default_storage.save(name, file)
+
+
+class ImageTooLarge(ValueError):
+    pass
+
+
+def variant_name(name, variant, size, extension):
+    stem, _ = os.path.splitext(name)
+    if stem.startswith(ORIGINALS_DIR + '/'):
+        stem = VARIANTS_DIR + stem[len(ORIGINALS_DIR):]
+    return f'{stem}-{variant}{size}{extension}'
+
+
+def encode(picture, pillow_format, options):
+    if pillow_format == 'JPEG' and picture.mode != 'RGB':
+        picture = picture.convert('RGB')
+    buffer = BytesIO()
+    picture.save(buffer, pillow_format, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def render_variants(name):
+    """
+    Write the missing variants of the stored image `name` and return
+    {variant: {format: storage name}} for all of them. Raises ImageTooLarge,
+    before decoding, for images over settings.PRODUCT_IMAGE_MAX_PIXELS.
+    """
+    variants = {}
+    with default_storage.open(name) as source, PILImage.open(source) as original:
+        if original.width * original.height > settings.PRODUCT_IMAGE_MAX_PIXELS:
+            raise ImageTooLarge(f'{name} is {original.width}x{original.height} pixels.')
+        picture = ImageOps.exif_transpose(original)
+        if picture.mode not in ('RGB', 'RGBA'):
+            picture = picture.convert('RGBA' if 'transparency' in picture.info else 'RGB')
+        for variant, size in settings.PRODUCT_IMAGE_VARIANTS.items():
+            resized = None
+            variants[variant] = {}
+            for key, (pillow_format, extension, options) in VARIANT_FORMATS.items():
+                path = variant_name(name, variant, size, extension)
+                if not default_storage.exists(path):
+                    if resized is None:
+                        resized = picture.copy()
+                        resized.thumbnail((size, size), PILImage.Resampling.LANCZOS)
+                    path = default_storage.save(path, encode(resized, pillow_format, options))
+                variants[variant][key] = path
+    return variants
@@ -0,0 +1,73 @@
+import statistics
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+from products.models import Product, Image
+from products.serializer import ProductListSerializer
+
+BRAND = 'Bench fields'
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the product list's payload size and latency for the full "
+        "representation, the compact default and a sparse ?fields= request, each "
+        "through the serializer and the ?fast=1 values() path. Runs against the configured database with the response cache off and "
+        "removes its fixtures afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=1000)
+        parser.add_argument('--images', type=int, default=3, help='Images per product.')
+        parser.add_argument('--repeat', type=int, default=10)
+
+    def handle(self, *args, **options):
+        count = options['products']
+        everything = ','.join(name for name in ProductListSerializer.available_fields() if name != 'images')
+        variants = {
+            'full': {'fields': everything, 'expand': 'images'},
+            'compact': {},
+            'compact, fast': {'fast': 1},
+            'fields=id,name,price': {'fields': 'id,name,price'},
+            'fields=id,name,price, fast': {'fields': 'id,name,price', 'fast': 1},
+        }
+
+        products = self.create_fixtures(count, options['images'])
+        try:
+            client = Client()
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'], PRODUCT_CACHE_TIMEOUT=0):
+                for label, params in variants.items():
+                    path = '/api/products/?' + urlencode({'brand': BRAND, **params})
+                    timings = []
+                    for _ in range(options['repeat']):
+                        started = time.perf_counter()
+                        response = client.get(path)
+                        timings.append(time.perf_counter() - started)
+                        assert response.status_code == 200, response.content
+                    scale = 1000 / count
+                    median = statistics.median(timings)
+                    self.stdout.write(
+                        f"{label:<28} {len(response.content) * scale / 1024:8.1f} KiB and "
+                        f"{median * scale * 1000:7.1f} ms per 1,000 products, {count / median:8.0f} rows/s"
+                    )
+        finally:
+            Product.objects.filter(pk__in=[product.pk for product in products]).delete()
+
+    def create_fixtures(self, count, images):
+        products = Product.objects.bulk_create([
+            Product(
+                name=f'Bench fields {n}', category='Phones', price='499.00', color='black', brand=BRAND,
+                builtin_memory='128GB', protection_class='IP68', screen_diagonal=6.1,
+                screen_type='OLED, 120Hz, HDR10+', battery_capacity=4500, main_camera='50MP + 12MP + 10MP',
+                front_camera='12MP', stock=10,
+            )
+            for n in range(count)
+        ])
+        Image.objects.bulk_create([
+            Image(product=product, image=f'bench/{product.id}/{n}.jpg') for product in products for n in range(images)
+        ])
+        return products
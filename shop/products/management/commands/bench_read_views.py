@@ -0,0 +1,121 @@
+import asyncio
+import importlib
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, AsyncClient, override_settings
+from django.urls import clear_url_caches
+
+from products.models import Product, Image, Review
+
+URLCONF = 'products.urls'
+
+
+def use_async_views(enabled):
+    """
+    Re-import the product URLconf with ASYNC_READ_VIEWS set to `enabled`.
+    """
+    with override_settings(ASYNC_READ_VIEWS=enabled):
+        importlib.reload(importlib.import_module(URLCONF))
+        importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+    clear_url_caches()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the sync (WSGI handler, one thread per in-flight request) and async "
+        "(ASGI handler, one event loop) product list/detail views under the same "
+        "concurrent load. Runs against the configured database and removes its "
+        "fixtures afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--products', type=int, default=100)
+        parser.add_argument('--no-cache', action='store_true', help='Disable the response cache (measure the ORM path).')
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        concurrency = options['concurrency']
+        timeout = 0 if options['no_cache'] else settings.PRODUCT_CACHE_TIMEOUT
+
+        products = self.create_fixtures(options['products'])
+        paths = ['/api/products/?brand=Bench'] + [f'/api/products/{product.id}/' for product in products[:20]]
+        try:
+            with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'], PRODUCT_CACHE_TIMEOUT=timeout
+            ):
+                for mode, run in (('sync/wsgi', self.run_sync), ('async/asgi', self.run_async)):
+                    cache.clear()
+                    use_async_views(mode.startswith('async'))
+                    latencies, failures, elapsed = run(paths, total, concurrency)
+                    self.report(mode, latencies, failures, elapsed)
+        finally:
+            use_async_views(settings.ASYNC_READ_VIEWS)
+            Product.objects.filter(pk__in=[product.pk for product in products]).delete()
+
+    def create_fixtures(self, count):
+        products = Product.objects.bulk_create([
+            Product(
+                name=f'Bench read {n}', category='Phones', price='1.00', color='-', brand='Bench',
+                builtin_memory='-', protection_class='-', screen_diagonal=0, screen_type='-',
+                battery_capacity=0, main_camera='-', front_camera='-',
+            )
+            for n in range(count)
+        ])
+        Image.objects.bulk_create([Image(product=product, image=f'bench/{product.id}.jpg') for product in products])
+        Review.objects.bulk_create([Review(product=product, content='Bench review') for product in products])
+        return products
+
+    def run_sync(self, paths, total, concurrency):
+        def request(n):
+            started = time.perf_counter()
+            status = Client().get(paths[n % len(paths)]).status_code
+            return time.perf_counter() - started, status
+
+        def close_connection(_):
+            connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(request, range(total)))
+            list(pool.map(close_connection, range(concurrency)))
+        return self.split(results) + (time.perf_counter() - started,)
+
+    def run_async(self, paths, total, concurrency):
+        async def main():
+            client = AsyncClient()
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def request(n):
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.get(paths[n % len(paths)])
+                    return time.perf_counter() - started, response.status_code
+
+            return await asyncio.gather(*(request(n) for n in range(total)))
+
+        started = time.perf_counter()
+        results = asyncio.run(main())
+        return self.split(results) + (time.perf_counter() - started,)
+
+    def split(self, results):
+        latencies = sorted(latency for latency, _ in results)
+        failures = sum(1 for _, status in results if status != 200)
+        return latencies, failures
+
+    def report(self, mode, latencies, failures, elapsed):
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+        self.stdout.write(
+            f"{mode:<11} {len(latencies)} requests in {elapsed:.2f}s: {len(latencies) / elapsed:.0f} req/s, "
+            f"p50 {percentile(0.50):.1f}ms, p95 {percentile(0.95):.1f}ms, p99 {percentile(0.99):.1f}ms, "
+            f"mean {statistics.mean(latencies) * 1000:.1f}ms, {failures} non-200"
+        )
@@ -0,0 +1,30 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from products import bulk
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = "Stream every product (and its image paths) to a CSV or JSONL file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to write, or - for stdout.")
+        parser.add_argument('--format', dest='file_format', choices=bulk.FORMATS,
+                            help="Defaults to the file extension.")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['file_format'] or Path(path).suffix.lstrip('.').lower()
+        if file_format not in bulk.FORMATS:
+            raise CommandError(f"Cannot infer a format from {path!r}; pass --format.")
+
+        rows = bulk.export_rows(Product.objects.all(), file_format, chunk_size=options['chunk_size'])
+        if path == '-':
+            sys.stdout.writelines(rows)
+        else:
+            with open(path, 'w', newline='', encoding='utf-8') as output:
+                output.writelines(rows)
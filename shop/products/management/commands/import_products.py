@@ -0,0 +1,34 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from products import bulk
+
+
+class Command(BaseCommand):
+    help = "Import products (and image paths) from a CSV or JSONL file in batched bulk writes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to read, or - for stdin.")
+        parser.add_argument('--format', dest='file_format', choices=bulk.FORMATS,
+                            help="Defaults to the file extension.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['file_format'] or Path(path).suffix.lstrip('.').lower()
+        if file_format not in bulk.FORMATS:
+            raise CommandError(f"Cannot infer a format from {path!r}; pass --format.")
+
+        if path == '-':
+            result = bulk.import_rows(bulk.read_rows(sys.stdin, file_format), batch_size=options['batch_size'])
+        else:
+            with open(path, newline='', encoding='utf-8') as lines:
+                result = bulk.import_rows(bulk.read_rows(lines, file_format), batch_size=options['batch_size'])
+
+        for error in result.errors:
+            self.stderr.write(f"row {error['row']}: {error['errors']}")
+        self.stdout.write(
+            f"{result.created} created, {result.updated} updated, {result.error_count} rejected."
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from products import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the products_fts full-text index from the products and reviews tables."
+
+    def handle(self, *args, **options):
+        if not search.is_enabled():
+            self.stdout.write("Full-text index is only used on SQLite; nothing to do.")
+            return
+        search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+# The FTS5 table and backfill as of this migration, inlined so later
+# changes to products.search do not rewrite history.
+CREATE_INDEX = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts "
+    "USING fts5(name, brand, screen_type, main_camera, reviews, tokenize='unicode61')"
+)
+BACKFILL_INDEX = """
+    INSERT INTO products_fts(rowid, name, brand, screen_type, main_camera, reviews)
+    SELECT p.id, p.name, p.brand, p.screen_type, p.main_camera,
+           COALESCE((SELECT group_concat(r.content, ' ') FROM reviews r WHERE r.product_id = p.id), '')
+    FROM products p
+"""
+DROP_INDEX = "DROP TABLE IF EXISTS products_fts"
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(CREATE_INDEX)
+        schema_editor.execute(BACKFILL_INDEX)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(DROP_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_product_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -1,6 +1,27 @@
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from users.models import User
 
+
+def mean_rating(rating_sum, rating_count):
+    if not rating_count:
+        return None
+    return round(rating_sum / rating_count, 2)
+
+
+class ProductQuerySet(models.QuerySet):
+    def with_related(self, images=None):
+        """
+        Prefetch images in one query, whatever the number of products.
+        Pass a queryset to narrow or order the prefetched rows. Reviews are
+        paged separately (products/<id>/reviews/) and summarized by the
+        review_count and rating columns.
+        """
+        return self.prefetch_related(
+            models.Prefetch('images', queryset=images if images is not None else Image.objects.all()),
+        )
+
+
 class Product(models.Model):
     STATUS_CHOICES = [
         ('Phones', 'phones'),
@@ -23,17 +44,52 @@ class Product(models.Model):
     battery_capacity = models.IntegerField()
     main_camera = models.CharField(max_length=100)
     front_camera = models.CharField(max_length=100)
+    stock = models.PositiveIntegerField(default=0)
+    # Maintained by products.signals on review create, edit and delete.
+    review_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+
+    # Only ever moved by F() updates; save() leaves them out so a stale
+    # instance cannot overwrite concurrent review counts.
+    COUNTER_FIELDS = {'review_count', 'rating_count', 'rating_sum'}
+
+    objects = ProductQuerySet.as_manager()
     
     class Meta:
         db_table = 'products'
+        indexes = [
+            models.Index(fields=['category', 'price']),
+            models.Index(fields=['brand', 'price']),
+            models.Index(fields=['price']),
+        ]
         
     def __str__(self):
         return self.name
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+    @property
+    def rating(self):
+        """
+        Mean of the rated reviews, or None if there are none.
+        """
+        return mean_rating(self.rating_sum, self.rating_count)
        
 
 class Image(models.Model):
     product= models.ForeignKey(Product, on_delete=models.CASCADE, related_name='images')
-    image = models.CharField(max_length=255)
+    # Uploads are saved under content-hashed names by products.images.store_original.
+    image = models.ImageField(max_length=255)
+    # {variant: {format: storage name}}, filled in by products.tasks.process_product_images
+    variants = models.JSONField(default=dict, blank=True)
     
     class Meta:
         db_table = 'images'
@@ -46,11 +102,24 @@ class Review(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True)
     product= models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reviews')
     content = models.TextField()
+    rating = models.PositiveSmallIntegerField(
+        null=True, blank=True, validators=[MinValueValidator(1), MaxValueValidator(5)]
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'reviews'
+        indexes = [
+            models.Index(fields=['product', 'created_at']),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        review = super().from_db(db, field_names, values)
+        # The stored rating, so an edit can move the product's rating_sum by the difference.
+        review.saved_rating = review.__dict__.get('rating')
+        return review
     
     def __str__(self):
         return f"Review for {self.product.name}"
@@ -0,0 +1,12 @@
+from rest_framework.pagination import CursorPagination
+
+
+class ReviewCursorPagination(CursorPagination):
+    """
+    Newest reviews first. The cursor seeks on (created_at, id) through the
+    (product, created_at) index, so later pages cost the same as the first.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
@@ -0,0 +1,104 @@
+"""
+Full-text product search backed by an SQLite FTS5 table.
+
+`products_fts` holds one row per product (rowid = product id) with the
+name, brand, screen type, main camera and the concatenated review text.
+Migration 0003 creates it; the signals in products.signals keep it in
+sync. On other databases, search() falls back to icontains lookups.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Product
+
+FTS_TABLE = 'products_fts'
+FTS_COLUMNS = ('name', 'brand', 'screen_type', 'main_camera', 'reviews')
+# bm25 column weights, in FTS_COLUMNS order: a name match ranks highest.
+FTS_WEIGHTS = (10.0, 5.0, 2.0, 2.0, 1.0)
+BATCH_SIZE = 500
+
+INDEX_SELECT = """
+    SELECT p.id, p.name, p.brand, p.screen_type, p.main_camera,
+           COALESCE((SELECT group_concat(r.content, ' ') FROM reviews r WHERE r.product_id = p.id), '')
+    FROM products p
+"""
+
+
+def is_enabled(using=None):
+    return (using or connection).vendor == 'sqlite'
+
+
+def _batches(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), BATCH_SIZE):
+        yield ids[start:start + BATCH_SIZE]
+
+
+def index_products(product_ids):
+    """
+    (Re)index the given products, including their current reviews.
+    """
+    if not is_enabled():
+        return
+    with connection.cursor() as cursor:
+        for batch in _batches(product_ids):
+            placeholders = ', '.join(['%s'] * len(batch))
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", batch)
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}(rowid, {', '.join(FTS_COLUMNS)}) {INDEX_SELECT} WHERE p.id IN ({placeholders})",
+                batch,
+            )
+
+
+def remove_products(product_ids):
+    if not is_enabled():
+        return
+    with connection.cursor() as cursor:
+        for batch in _batches(product_ids):
+            placeholders = ', '.join(['%s'] * len(batch))
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", batch)
+
+
+def rebuild_index():
+    if not is_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(f"INSERT INTO {FTS_TABLE}(rowid, {', '.join(FTS_COLUMNS)}) {INDEX_SELECT}")
+
+
+def build_match_query(text):
+    """
+    'gal s2' -> '"gal"* "s2"*': every term must match, as a prefix.
+    """
+    terms = re.findall(r'\w+', text)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search(text, limit=20):
+    """
+    Return up to `limit` product ids matching `text`, best match first.
+    """
+    match = build_match_query(text)
+    if not match:
+        return []
+
+    if not is_enabled():
+        terms = re.findall(r'\w+', text)
+        condition = Q()
+        for term in terms:
+            condition &= (
+                Q(name__icontains=term) | Q(brand__icontains=term) | Q(screen_type__icontains=term)
+                | Q(main_camera__icontains=term) | Q(reviews__content__icontains=term)
+            )
+        return list(Product.objects.filter(condition).values_list('id', flat=True).distinct()[:limit])
+
+    weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s",
+            [match, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
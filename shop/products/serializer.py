@@ -1,23 +1,134 @@
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db.models import OuterRef, Prefetch, Subquery
+from django.db.models.fields.json import KT
 from rest_framework import serializers
+from .images import UPLOAD_FORMATS
 from .models import Product, Review, Image
 
 class ReviewSerializer(serializers.ModelSerializer):
     class Meta:
         model = Review
         fields = '__all__'
+        read_only_fields = ['user', 'product']
      
         
+class MediaURLField(serializers.CharField):
+    """
+    A storage name rendered as its media URL.
+    """
+    def to_representation(self, value):
+        return default_storage.url(value)
+
+
+class VariantURLsField(serializers.Field):
+    """
+    Image.variants with each storage name rendered as its media URL.
+    """
+    def to_representation(self, value):
+        return {
+            variant: {key: default_storage.url(name) for key, name in formats.items()}
+            for variant, formats in value.items()
+        }
+
+
 class ImageSerializer(serializers.ModelSerializer):
+    variants = VariantURLsField(read_only=True)
+
     class Meta:
         model = Image
         fields = '__all__'
+
+
+class ImageUploadSerializer(serializers.Serializer):
+    image = serializers.ImageField()
+
+    def validate_image(self, value):
+        if value.size > settings.PRODUCT_IMAGE_MAX_BYTES:
+            raise serializers.ValidationError(
+                f'Images may be at most {settings.PRODUCT_IMAGE_MAX_BYTES // (1024 * 1024)} MB.'
+            )
+        if value.image.format not in UPLOAD_FORMATS:
+            raise serializers.ValidationError(f"Expected one of {', '.join(UPLOAD_FORMATS)}.")
+        width, height = value.image.size
+        if width * height > settings.PRODUCT_IMAGE_MAX_PIXELS:
+            raise serializers.ValidationError(
+                f'Images may be at most {settings.PRODUCT_IMAGE_MAX_PIXELS / 1_000_000:g} megapixels.'
+            )
+        return value
+
+
+class SparseFieldsetMixin:
+    """
+    Lets a ModelSerializer render a subset of its fields. `fields` names the
+    fields to render (default: `default_fields`, or all of them) and
+    `expand` adds more, typically nested relations left out by default.
+    prepare_queryset() narrows a queryset to the columns and prefetches
+    those fields read, so unused columns are never fetched.
+    """
+    default_fields = None
+    # Serializer fields backed by other columns than their own name.
+    field_columns = {}
+    # Serializer fields that read a prefetched relation: name -> (lookup, queryset).
+    field_prefetches = {}
+    # Serializer fields computed in SQL: name -> expression, annotated as `name`.
+    field_annotations = {}
+
+    def __init__(self, *args, fields=None, expand=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        selected = set(fields or self.default_fields or self.fields) | set(expand)
+        for name in list(self.fields):
+            if name not in selected:
+                self.fields.pop(name)
+
+    @classmethod
+    def available_fields(cls):
+        return list(cls(fields=None, expand=()).get_fields())
+
+    def prepare_queryset(self, queryset):
+        columns = {'id'}
+        prefetches = {}
+        annotations = {}
+        model_fields = {field.name for field in self.Meta.model._meta.concrete_fields}
+        for name, field in self.fields.items():
+            if name in self.field_prefetches:
+                lookup, related = self.field_prefetches[name]
+                prefetches[lookup] = Prefetch(lookup, queryset=related)
+            elif name in self.field_annotations:
+                annotations[name] = self.field_annotations[name]
+            elif name in self.field_columns:
+                columns.update(self.field_columns[name])
+            elif field.source in model_fields:
+                columns.add(field.source)
+        return queryset.only(*columns).annotate(**annotations).prefetch_related(*prefetches.values())
     
         
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     images = ImageSerializer(many=True, read_only=True)
-    reviews = ReviewSerializer(many=True, read_only=True)
+    rating = serializers.FloatField(read_only=True, allow_null=True)
+
+    field_columns = {'rating': ['rating_sum', 'rating_count']}
+    field_prefetches = {'images': ('images', Image.objects.order_by('id'))}
 
     class Meta:
         model = Product
-        fields = '__all__'
+        exclude = ['rating_sum']
+        read_only_fields = ['stock', 'review_count', 'rating_count']
+
+
+class ProductListSerializer(ProductSerializer):
+    """
+    The product list's representation: what a catalog card shows, with the
+    URL of the first image's WebP thumbnail variant as `thumbnail` (null
+    until process_product_images has rendered it). `?fields=` picks other
+    ProductSerializer fields and `?expand=images` adds the full image list.
+    """
+    thumbnail = MediaURLField(read_only=True, allow_null=True)
 
+    default_fields = ['id', 'name', 'category', 'brand', 'price', 'stock', 'review_count', 'rating', 'thumbnail']
+    # A correlated subquery, so the list needs no images query unless ?expand=images.
+    field_annotations = {
+        'thumbnail': Subquery(
+            Image.objects.filter(product=OuterRef('pk')).order_by('id').values(path=KT('variants__thumb__webp'))[:1]
+        ),
+    }
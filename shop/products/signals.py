@@ -0,0 +1,77 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import cache, search
+from .models import Product, Image, Review
+
+
+@receiver(post_save, sender=Product)
+def index_saved_product(sender, instance, **kwargs):
+    search.index_products([instance.pk])
+
+
+@receiver(post_delete, sender=Product)
+def unindex_deleted_product(sender, instance, **kwargs):
+    search.remove_products([instance.pk])
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def reindex_reviewed_product(sender, instance, **kwargs):
+    search.index_products([instance.product_id])
+
+
+def adjust_review_totals(product_id, reviews=0, ratings=0, rating_sum=0):
+    """
+    Move the product's review counters by the given deltas in one UPDATE,
+    so concurrent writers never overwrite each other's counts.
+    """
+    Product.objects.filter(pk=product_id).update(
+        review_count=F('review_count') + reviews,
+        rating_count=F('rating_count') + ratings,
+        rating_sum=F('rating_sum') + rating_sum,
+    )
+
+
+@receiver(post_save, sender=Review)
+def count_saved_review(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    before = None if created else getattr(instance, 'saved_rating', None)
+    after = instance.rating
+    if created or before != after:
+        adjust_review_totals(
+            instance.product_id,
+            reviews=1 if created else 0,
+            ratings=(after is not None) - (before is not None),
+            rating_sum=(after or 0) - (before or 0),
+        )
+    instance.saved_rating = after
+
+
+@receiver(post_delete, sender=Review)
+def count_deleted_review(sender, instance, **kwargs):
+    rating = getattr(instance, 'saved_rating', instance.rating)
+    adjust_review_totals(
+        instance.product_id, reviews=-1, ratings=-(rating is not None), rating_sum=-(rating or 0)
+    )
+
+
+# Invalidated once the write commits: dropping the entry earlier would let
+# a concurrent read cache the pre-commit row again under a fresh ETag.
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_cached_product(sender, instance, **kwargs):
+    transaction.on_commit(partial(cache.invalidate_product, instance.pk))
+
+
+@receiver(post_save, sender=Image)
+@receiver(post_delete, sender=Image)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_cached_parent_product(sender, instance, **kwargs):
+    transaction.on_commit(partial(cache.invalidate_product, instance.product_id))
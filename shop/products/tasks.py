@@ -0,0 +1,34 @@
+import logging
+
+from django.core.files.storage import default_storage
+from PIL import UnidentifiedImageError
+
+from tasks.queue import task
+from .images import ImageTooLarge, render_variants
+from .models import Image
+
+logger = logging.getLogger(__name__)
+
+
+@task
+def process_product_images(product_id=None, product_ids=None):
+    """
+    Render the resized variants of the images of a product (or of several,
+    for bulk imports) off the request thread. Images whose path does not
+    resolve to a readable image in the media storage, or that exceed
+    PRODUCT_IMAGE_MAX_PIXELS, are logged and skipped.
+    """
+    ids = [product_id] if product_id is not None else product_ids or []
+    for image in Image.objects.filter(product_id__in=ids).order_by('id'):
+        name = image.image.name
+        if not default_storage.exists(name):
+            logger.warning("Image %s of product %s points at missing file %r", image.id, image.product_id, name)
+            continue
+        try:
+            variants = render_variants(name)
+        except (UnidentifiedImageError, ImageTooLarge) as exc:
+            logger.warning("Image %s of product %s cannot be processed: %s", image.id, image.product_id, exc)
+            continue
+        if variants != image.variants:
+            image.variants = variants
+            image.save(update_fields=['variants'])
@@ -1,3 +1,523 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+import uuid
+from datetime import date, datetime, time, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, connection
+from django.db.models import F, QuerySet
+from django.forms.models import fields_for_model
+from django.test import TestCase, AsyncRequestFactory, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.translation import gettext_lazy
+from PIL import Image as PILImage
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from users.models import User
+from . import renderers
+from .bulk import import_rows
+from .async_views import product_list, product_detail
+from .models import Product, Image, Review
+from .renderers import FastJSONParser, FastJSONRenderer
+from .tasks import process_product_images
+from .views import serve_media
+
+
+def make_product(**kwargs):
+    fields = {
+        'name': 'Phone',
+        'category': 'Phones',
+        'price': '499.00',
+        'color': 'black',
+        'brand': 'Acme',
+        'builtin_memory': '128GB',
+        'protection_class': 'IP68',
+        'screen_diagonal': 6.1,
+        'screen_type': 'OLED',
+        'battery_capacity': 4000,
+        'main_camera': '48MP',
+        'front_camera': '12MP',
+    }
+    fields.update(kwargs)
+    return Product.objects.create(**fields)
+
+
+def make_products_with_children(count):
+    for i in range(count):
+        product = make_product(name=f'Phone {i}')
+        Image.objects.create(
+            product=product, image=f'products/{i}.jpg', variants={'thumb': {'webp': f'products/{i}-thumb320.webp'}}
+        )
+        Review.objects.create(product=product, content=f'Review {i}')
+
+
+class ProductQueryCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_list_query_count_does_not_grow_with_products(self):
+        # facets + products (thumbnail via subquery), regardless of product or review count
+        make_products_with_children(2)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/products/')
+        self.assertEqual(len(response.json()['results']), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            make_products_with_children(20)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/products/')
+        self.assertEqual(len(response.json()['results']), 22)
+        self.assertEqual(response.json()['results'][0]['thumbnail'], '/media/products/0-thumb320.webp')
+        self.assertEqual(response.json()['results'][0]['review_count'], 1)
+        self.assertNotIn('reviews', response.json()['results'][0])
+
+    def test_detail_query_count(self):
+        make_products_with_children(3)
+        product = Product.objects.first()
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/products/{product.id}/')
+        self.assertEqual(response.json()['name'], product.name)
+
+
+class ProductFilterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        make_product(name='A1', brand='Apple', price='999.00')
+        make_product(name='A2', brand='Apple', price='499.00', category='Smart watches')
+        make_product(name='S1', brand='Samsung', price='799.00')
+        make_product(name='X1', brand='Xiaomi', price='199.00', category='Headphones')
+
+    def test_filters_sorting_and_facets(self):
+        response = self.client.get('/api/products/?brand=Apple,Samsung&min_price=400&ordering=-price')
+        self.assertEqual([p['name'] for p in response.json()['results']], ['A1', 'S1', 'A2'])
+        self.assertEqual(response.json()['count'], 3)
+        self.assertEqual(response.json()['facets']['brand'], {'Apple': 2, 'Samsung': 1})
+        self.assertEqual(response.json()['facets']['category'], {'Phones': 2, 'Smart watches': 1})
+
+    def test_invalid_parameters_are_rejected(self):
+        response = self.client.get('/api/products/?category=Toasters&min_price=cheap')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('category', response.data)
+        self.assertIn('min_price', response.data)
+
+
+class ProductFieldsetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        make_products_with_children(2)
+
+    def test_compact_list_by_default(self):
+        product = self.client.get('/api/products/').json()['results'][0]
+        self.assertEqual(
+            set(product),
+            {'id', 'name', 'category', 'brand', 'price', 'stock', 'review_count', 'rating', 'thumbnail'},
+        )
+
+    def test_fields_limit_the_selected_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/products/?fields=name,price')
+        self.assertEqual(response.json()['results'][0], {'name': 'Phone 0', 'price': '499.00'})
+        self.assertEqual(len(queries), 2)
+        select = queries[1]['sql']
+        self.assertIn('"products"."price"', select)
+        self.assertNotIn('screen_type', select)
+        self.assertNotIn('images', select)
+
+    def test_expand_images(self):
+        response = self.client.get('/api/products/?fields=id&expand=images')
+        product = response.json()['results'][0]
+        self.assertEqual(set(product), {'id', 'images'})
+        self.assertEqual([image['image'] for image in product['images']], ['/media/products/0.jpg'])
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get('/api/products/?fields=name,secret&expand=reviews')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('fields', response.data)
+        self.assertIn('expand', response.data)
+
+
+class ProductFastPathTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        make_products_with_children(3)
+        make_product(name='No image', brand='Apple', price='1234.50')
+        Review.objects.create(product=Product.objects.first(), content='Fine', rating=4)
+        Review.objects.create(product=Product.objects.first(), content='Meh', rating=3)
+
+    def test_matches_serializer(self):
+        for query in ['', '?brand=Apple', '?ordering=-price', '?fields=id,rating,thumbnail,screen_diagonal,stock',
+                      '?fields=id&expand=images']:
+            separator = '&' if query else '?'
+            expected = self.client.get(f'/api/products/{query}').json()
+            fast = self.client.get(f'/api/products/{query}{separator}fast=1').json()
+            self.assertEqual(fast, expected)
+            async_fast = async_to_sync(product_list)(
+                AsyncRequestFactory().get(f'/api/products/{query}{separator}fast=1&async=1')
+            )
+            self.assertEqual(json.loads(async_fast.content), expected)
+
+    def test_fast_list_query_count(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/products/?fast=1')
+        self.assertEqual(response.json()['results'][0]['rating'], 3.5)
+
+
+class ProductSearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.galaxy = make_product(name='Galaxy S24', brand='Samsung', screen_type='AMOLED')
+        self.pixel = make_product(name='Pixel 8', brand='Google', screen_type='OLED')
+
+    def search(self, query):
+        response = self.client.get('/api/products/search/', {'q': query})
+        return [product['name'] for product in response.data['results']]
+
+    def test_prefix_match_and_ranking(self):
+        self.assertEqual(self.search('gala'), ['Galaxy S24'])
+        make_product(name='Phone with Galaxy-grade screen', brand='Other')
+        self.assertEqual(self.search('galaxy')[0], 'Galaxy S24')
+
+    def test_index_follows_reviews_and_deletes(self):
+        self.assertEqual(self.search('battery'), [])
+        review = Review.objects.create(product=self.pixel, content='Great battery life')
+        self.assertEqual(self.search('batt'), ['Pixel 8'])
+        review.delete()
+        self.assertEqual(self.search('battery'), [])
+        self.galaxy.delete()
+        self.assertEqual(self.search('galaxy'), [])
+
+    def test_query_is_required(self):
+        self.assertEqual(self.client.get('/api/products/search/').status_code, 400)
+
+
+class ProductCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.product = make_product(name='Cached phone')
+
+    def test_hits_skip_the_database(self):
+        self.client.get('/api/products/')
+        self.client.get(f'/api/products/{self.product.id}/')
+        with self.assertNumQueries(0):
+            self.client.get('/api/products/')
+            self.client.get(f'/api/products/{self.product.id}/')
+
+    def test_conditional_requests(self):
+        response = self.client.get(f'/api/products/{self.product.id}/')
+        etag = response['ETag']
+        self.assertEqual(self.client.get(f'/api/products/{self.product.id}/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        last_modified = self.client.get('/api/products/')['Last-Modified']
+        self.assertEqual(self.client.get('/api/products/', HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+    def test_writes_invalidate(self):
+        self.client.get('/api/products/')
+        self.client.get(f'/api/products/{self.product.id}/')
+        with self.captureOnCommitCallbacks() as callbacks:
+            Review.objects.create(product=self.product, content='Nice')
+        # Nothing is invalidated until the write commits.
+        self.assertEqual(self.client.get(f'/api/products/{self.product.id}/').json()['review_count'], 0)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.client.get(f'/api/products/{self.product.id}/').json()['review_count'], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            make_product(name='New phone')
+        self.assertEqual(self.client.get('/api/products/').json()['count'], 2)
+
+
+class ProductReviewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='reviewer', password='x')
+        self.product = make_product()
+
+    def test_saving_a_stale_product_keeps_review_counters(self):
+        stale = Product.objects.get(pk=self.product.pk)
+        Review.objects.create(product=self.product, content='Good', rating=4)
+        stale.name = 'Renamed'
+        stale.save()
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.name, self.product.review_count, self.product.rating), ('Renamed', 1, 4.0))
+        self.assertFalse(Product.COUNTER_FIELDS & set(fields_for_model(Product)))
+
+    def test_counters_follow_create_edit_and_delete(self):
+        first = Review.objects.create(product=self.product, content='Good', rating=4)
+        Review.objects.create(product=self.product, content='No stars')
+        third = Review.objects.create(product=self.product, content='Great', rating=5)
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.review_count, self.product.rating_count, self.product.rating), (3, 2, 4.5))
+
+        first = Review.objects.get(pk=first.pk)
+        first.rating = 2
+        first.save()
+        third.rating = None
+        third.save()
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.review_count, self.product.rating_count, self.product.rating), (3, 1, 2.0))
+
+        Review.objects.filter(product=self.product).delete()
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.review_count, self.product.rating_count, self.product.rating_sum), (0, 0, 0))
+        self.assertIsNone(self.product.rating)
+
+    def test_post_and_paginate_newest_first(self):
+        url = f'/api/products/{self.product.id}/reviews/'
+        self.assertEqual(self.client.post(url, {'content': 'Anon'}).status_code, 401)
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.post(url, {'content': 'Too good', 'rating': 6}).status_code, 400)
+        for number in range(5):
+            response = self.client.post(url, {'content': f'Review {number}', 'rating': 5})
+            self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['user'], self.user.id)
+
+        page = self.client.get(url, {'page_size': 3}).json()
+        self.assertEqual([review['content'] for review in page['results']], ['Review 4', 'Review 3', 'Review 2'])
+        with self.assertNumQueries(2):
+            page = self.client.get(page['next']).json()
+        self.assertEqual([review['content'] for review in page['results']], ['Review 1', 'Review 0'])
+        self.assertIsNone(page['next'])
+
+        detail = self.client.get(f'/api/products/{self.product.id}/').json()
+        self.assertEqual((detail['review_count'], detail['rating']), (5, 5.0))
+        self.assertEqual(self.client.get('/api/products/999/reviews/').status_code, 404)
+
+
+def png_upload(size=(1200, 800), color='red'):
+    buffer = BytesIO()
+    PILImage.new('RGB', size, color).save(buffer, 'PNG')
+    return SimpleUploadedFile('photo.png', buffer.getvalue(), content_type='image/png')
+
+
+class ProductImageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='seller', password='x', is_staff=True))
+        self.product = make_product()
+
+    def upload(self, file):
+        return self.client.post(f'/api/products/{self.product.id}/images/', {'image': file}, format='multipart')
+
+    def test_upload_is_content_addressed(self):
+        response = self.upload(png_upload())
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertRegex(response.data['image'], r'^/media/products/originals/[0-9a-f]{2}/[0-9a-f]{32}\.png$')
+        self.assertEqual(response.data['variants'], {})
+        self.assertEqual(self.upload(png_upload()).data['image'], response.data['image'])
+        self.assertNotEqual(self.upload(png_upload(color='blue')).data['image'], response.data['image'])
+
+        not_an_image = SimpleUploadedFile('notes.png', b'plain text', content_type='image/png')
+        self.assertEqual(self.upload(not_an_image).status_code, 400)
+        with override_settings(PRODUCT_IMAGE_MAX_PIXELS=1200 * 800 - 1):
+            self.assertIn('megapixels', str(self.upload(png_upload()).data['image']))
+        self.client.force_authenticate(User.objects.create_user(username='buyer', password='x'))
+        self.assertEqual(self.upload(png_upload()).status_code, 403)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.upload(png_upload()).status_code, 401)
+
+    def test_variants_and_serialized_urls(self):
+        self.upload(png_upload())
+        process_product_images(product_id=self.product.id)
+        image = self.product.images.get()
+        self.assertEqual(set(image.variants), {'thumb', 'medium'})
+        with default_storage.open(image.variants['thumb']['webp']) as file, PILImage.open(file) as thumb:
+            self.assertEqual((thumb.format, thumb.size), ('WEBP', (320, 213)))
+        with default_storage.open(image.variants['medium']['jpeg']) as file, PILImage.open(file) as medium:
+            self.assertEqual((medium.format, medium.size), ('JPEG', (1024, 683)))
+
+        listed = self.client.get('/api/products/').json()['results'][0]
+        self.assertEqual(listed['thumbnail'], '/media/' + image.variants['thumb']['webp'])
+        detail = self.client.get(f'/api/products/{self.product.id}/').json()
+        self.assertEqual(detail['images'][0]['variants']['medium']['webp'], '/media/' + image.variants['medium']['webp'])
+
+    def test_oversized_stored_images_are_skipped(self):
+        self.upload(png_upload())
+        with override_settings(PRODUCT_IMAGE_MAX_PIXELS=1000), self.assertLogs('products.tasks', 'WARNING'):
+            process_product_images(product_id=self.product.id)
+        self.assertEqual(self.product.images.get().variants, {})
+
+    def test_media_is_served_with_long_lived_cache_headers(self):
+        name = self.upload(png_upload()).data['image'].removeprefix('/media/')
+        response = serve_media(RequestFactory().get(f'/media/{name}'), name, document_root=settings.MEDIA_ROOT)
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+        self.assertIn('immutable', response['Cache-Control'])
+
+
+class ProductBulkTests(TestCase):
+    row = {
+        'name': 'Imported', 'category': 'Phones', 'price': '10.50', 'color': 'red', 'brand': 'Acme',
+        'builtin_memory': '64GB', 'protection_class': 'IP54', 'screen_diagonal': 5.5, 'screen_type': 'LCD',
+        'battery_capacity': 3000, 'main_camera': '12MP', 'front_camera': '5MP', 'images': ['a.jpg', 'b.jpg'],
+    }
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='seller', password='x', is_staff=True))
+
+    def test_import_update_and_export(self):
+        product = make_product(name='Old name')
+        row = self.row
+        body = '\n'.join([
+            json.dumps(row),
+            json.dumps({**row, 'id': product.id, 'name': 'New name', 'images': ['c.jpg']}),
+            json.dumps({**row, 'category': 'Toasters'}),
+            '{not json',
+        ])
+        response = self.client.post('/api/products/bulk/', body, content_type='application/x-ndjson')
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual([error['row'] for error in response.data['errors']], [3, 4])
+
+        product.refresh_from_db()
+        self.assertEqual(product.name, 'New name')
+        self.assertEqual(list(product.images.values_list('image', flat=True)), ['c.jpg'])
+        self.assertEqual(Image.objects.filter(product__name='Imported').count(), 2)
+        self.assertEqual(self.client.get('/api/products/search/', {'q': 'imported'}).data['count'], 1)
+
+        response = self.client.get('/api/products/bulk/', {'file_format': 'csv'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertTrue(lines[0].startswith('id,name,'))
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[2].endswith('a.jpg|b.jpg'))
+
+    def test_repeated_ids_stock_and_constraint_errors(self):
+        rows = [
+            {**self.row, 'id': 500, 'stock': 3},
+            {**self.row, 'id': 500, 'name': 'Renamed'},
+            {**self.row, 'id': 501},
+            {**self.row, 'id': 502},
+        ]
+
+        def index_products(product_ids):
+            if 501 in product_ids:
+                raise IntegrityError('UNIQUE constraint failed')
+
+        with mock.patch('products.bulk.search.index_products', side_effect=index_products):
+            result = import_rows(rows, batch_size=10)
+        self.assertEqual((result.created, result.updated), (2, 1))
+        self.assertEqual([error['row'] for error in result.errors], [3])
+        product = Product.objects.get(id=500)
+        self.assertEqual((product.name, product.stock), ('Renamed', 3))
+        self.assertEqual(product.images.count(), 2)
+        self.assertFalse(Product.objects.filter(id=501).exists())
+        self.assertTrue(Product.objects.filter(id=502).exists())
+
+    def test_stock_is_only_written_when_given(self):
+        product = make_product(name='Old name', stock=5)
+        locked = []
+
+        def in_bulk_then_checkout(queryset, *args, **kwargs):
+            existing = in_bulk(queryset, *args, **kwargs)
+            locked.append(queryset.query.select_for_update)
+            Product.objects.filter(id=product.id).update(stock=F('stock') - 1)
+            return existing
+
+        in_bulk = QuerySet.in_bulk
+        with mock.patch.object(QuerySet, 'in_bulk', in_bulk_then_checkout):
+            import_rows([{**self.row, 'id': product.id, 'name': 'New name'}])
+            product.refresh_from_db()
+            self.assertEqual((product.name, product.stock), ('New name', 4))
+            import_rows([{**self.row, 'id': product.id, 'name': 'New name', 'stock': 10}])
+            product.refresh_from_db()
+            self.assertEqual((product.name, product.stock), ('New name', 10))
+        self.assertEqual(locked, [False, True])
+
+    def test_staff_only(self):
+        self.client.force_authenticate(User.objects.create_user(username='buyer', password='x'))
+        response = self.client.post('/api/products/bulk/', json.dumps(self.row), content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Product.objects.exists())
+
+
+class ProductAsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        make_products_with_children(5)
+        make_product(name='Watch', brand='Apple', category='Smart watches')
+
+    def get_async(self, view, path, **kwargs):
+        return async_to_sync(view)(AsyncRequestFactory().get(path), **kwargs)
+
+    def test_list_matches_sync_view(self):
+        for query in ['', '?brand=Apple', '?ordering=-name&min_price=100']:
+            expected = self.client.get(f'/api/products/{query}').json()
+            cache.clear()
+            with self.assertNumQueries(2):
+                response = self.get_async(product_list, f'/api/products/{query}')
+            self.assertEqual(json.loads(response.content), expected)
+
+    def test_detail_matches_sync_view_and_shares_cache(self):
+        product = Product.objects.first()
+        response = self.get_async(product_detail, f'/api/products/{product.id}/', product_id=product.id)
+        self.assertEqual(json.loads(response.content), self.client.get(f'/api/products/{product.id}/').json())
+        with self.assertNumQueries(0):
+            cached = self.get_async(product_detail, f'/api/products/{product.id}/', product_id=product.id)
+        self.assertEqual(cached['ETag'], response['ETag'])
+
+    def test_errors(self):
+        response = self.get_async(product_detail, '/api/products/999/', product_id=999)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(json.loads(response.content), self.client.get('/api/products/999/').json())
+        self.assertEqual(self.get_async(product_list, '/api/products/?min_price=cheap').status_code, 400)
+
+
+class FastJSONTests(TestCase):
+    payload = {
+        'price': Decimal('499.90'),
+        'date': date(2030, 1, 3),
+        'created_at': datetime(2030, 1, 3, 9, 30, 15, 123456, tzinfo=dt_timezone.utc),
+        'time': time(9, 30),
+        'id': uuid.UUID(int=1),
+        'label': gettext_lazy('Phones'),
+        'rows': [{'count': 1, 'empty': None, 'ratio': 1.5, 'name': 'Zoë'}],
+        7: 'int key',
+    }
+
+    def test_renders_like_drf(self):
+        expected = JSONRenderer().render(self.payload)
+        self.assertEqual(FastJSONRenderer().render(self.payload), expected)
+        with mock.patch.object(renderers, 'orjson', None):
+            self.assertEqual(FastJSONRenderer().render(self.payload), expected)
+        self.assertIn(b'"2030-01-03T09:30:15.123456Z"', expected)
+
+    def test_falls_back_to_drf_where_orjson_differs(self):
+        payload = {'id': 2 ** 70, 'rows': [{'rating': None}]}
+        self.assertEqual(FastJSONRenderer().render(payload), JSONRenderer().render(payload))
+        for value in (float('nan'), float('inf')):
+            with self.assertRaisesMessage(ValueError, 'Out of range float values'):
+                FastJSONRenderer().render({'rows': [{'rating': value}]})
+
+    def test_parses_like_drf(self):
+        body = '{"a": [1, 2.5, "Zoë", null], "b": {"c": true}}'.encode()
+        self.assertEqual(FastJSONParser().parse(BytesIO(body)), JSONParser().parse(BytesIO(body)))
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(BytesIO(b'{"a": '))
+
+    def test_parses_integers_over_64_bits_exactly(self):
+        for number in (2 ** 64, -2 ** 63 - 1, 10 ** 30):
+            body = b'{"id": %d, "price": 1.5}' % number
+            self.assertEqual(FastJSONParser().parse(BytesIO(body)), {'id': number, 'price': 1.5})
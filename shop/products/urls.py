@@ -1,8 +1,23 @@
+from django.conf import settings
 from django.urls import path
-from products.views import ProductListView, ProductDetailView
+from products.async_views import with_async_get, product_list, product_detail
+from products.views import (
+    ProductListView, ProductDetailView, ProductSearchView, ProductBulkView,
+    ProductReviewListView, ProductImageUploadView,
+)
 
 
+list_view = ProductListView.as_view()
+detail_view = ProductDetailView.as_view()
+if settings.ASYNC_READ_VIEWS:
+    list_view = with_async_get(product_list, list_view)
+    detail_view = with_async_get(product_detail, detail_view)
+
 urlpatterns = [
-    path('', ProductListView.as_view(), name='product-list'),
-    path('<int:product_id>/', ProductDetailView.as_view(), name='product-detail'),
+    path('', list_view, name='product-list'),
+    path('search/', ProductSearchView.as_view(), name='product-search'),
+    path('bulk/', ProductBulkView.as_view(), name='product-bulk'),
+    path('<int:product_id>/', detail_view, name='product-detail'),
+    path('<int:product_id>/reviews/', ProductReviewListView.as_view(), name='product-reviews'),
+    path('<int:product_id>/images/', ProductImageUploadView.as_view(), name='product-images'),
 ]
\ No newline at end of file
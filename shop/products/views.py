@@ -1,27 +1,66 @@
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.permissions import AllowAny
-from .models import Product
-from .serializer import ProductSerializer
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from .models import Product, Image, Review
+from .serializer import (
+    ProductSerializer, ProductListSerializer, ReviewSerializer, ImageSerializer, ImageUploadSerializer,
+)
+from .pagination import ReviewCursorPagination
+from .filters import ProductFilterSerializer, facet_counts
+from . import bulk, cache, fastpath, images, search
+from .tasks import process_product_images
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.static import serve
 from django.shortcuts import get_object_or_404
 
 
 class ProductListView(APIView):
     """
-    Get a list of all products and create a new product.
+    Get a filtered, sorted list of products with category and brand facet
+    counts, and create a new product. `?fields=` and `?expand=` choose the
+    fields of each listed product (ProductListSerializer) and `?fast=1`
+    renders them from values() rows (products.fastpath).
     """
     permission_classes = [AllowAny]
+
+    def get_queryset(self, fieldset):
+        """
+        Products with only the columns and relations the requested fields read.
+        """
+        return ProductListSerializer(**fieldset).prepare_queryset(Product.objects.all())
     
     def get(self, request):
-        products = Product.objects.all()
-        serializer = ProductSerializer(products, many=True)
-        return Response(serializer.data)
+        filters = ProductFilterSerializer(data=request.query_params)
+        if not filters.is_valid():
+            return Response(filters.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        fieldset = filters.fieldset()
+        fast = filters.validated_data.get('fast') and fastpath.supports(ProductListSerializer(**fieldset))
+
+        def build():
+            products = filters.order_queryset(filters.filter_queryset(self.get_queryset(fieldset)))
+            facets = facet_counts(products)
+            if fast:
+                values = fastpath.product_values(ProductListSerializer(**fieldset))
+                results = [values.to_representation(row) for row in values.rows(products)]
+            else:
+                results = ProductListSerializer(products, many=True, **fieldset).data
+            return {
+                'count': sum(facets['category'].values()),
+                'facets': facets,
+                'results': results,
+            }
+
+        return cache.cached_response(request, cache.list_key(request), build)
     
     def post(self, request):
         serializer = ProductSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            product = serializer.save()
+            process_product_images.enqueue(product_id=product.id)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
@@ -30,9 +69,136 @@ class ProductDetailView(APIView):
     Get details of a specific product by product_id.
     """
     permission_classes = [AllowAny]
+    image_queryset = Image.objects.all()
+
+    def get_queryset(self):
+        return Product.objects.with_related(images=self.image_queryset)
     
     def get(self, request, product_id):
-        product = get_object_or_404(Product, id=product_id)
-        serializer = ProductSerializer(product)
-        return Response(serializer.data) 
-    
\ No newline at end of file
+        def build():
+            product = get_object_or_404(self.get_queryset(), id=product_id)
+            return ProductSerializer(product).data
+
+        return cache.cached_response(request, cache.detail_key(product_id), build)
+
+
+class ProductReviewListView(APIView):
+    """
+    Page through a product's reviews, newest first, and post a new one.
+    """
+    pagination_class = ReviewCursorPagination
+
+    def get_permissions(self):
+        if self.request.method == 'POST':
+            return [IsAuthenticated()]
+        return [AllowAny()]
+
+    def get(self, request, product_id):
+        get_object_or_404(Product.objects.only('id'), id=product_id)
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(Review.objects.filter(product_id=product_id), request, view=self)
+        return paginator.get_paginated_response(ReviewSerializer(page, many=True).data)
+
+    def post(self, request, product_id):
+        product = get_object_or_404(Product.objects.only('id'), id=product_id)
+        serializer = ReviewSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save(product=product, user=request.user)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ProductImageUploadView(APIView):
+    """
+    Upload an image (multipart field `image`) for a product. The original is
+    stored under a content-hashed name and its variants are rendered by
+    process_product_images, so `variants` is empty in the response.
+    Staff only, like the bulk import: products have no owner to check.
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request, product_id):
+        product = get_object_or_404(Product.objects.only('id'), id=product_id)
+        serializer = ImageUploadSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        image = Image.objects.create(product=product, image=images.store_original(serializer.validated_data['image']))
+        process_product_images.enqueue(product_id=product.id)
+        return Response(ImageSerializer(image).data, status=status.HTTP_201_CREATED)
+
+
+def serve_media(request, path, document_root=None, show_indexes=False):
+    """
+    django.views.static.serve with the long-lived Cache-Control that
+    content-hashed names allow; used for MEDIA_URL when DEBUG is on.
+    """
+    response = serve(request, path, document_root=document_root, show_indexes=show_indexes)
+    patch_cache_control(response, public=True, max_age=settings.MEDIA_CACHE_MAX_AGE, immutable=True)
+    return response
+
+
+class ProductSearchView(APIView):
+    """
+    Full-text search over name, brand, screen type, main camera and reviews.
+    `?q=` terms are prefix-matched; results are ranked best first.
+    """
+    permission_classes = [AllowAny]
+    max_limit = 100
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'q': ['This parameter is required.']}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 20)), self.max_limit))
+        except ValueError:
+            return Response({'limit': ['A valid integer is required.']}, status=status.HTTP_400_BAD_REQUEST)
+
+        product_ids = search.search(query, limit=limit)
+        products = Product.objects.with_related().in_bulk(product_ids)
+        serializer = ProductSerializer([products[pk] for pk in product_ids if pk in products], many=True)
+        return Response({
+            'count': len(serializer.data),
+            'results': serializer.data,
+        })
+
+
+class ProductBulkView(APIView):
+    """
+    Bulk import (POST) and export (GET) of products as CSV or JSONL.
+    The format comes from `?file_format=` or, on import, the Content-Type.
+    Staff only: an import can rewrite any product, including its stock.
+    """
+    permission_classes = [IsAdminUser]
+    content_types = {
+        'text/csv': 'csv',
+        'application/jsonl': 'jsonl',
+        'application/x-ndjson': 'jsonl',
+    }
+    media_types = {
+        'csv': 'text/csv',
+        'jsonl': 'application/x-ndjson',
+    }
+
+    def post(self, request):
+        file_format = request.query_params.get('file_format') or self.content_types.get(request.content_type)
+        if file_format not in bulk.FORMATS:
+            return Response({'file_format': [f'Expected one of {", ".join(bulk.FORMATS)}.']},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        # Read the raw body line by line instead of parsing it into request.data.
+        lines = (line.decode('utf-8') for line in request.stream or [])
+        result = bulk.import_rows(bulk.read_rows(lines, file_format))
+        return Response(result.as_dict(), status=status.HTTP_200_OK)
+
+    def get(self, request):
+        file_format = request.query_params.get('file_format', 'jsonl')
+        if file_format not in bulk.FORMATS:
+            return Response({'file_format': [f'Expected one of {", ".join(bulk.FORMATS)}.']},
+                            status=status.HTTP_400_BAD_REQUEST)
+        response = StreamingHttpResponse(
+            bulk.export_rows(Product.objects.all(), file_format), content_type=self.media_types[file_format]
+        )
+        response['Content-Disposition'] = f'attachment; filename="products.{file_format}"'
+        return response
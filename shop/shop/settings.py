@@ -43,18 +43,38 @@ INSTALLED_APPS = [
     'users',
     'products',
     'orders',
+    'tasks',
 ]
 
 AUTH_USER_MODEL = 'users.User'
 
-DEFAULT_AUTHENTICATION_CLASSES= {
-        'rest_framework_simplejwt.authentication.JWTAuthentication'
-}
-
 REST_FRAMEWORK = {
+    # orjson-backed when installed, DRF's JSON classes otherwise (products.renderers)
+    'DEFAULT_RENDERER_CLASSES': [
+        'products.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'products.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+    ],
+    # Attempts per period (users.throttling) on api/token/, sliding window
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': os.environ.get('LOGIN_IP_RATE', '20/min'),
+        'login_account': os.environ.get('LOGIN_ACCOUNT_RATE', '5/min'),
+    },
 }
 
+# Cache alias holding the throttle counters; point it at a shared backend
+# (Redis, Memcached) so limits hold across processes.
+THROTTLE_CACHE = 'default'
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -97,6 +117,34 @@ DATABASES = {
 }
 
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'shop',
+    }
+}
+
+# Seconds a rendered product list/detail response stays cached; writes invalidate earlier.
+PRODUCT_CACHE_TIMEOUT = 300
+
+# Serve the product list and detail GETs from the async views in
+# products.async_views. Turn on for ASGI deployments (ASYNC_READ_VIEWS=1).
+ASYNC_READ_VIEWS = os.environ.get('ASYNC_READ_VIEWS', '').lower() in ('1', 'true', 'yes')
+
+
+# Background task queue (tasks app, `manage.py run_worker`)
+TASKS = {
+    'CONCURRENCY': 4,
+    'BATCH_SIZE': 20,
+    'POLL_INTERVAL': 1.0,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_BACKOFF': 5,
+    'LOCK_TIMEOUT': 300,
+    # Seconds between metrics reports from run_worker; 0 turns them off.
+    'METRICS_INTERVAL': 60,
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -133,6 +181,24 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Uploaded files. Product images are stored under content-hashed names
+# (products.images), so MEDIA_URL may point at a CDN that caches them for
+# MEDIA_CACHE_MAX_AGE seconds.
+MEDIA_URL = os.environ.get('MEDIA_URL', '/media/')
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', BASE_DIR / 'media')
+MEDIA_CACHE_MAX_AGE = 365 * 24 * 60 * 60
+
+# Longest side, in pixels, of each resized product image variant; each is
+# rendered as WebP and JPEG by products.tasks.process_product_images.
+# `thumb` is the product list's thumbnail.
+PRODUCT_IMAGE_VARIANTS = {
+    'thumb': 320,
+    'medium': 1024,
+}
+PRODUCT_IMAGE_MAX_BYTES = 10 * 1024 * 1024
+# Width * height; decoding takes about 4 bytes per pixel, whatever the file size.
+PRODUCT_IMAGE_MAX_PIXELS = 25_000_000
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -14,17 +14,22 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from products.views import serve_media
 
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('users.urls')),
     path('api/products/', include('products.urls')),
-    path('orders/', include('orders.urls')),
+    path('api/orders/', include('orders.urls')),
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'), # Raw OpenAPI schema
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema')),
 ] 
 
+# Local media in development; elsewhere MEDIA_URL points at the web server or a CDN.
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT, view=serve_media)
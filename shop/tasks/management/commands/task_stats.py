@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from tasks.worker import queue_stats
+
+
+class Command(BaseCommand):
+    help = "Show queue depth by status and the age of the oldest due task."
+
+    def handle(self, *args, **options):
+        stats = queue_stats()
+        for status, count in stats['counts'].items():
+            self.stdout.write(f"{status:>8}: {count}")
+        self.stdout.write(f"oldest due task waiting {stats['oldest_due_seconds']:.1f}s")
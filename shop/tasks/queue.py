@@ -0,0 +1,50 @@
+"""
+`@task` registers a function; `func.enqueue(**kwargs)` adds a row for
+`manage.py run_worker`, atomically with the caller's transaction.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Task
+
+_registry = {}
+
+
+def get_setting(name):
+    defaults = {
+        'CONCURRENCY': 4,
+        'BATCH_SIZE': 20,
+        'POLL_INTERVAL': 1.0,
+        'MAX_ATTEMPTS': 5,
+        'RETRY_BACKOFF': 5,
+        'LOCK_TIMEOUT': 300,
+        'METRICS_INTERVAL': 60,
+    }
+    return getattr(settings, 'TASKS', {}).get(name, defaults[name])
+
+
+def task(func=None, *, max_attempts=None):
+    def register(func):
+        name = f'{func.__module__}.{func.__qualname__}'
+        _registry[name] = func
+        func.task_name = name
+        func.enqueue = lambda delay=None, **kwargs: enqueue(name, kwargs, delay=delay, max_attempts=max_attempts)
+        return func
+
+    return register(func) if func is not None else register
+
+
+def get_task(name):
+    return _registry[name]
+
+
+def enqueue(name, payload=None, delay=None, max_attempts=None):
+    run_at = timezone.now() + timedelta(seconds=delay) if delay else timezone.now()
+    return Task.objects.create(
+        name=name,
+        payload=payload or {},
+        run_at=run_at,
+        max_attempts=max_attempts or get_setting('MAX_ATTEMPTS'),
+    )
@@ -0,0 +1,77 @@
+import threading
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from .models import Task
+from .queue import task
+from .worker import Worker, queue_stats
+
+calls = []
+
+
+@task(max_attempts=2)
+def record_call(value):
+    calls.append(value)
+
+
+@task(max_attempts=2)
+def always_fails():
+    raise RuntimeError('boom')
+
+
+class WorkerTests(TestCase):
+    def setUp(self):
+        calls.clear()
+        self.worker = Worker(batch_size=10)
+
+    def test_runs_due_tasks_once(self):
+        record_call.enqueue(value=1)
+        record_call.enqueue(delay=60, value=2)
+        self.assertEqual(self.worker.run_once(), 1)
+        self.assertEqual(self.worker.run_once(), 0)
+        self.assertEqual(calls, [1])
+        self.assertEqual(queue_stats()['counts'], {'queued': 1, 'running': 0, 'done': 1, 'failed': 0})
+
+    def test_failures_back_off_then_fail(self):
+        queued = always_fails.enqueue()
+        self.worker.run_once()
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), ('queued', 1))
+        self.assertGreater(queued.run_at, timezone.now())
+        self.assertIn('boom', queued.last_error)
+
+        Task.objects.filter(id=queued.id).update(run_at=timezone.now() - timedelta(seconds=1))
+        self.worker.run_once()
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), ('failed', 2))
+        self.assertEqual(self.worker.metrics.as_dict()['failed'], 1)
+
+    def test_stale_locks_count_as_attempts(self):
+        queued = record_call.enqueue(value=1)
+        expired = timezone.now() - timedelta(hours=1)
+        Task.objects.filter(id=queued.id).update(status='running', locked_at=expired)
+        self.assertEqual(self.worker.run_once(), 1)
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), ('done', 2))
+
+        # Its worker died on the last allowed attempt.
+        queued = record_call.enqueue(value=2)
+        Task.objects.filter(id=queued.id).update(status='running', locked_at=expired, attempts=1)
+        self.assertEqual(self.worker.run_once(), 0)
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), ('failed', 2))
+        self.assertIn('Lock expired', queued.last_error)
+        self.assertEqual(calls, [1])
+
+    def test_run_reports_metrics_periodically(self):
+        stop, reports = threading.Event(), []
+
+        def report(metrics):
+            reports.append(metrics)
+            stop.set()
+
+        worker = Worker(batch_size=10, poll_interval=60, metrics_interval=0.000001)
+        self.assertEqual(worker.run(stop=stop, report=report), 0)
+        self.assertEqual([metrics['processed'] for metrics in reports], [0])
@@ -1,3 +1,42 @@
-from django.test import TestCase
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from .models import User
+from .throttling import throttle_stats
+
+
+@override_settings(
+    REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {"login_ip": "3/min", "login_account": "2/min"},
+    }
+)
+class TokenThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        User.objects.create_user(username="buyer", password="secret")
+
+    def obtain(self, username, password="wrong", ip="10.0.0.1"):
+        return self.client.post(
+            "/api/token/",
+            {"username": username, "password": password},
+            REMOTE_ADDR=ip,
+        )
+
+    def test_token_pair_authenticates_api_requests(self):
+        response = self.obtain("buyer", "secret")
+        self.assertEqual(response.status_code, 200)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        self.assertEqual(self.client.get("/api/users/me/").data["username"], "buyer")
+
+    def test_account_and_ip_limits(self):
+        self.assertEqual(self.obtain("buyer").status_code, 401)
+        self.assertEqual(self.obtain("buyer").status_code, 401)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.obtain("buyer", "secret", ip="10.0.0.2").status_code, 429)
+        self.assertEqual(self.obtain("someone").status_code, 401)
+        self.assertEqual(self.obtain("someone-else").status_code, 429)
+        self.assertEqual(throttle_stats()["login_ip"]["rejected"], 1)
@@ -1,10 +1,14 @@
 from django.urls import path, include
-from users.views import UserView
+from users.views import UserView, ThrottledTokenObtainPairView
 from rest_framework.routers import DefaultRouter
+from rest_framework_simplejwt.views import TokenRefreshView
 
 router = DefaultRouter()
 router.register(r'users', UserView, basename='user')
 
-urlpatterns = [] + router.urls
+urlpatterns = [
+    path('token/', ThrottledTokenObtainPairView.as_view(), name='token-obtain-pair'),
+    path('token/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
+] + router.urls
 
 
@@ -5,7 +5,9 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.decorators import action
 from rest_framework import status
 from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.views import TokenObtainPairView
 from .serializer import UserSerializer
+from .throttling import LoginIPThrottle, LoginAccountThrottle
 
 # from django.shortcuts import get_object_or_404
 
@@ -83,3 +85,12 @@ class UserList:
     """
     List of users.
     """
+
+
+class ThrottledTokenObtainPairView(TokenObtainPairView):
+    """
+    Username/password -> JWT pair, rate limited per IP and per username
+    before the user lookup and password check run.
+    """
+
+    throttle_classes = [LoginIPThrottle, LoginAccountThrottle]